@@ -0,0 +1,55 @@
+"""
+Compression of dynamic responses (rendered HTML, JSON).
+
+Static files are precompressed at `collectstatic` time (see
+Turfie.storage) and served with their Content-Encoding already set, so
+this middleware leaves them alone. It also skips images, PDFs and other
+media, partial (206) responses and anything under ~200 bytes.
+
+Brotli is used when the client accepts it and the optional `brotli`
+package is installed; streaming responses and everything else fall back
+to Django's gzip, which pads its output with random bytes against BREACH.
+CSRF tokens are masked per response, so they are not exposed either way.
+"""
+
+import re
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ACCEPTS_BR_RE = re.compile(r'\bbr\b(?!\s*;\s*q=0(?:\.0*)?\b)')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware limited to COMPRESS_CONTENT_TYPES, preferring brotli for complete responses."""
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if response.status_code == 206 or content_type not in settings.COMPRESS_CONTENT_TYPES:
+            return response
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < 200
+            or not ACCEPTS_BR_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=settings.COMPRESS_BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
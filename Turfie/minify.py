@@ -0,0 +1,214 @@
+"""
+Dependency-free CSS and JavaScript minifiers for our own static bundles.
+
+Both are conservative: they drop comments and collapse whitespace, and
+never rename, reorder or rewrite code. String literals (and, in
+JavaScript, template literals and regular expression literals) are copied
+verbatim. The JavaScript minifier keeps a newline wherever one might
+matter for automatic semicolon insertion, so it is only meant for
+hand-written page scripts, not for third-party libraries.
+"""
+
+import re
+
+CSS_TIGHT_RE = re.compile(r'\s*([{};,>~])\s*')
+CSS_DECLARATION_RE = re.compile(r'(?<=[{;])([\w-]+):\s+')
+JS_TIGHT_CHARS = set('{}()[];,:=<>?!&|*')
+# After these a '/' starts a regular expression, not a division.
+JS_REGEX_AFTER_CHARS = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_AFTER_WORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof', 'new', 'delete', 'void', 'throw',
+    'yield', 'await',
+}
+# Newlines before/after these can go without changing how the code parses.
+JS_JOIN_AFTER = set('{;,([')
+JS_JOIN_BEFORE = set('})]')
+
+
+def _skip_string(source, i):
+    """Index just past the quoted string starting at `source[i]`."""
+    quote = source[i]
+    i += 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+            continue
+        if source[i] == quote or source[i] == '\n':
+            return i + 1
+        i += 1
+    return i
+
+
+def minify_css(source):
+    parts = []
+    i = 0
+    length = len(source)
+    code = []
+
+    def flush():
+        text = re.sub(r'\s+', ' ', ''.join(code))
+        text = CSS_TIGHT_RE.sub(r'\1', text)
+        # 'color: red' -> 'color:red', but only for declarations: a space before ':' in a
+        # selector ('div :hover') is significant.
+        parts.append(CSS_DECLARATION_RE.sub(r'\1:', text).replace(';}', '}'))
+        code.clear()
+
+    while i < length:
+        char = source[i]
+        if char in '"\'':
+            flush()
+            end = _skip_string(source, i)
+            parts.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            code.append(' ')
+        else:
+            code.append(char)
+            i += 1
+    flush()
+
+    return ''.join(parts).strip()
+
+
+def _skip_regex(source, i):
+    """Index just past the regex literal at `source[i]`, or None if it is not one."""
+    j = i + 1
+    in_class = False
+    while j < len(source):
+        char = source[j]
+        if char == '\n':
+            return None
+        if char == '\\':
+            j += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            j += 1
+            while j < len(source) and (source[j].isalnum() or source[j] == '_'):
+                j += 1
+            return j
+        j += 1
+    return None
+
+
+def _skip_template(source, i):
+    """Index just past the template literal starting at `source[i]`, including nested `${...}`."""
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+        elif char == '`':
+            return i + 1
+        elif source.startswith('${', i):
+            i = _skip_code_until_brace(source, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _skip_code_until_brace(source, i):
+    depth = 0
+    while i < len(source):
+        char = source[i]
+        if char in '"\'':
+            i = _skip_string(source, i)
+        elif char == '`':
+            i = _skip_template(source, i)
+        elif char == '{':
+            depth += 1
+            i += 1
+        elif char == '}':
+            if depth == 0:
+                return i + 1
+            depth -= 1
+            i += 1
+        else:
+            i += 1
+    return i
+
+
+def _previous_token(out):
+    """The last non-whitespace character written, and the word it ends (if any)."""
+    text = ''.join(out[-8:]).rstrip()
+    if not text:
+        return '', ''
+    match = re.search(r'[\w$]+$', text)
+    return text[-1], match.group(0) if match else ''
+
+
+def minify_js(source):
+    out = []
+    i = 0
+    length = len(source)
+    while i < length:
+        char = source[i]
+        if char in '"\'':
+            end = _skip_string(source, i)
+            out.append(source[i:end])
+            i = end
+        elif char == '`':
+            end = _skip_template(source, i)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = length if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            comment = source[i:length if end == -1 else end + 2]
+            i = length if end == -1 else end + 2
+            # A comment spanning lines counts as a line break for semicolon insertion.
+            out.append('\n' if '\n' in comment else ' ')
+        elif char == '/':
+            last, word = _previous_token(out)
+            end = None
+            if not last or last in JS_REGEX_AFTER_CHARS or word in JS_REGEX_AFTER_WORDS:
+                end = _skip_regex(source, i)
+            if end is None:
+                out.append(char)
+                i += 1
+            else:
+                out.append(source[i:end])
+                i = end
+        elif char.isspace():
+            j = i
+            while j < length and source[j].isspace():
+                j += 1
+            out.append('\n' if '\n' in source[i:j] else ' ')
+            i = j
+        else:
+            out.append(char)
+            i += 1
+    return _tighten(out).strip()
+
+
+def _tighten(tokens):
+    """Drops whitespace tokens next to punctuation where they cannot matter."""
+    merged = []
+    for token in tokens:
+        if token in (' ', '\n') and merged and merged[-1] in (' ', '\n'):
+            merged[-1] = '\n' if '\n' in (token, merged[-1]) else ' '
+        else:
+            merged.append(token)
+
+    result = []
+    for index, token in enumerate(merged):
+        if token not in (' ', '\n'):
+            result.append(token)
+            continue
+        before = result[-1][-1:] if result else ''
+        after = merged[index + 1][:1] if index + 1 < len(merged) else ''
+        if not before or not after:
+            continue
+        if token == ' ' and (before in JS_TIGHT_CHARS or after in JS_TIGHT_CHARS):
+            continue
+        if token == '\n' and (before in JS_JOIN_AFTER or after in JS_JOIN_BEFORE):
+            continue
+        result.append(token)
+    return ''.join(result)
@@ -0,0 +1,191 @@
+"""
+Publish/subscribe for pushing live updates to open pages.
+
+`publish(channel, message)` hands a JSON-serializable message to the
+configured fan-out backend (PUBSUB_BACKEND). The backend delivers it to
+the in-process `hub` of every web process, which passes it to that
+process's subscribers:
+
+* `LocalBackend` (the default) delivers straight to this process's hub.
+  That is enough for a single ASGI process. Messages published by other
+  processes (other web workers, `runworkers`) are not seen.
+* `RedisBackend` publishes through Redis (PUBSUB_REDIS_URL, needs the
+  optional `redis` package). Each process runs one listener thread that
+  feeds its hub, so every subscriber sees every message whichever process
+  published it.
+
+Subscribers are coroutines, typically a streaming response under ASGI
+(`subscribe()` must be called from the event loop). An idle subscriber
+costs a small object and a waiting task, not a thread.
+A subscription keeps only the latest message of its channel, so a slow
+client never builds up a backlog. Every message on a channel must
+therefore carry that channel's full state, not a delta.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, hub, channel):
+        self.hub = hub
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self._latest = None
+        self._ready = asyncio.Event()
+
+    def _deliver(self, message):
+        # Runs on self.loop.
+        self._latest = message
+        self._ready.set()
+
+    async def get(self, timeout):
+        """The newest message since the last call, or None if none arrived within `timeout` seconds."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        message, self._latest = self._latest, None
+        return message
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    """This process's subscribers by channel. Safe to publish to from any thread."""
+
+    def __init__(self):
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._channels.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+    def dispatch(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        # One wake-up per event loop, however many subscribers it serves.
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, group, message)
+            except RuntimeError:
+                # The loop has shut down; its subscriptions are gone with it.
+                for subscription in group:
+                    self.unsubscribe(subscription)
+
+
+def _deliver_all(subscriptions, message):
+    for subscription in subscriptions:
+        subscription._deliver(message)
+
+
+hub = Hub()
+
+
+class LocalBackend:
+    """Fans out within this process only."""
+
+    def start(self):
+        pass
+
+    def publish(self, channel, message):
+        hub.dispatch(channel, message)
+
+
+class RedisBackend:
+    """Fans out to every process through Redis pub/sub."""
+
+    prefix = 'turfie:'
+
+    def __init__(self):
+        if redis is None:
+            raise ImportError("RedisBackend needs the 'redis' package.")
+        self.client = redis.Redis.from_url(settings.PUBSUB_REDIS_URL)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def start(self):
+        """Starts this process's listener thread, once; called when the process first has a subscriber."""
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='pubsub-listener', daemon=True)
+                self._listener.start()
+
+    def publish(self, channel, message):
+        self.client.publish(self.prefix + channel, json.dumps(message, cls=DjangoJSONEncoder))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.prefix + '*')
+                for item in pubsub.listen():
+                    channel = item['channel'].decode()[len(self.prefix):]
+                    hub.dispatch(channel, json.loads(item['data']))
+            except redis.RedisError:
+                logger.exception("Lost the Redis pub/sub connection; reconnecting")
+                time.sleep(1)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.PUBSUB_BACKEND)()
+    return _backend
+
+
+def subscribe(channel):
+    """Subscribes the running event loop to `channel`. Also starts the backend's listener, if it has one."""
+    get_backend().start()
+    return hub.subscribe(channel)
+
+
+def publish(channel, message):
+    try:
+        get_backend().publish(channel, message)
+    except Exception:
+        # Live updates are best effort; the page is still correct on reload and at booking time.
+        logger.exception("Could not publish to %s", channel)
@@ -0,0 +1,172 @@
+"""
+Rate limiting for expensive POSTs (login, registration, booking).
+
+Each limit is a rate such as '10/m' applied per client IP and/or per user.
+A limit works as a token bucket that refills continuously: it is tracked
+as a sliding-window counter in the cache, with one counter per fixed
+window. The previous window's count is weighted by how much of it still
+overlaps the sliding window. Counters only change through `cache.incr`,
+which is atomic in every cache backend, so concurrent workers sharing a
+cache (Redis in production) never lose a hit. An allowed request costs two
+cache round trips per limit.
+
+`RateLimitMiddleware` applies RATE_LIMITS, keyed by URL name. `@ratelimit`
+does the same for a single view. Refused requests get a 429 with
+Retry-After. Limits are only global across workers when CACHES points at a
+shared backend.
+"""
+
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def client_ip(request):
+    if settings.RATE_LIMIT_TRUST_X_FORWARDED_FOR:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _identity(request, scope):
+    """
+    What a limit counts by. 'user' is the logged-in user or, for anonymous
+    POSTs such as login, the username being tried from this client IP.
+    Counting a username on its own would let anyone lock its owner out
+    with a few bad passwords; the 'ip' limit still caps one client trying
+    many usernames.
+    """
+    if scope == 'ip':
+        return client_ip(request)
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is not None:
+        return f'id:{user_id}'
+    username = request.POST.get('username')
+    return f'name:{client_ip(request)}:{username.casefold()}' if username else None
+
+
+def hit(key, rate, now=None):
+    """
+    Counts one request against `key` and returns the seconds to wait, or 0 if allowed.
+    """
+    limit, window = parse_rate(rate)
+    now = time.time() if now is None else now
+    current = int(now // window)
+    current_key = f'ratelimit:{key}:{window}:{current}'
+    try:
+        count = cache.incr(current_key)
+    except ValueError:
+        # First hit in this window (or the counter expired); another worker may get here too.
+        if not cache.add(current_key, 1, window * 2):
+            count = cache.incr(current_key)
+        else:
+            count = 1
+    previous = cache.get(f'ratelimit:{key}:{window}:{current - 1}', 0)
+    elapsed = now / window - current
+    if previous * (1 - elapsed) + count <= limit:
+        return 0
+    if count > limit or not previous:
+        return math.ceil((current + 1) * window - now)
+    # Wait until enough of the previous window has slid out.
+    return math.ceil((1 - (limit - count) / previous - elapsed) * window) or 1
+
+
+def check(request, name, limits):
+    """Applies `{scope: rate}` limits to the request; returns the longest Retry-After, or 0."""
+    wait = 0
+    for scope, rate in limits.items():
+        identity = _identity(request, scope)
+        if identity is not None:
+            wait = max(wait, hit(f'{name}:{scope}:{identity}', rate))
+    return wait
+
+
+def too_many_requests(request, retry_after):
+    message = "Too many requests. Please try again later."
+    if request.accepts('application/json') and not request.accepts('text/html'):
+        response = JsonResponse({'error': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class RateLimitMiddleware:
+    """
+    Applies RATE_LIMITS to the listed URL names, for the methods in RATE_LIMIT_METHODS.
+
+    Works in sync and async chains. Under ASGI `process_view` is a coroutine,
+    so requests that are not limited (GETs, the live slot stream) never
+    leave the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # Django calls process_view in the chain's mode.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def limits_for(self, request):
+        if not settings.RATE_LIMIT_ENABLED or request.method not in settings.RATE_LIMIT_METHODS:
+            return None, None
+        name = request.resolver_match.view_name
+        return name, settings.RATE_LIMITS.get(name)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        name, limits = self.limits_for(request)
+        if not limits:
+            return None
+        wait = check(request, name, limits)
+        return too_many_requests(request, wait) if wait else None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        name, limits = self.limits_for(request)
+        if not limits:
+            return None
+        wait = await sync_to_async(check)(request, name, limits)
+        return too_many_requests(request, wait) if wait else None
+
+
+def ratelimit(methods=('POST',), **limits):
+    """
+    Limits a view, e.g. `@ratelimit(ip='30/m', user='10/m')`, for views
+    not listed in RATE_LIMITS.
+    """
+    def decorator(view_func):
+        name = f'{view_func.__module__}.{view_func.__qualname__}'
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATE_LIMIT_ENABLED and request.method in methods:
+                wait = check(request, name, limits)
+                if wait:
+                    return too_many_requests(request, wait)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,140 @@
+"""
+Read-replica routing for analytics and admin pages.
+
+Reads only go to the replica when a view opts in with `@use_replica` (or
+code wraps itself in `reading_from_replica()`), so the booking flow and
+everything else keeps reading from the primary. Once a session writes
+anything, `StickyPrimaryMiddleware` pins it to the primary for
+REPLICA_STICKY_SECONDS so users always see their own changes even while
+the replica lags behind.
+
+When no replica database is configured every read goes to `default`.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_SESSION_KEY = '_primary_until'
+
+# Per-request routing state, set up by StickyPrimaryMiddleware.
+_routing_state = ContextVar('replica_routing_state', default=None)
+
+
+def replica_configured():
+    return settings.REPLICA_DATABASE_ALIAS in settings.DATABASES
+
+
+def replica_alias():
+    """Alias analytics reads should use right now: the replica unless the request is pinned to the primary."""
+    state = _routing_state.get()
+    if not replica_configured() or (state is not None and (state['sticky'] or state['wrote'])):
+        return DEFAULT_DB_ALIAS
+    return settings.REPLICA_DATABASE_ALIAS
+
+
+class ReplicaRouter:
+    """Sends opted-in reads to the replica; all writes and migrations stay on the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None and state['replica']:
+            return replica_alias()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        # Session rows are written after the response and must not pin the user.
+        if state is not None and model._meta.app_label != 'sessions':
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so relations across them are fine.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def reading_from_replica():
+    """Routes reads inside the block to the replica (subject to sticky-primary)."""
+    state = _routing_state.get()
+    token = None
+    if state is None:
+        state = {'replica': False, 'sticky': False, 'wrote': False}
+        token = _routing_state.set(state)
+    previous = state['replica']
+    state['replica'] = True
+    try:
+        yield
+    finally:
+        state['replica'] = previous
+        if token is not None:
+            _routing_state.reset(token)
+
+
+def use_replica(view_func):
+    """
+    Decorator for read-only analytics views whose queries may go to the replica.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        with reading_from_replica():
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+class StickyPrimaryMiddleware:
+    """
+    Keeps a session on the primary for a short while after it writes.
+
+    Must come after SessionMiddleware. Works in sync and async chains.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sticky_until = request.session.get(STICKY_SESSION_KEY, 0)
+        state, token = self.start(sticky_until)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        self.finish(request, state, sticky_until)
+        return response
+
+    async def __acall__(self, request):
+        sticky_until = await request.session.aget(STICKY_SESSION_KEY, 0)
+        state, token = self.start(sticky_until)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        self.finish(request, state, sticky_until)
+        return response
+
+    def start(self, sticky_until):
+        state = {'replica': False, 'sticky': sticky_until > time.time(), 'wrote': False}
+        return state, _routing_state.set(state)
+
+    def finish(self, request, state, sticky_until):
+        # Clients without a session (e.g. payment webhooks) have nothing to pin.
+        # Only the in-memory session changes here; SessionMiddleware saves it.
+        if state['wrote'] and replica_configured() and request.session.session_key:
+            request.session[STICKY_SESSION_KEY] = time.time() + settings.REPLICA_STICKY_SECONDS
+        elif sticky_until and not state['sticky']:
+            del request.session[STICKY_SESSION_KEY]
@@ -0,0 +1,175 @@
+"""
+Views that serve collected static files and user uploads when DEBUG is off.
+
+Both support conditional requests (`ETag`/`Last-Modified`) and single byte
+ranges. Static files pick a precompressed `.br`/`.gz` variant written by
+`Turfie.storage.CompressedManifestStaticFilesStorage` when the client
+accepts it. Content-hashed names, of static files and of media blobs, are
+cached as immutable. Media files can instead be handed off to the
+front-end server with `X-Accel-Redirect` (nginx) or `X-Sendfile`
+(Apache/lighttpd) by setting `MEDIA_SENDFILE`.
+"""
+
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# ManifestStaticFilesStorage inserts a 12 character md5 prefix before the extension.
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+# Uploads in the content-addressed media storage (Turfs.media) are named after their SHA-256.
+BLOB_NAME_RE = re.compile(r'^blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[^/.]+)?$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _resolve(root, path):
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = Path(safe_join(root, path))
+    except Exception:
+        # SuspiciousFileOperation for paths escaping the root.
+        raise Http404("File not found.")
+    if not full_path.is_file():
+        raise Http404("File not found.")
+    return full_path
+
+
+def _etag(stat, encoding=''):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def _parse_range(header, size):
+    """Returns `(start, end)` for a single satisfiable byte range, `None` to ignore it, or `False` if unsatisfiable."""
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        # Suffix range: the last N bytes.
+        start = max(size - int(end), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, full_path, cache_control, content_path=None, encoding=''):
+    """
+    Streams `full_path` with validators, range support and the given Cache-Control.
+
+    `content_path` is the file whose name decides the Content-Type (the
+    uncompressed original when a precompressed variant is being served).
+    """
+    stat = full_path.stat()
+    etag = _etag(stat, encoding)
+    content_type, _ = mimetypes.guess_type(str(content_path or full_path))
+    content_type = content_type or 'application/octet-stream'
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        byte_range = None
+        if 'Range' in request.headers and not encoding:
+            if_range = request.headers.get('If-Range')
+            if if_range is None or if_range.strip() == etag:
+                byte_range = _parse_range(request.headers['Range'], stat.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+        elif byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _iter_range(full_path, start, length), status=206, content_type=content_type,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(length)
+        else:
+            response = FileResponse(
+                open(full_path, 'rb'), content_type=content_type, filename=(content_path or full_path).name,
+            )
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'none' if encoding else 'bytes'
+    if content_path is not None:
+        response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+@require_safe
+def static_view(request, path):
+    """Serves files from STATIC_ROOT, preferring precompressed variants."""
+    full_path = _resolve(settings.STATIC_ROOT, path)
+    if HASHED_NAME_RE.search(full_path.name):
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        cache_control = f'public, max-age={settings.STATIC_CACHE_MAX_AGE}'
+
+    accept_encoding = request.headers.get('Accept-Encoding', '')
+    for encoding, suffix in ENCODINGS:
+        variant = full_path.with_name(full_path.name + suffix)
+        if encoding in accept_encoding and variant.is_file():
+            return serve_file(request, variant, cache_control, content_path=full_path, encoding=encoding)
+    return serve_file(request, full_path, cache_control, content_path=full_path)
+
+
+@require_safe
+def media_view(request, path):
+    """Serves user uploads from MEDIA_ROOT, or hands them to the front-end server."""
+    full_path = _resolve(settings.MEDIA_ROOT, path)
+    if BLOB_NAME_RE.match(posixpath.normpath(path).lstrip('/')):
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        cache_control = f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+    if settings.MEDIA_SENDFILE:
+        content_type, _ = mimetypes.guess_type(full_path.name)
+        response = HttpResponse(content_type=content_type or 'application/octet-stream')
+        relative = posixpath.normpath(path).lstrip('/')
+        if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + relative
+        else:
+            response['X-Sendfile'] = str(full_path)
+        response['Cache-Control'] = cache_control
+        return response
+
+    return serve_file(request, full_path, cache_control)
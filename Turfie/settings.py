@@ -8,7 +8,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-ce!yp!tpv($zimg!yc!lq(^_it8gl9%&!-=#t*ix0!_)7zxzyv'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Set DJANGO_DEBUG=False to switch static/media serving to the production mode below.
+DEBUG = os.environ.get('DJANGO_DEBUG', 'True') == 'True'
 
 ALLOWED_HOSTS = ['localhost','.ngrok-free.app', '127.0.0.1']
 
@@ -40,10 +41,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Compresses HTML/JSON responses; see Turfie/compression.py
+    'Turfie.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Serves request.user from a cached snapshot; see Users/user_state.py
+    'Users.middleware.CachedAuthenticationMiddleware',
+    'Turfie.ratelimit.RateLimitMiddleware',
+    'Turfie.replicas.StickyPrimaryMiddleware',
     'Users.middleware.CheckUserActiveMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -77,6 +83,174 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile: WAL lets readers run alongside the single writer,
+# the timeout makes writers queue for the lock instead of failing with
+# "database is locked", and IMMEDIATE transactions take the write lock at
+# BEGIN so check-then-insert sequences (booking overlap checks) serialize.
+# Enabled outside DEBUG, or explicitly with DJANGO_DB_PROFILE=production.
+SQLITE_PRODUCTION_OPTIONS = {
+    'timeout': 20,
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA cache_size=-32000;'
+        'PRAGMA mmap_size=268435456;'
+        'PRAGMA temp_store=MEMORY;'
+    ),
+}
+DB_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'development' if DEBUG else 'production')
+if DB_PROFILE == 'production':
+    DATABASES['default'].update({
+        'OPTIONS': SQLITE_PRODUCTION_OPTIONS,
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    })
+
+# Optional read replica for analytics/admin pages (see Turfie/replicas.py).
+# Locally, point DJANGO_REPLICA_DB at a second SQLite file and refresh it
+# with `python manage.py sync_replica`.
+REPLICA_DATABASE_ALIAS = 'replica'
+if os.environ.get('DJANGO_REPLICA_DB'):
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['DJANGO_REPLICA_DB'],
+        'OPTIONS': DATABASES['default'].get('OPTIONS', {}),
+        'CONN_MAX_AGE': DATABASES['default'].get('CONN_MAX_AGE', 0),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['Turfie.replicas.ReplicaRouter']
+
+# After a write, the session reads from the primary for this many seconds.
+REPLICA_STICKY_SECONDS = 15
+
+# Caching
+# REDIS_URL is required in multi-process deployments: CachedAuthenticationMiddleware
+# revokes cached user state through this cache, and the LocMemCache fallback is
+# per process, so a deactivation would only reach the worker that made it.
+# `manage.py check --deploy` warns (Users.W001) while the fallback is in use.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Sessions are read from the cache and only written through to the database.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# How long a user's version stamp lives in the cache. When it expires the
+# snapshot is simply rebuilt from the database on the next request.
+USER_STATE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Booking archival (`python manage.py archive_bookings`)
+BOOKING_ARCHIVE_AFTER_DAYS = 30
+BOOKING_ARCHIVE_STATUSES = ['completed', 'cancelled']
+BOOKING_ARCHIVE_BATCH_SIZE = 1000
+
+# Notifications: unread counters live in the cache; old rows are removed by
+# `python manage.py prune_notifications`.
+NOTIFICATION_COUNT_TIMEOUT = 60 * 60 * 24
+NOTIFICATION_RETENTION_READ_DAYS = 30
+NOTIFICATION_RETENTION_UNREAD_DAYS = 90
+
+# Email: printed to the console unless a real backend is configured.
+EMAIL_BACKEND = os.environ.get('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DJANGO_DEFAULT_FROM_EMAIL', 'Turfie <no-reply@turfie.local>')
+# Absolute base URL used for links in emails.
+SITE_URL = os.environ.get('DJANGO_SITE_URL', 'http://localhost:8000')
+
+# Booking reminders (`python manage.py send_booking_reminders`, run every few minutes)
+BOOKING_REMINDER_HOURS = 24
+BOOKING_REMINDER_STATUSES = ['pending', 'confirmed']
+BOOKING_REMINDER_BATCH_SIZE = 500
+# A run's claim on a booking expires after this long, so bookings claimed by a run that died are retried.
+BOOKING_REMINDER_LEASE_SECONDS = 15 * 60
+
+# Payment gateway webhooks are signed with this shared secret (see Turfs/payments.py).
+PAYMENT_WEBHOOK_SECRET = os.environ.get('PAYMENT_WEBHOOK_SECRET', 'insecure-dev-webhook-secret')
+
+# Dashboard recommendations (`python manage.py build_recommendations`, run nightly)
+RECOMMENDATION_TOP_K = 10
+# A booking counts half as much towards a turf's popularity after this many days.
+RECOMMENDATION_POPULARITY_HALF_LIFE_DAYS = 14
+
+# Search-box suggestions are served from an in-process index (Turfs/autocomplete.py),
+# rebuilt after this many seconds so popularity stays current.
+AUTOCOMPLETE_MAX_AGE = 5 * 60
+
+# Downstream systems read the booking/turf change feed (turfs/events/) with this bearer token.
+CHANGE_FEED_TOKEN = os.environ.get('CHANGE_FEED_TOKEN', '')
+
+# Rate limits (Turfie/ratelimit.py) by URL name: requests allowed per client IP
+# and per user (for login, per username tried from one IP), as 'count/period' with s/m/h/d.
+RATE_LIMIT_ENABLED = os.environ.get('DJANGO_RATE_LIMIT', 'True') == 'True'
+RATE_LIMIT_METHODS = ['POST']
+RATE_LIMITS = {
+    'users:login': {'ip': '20/m', 'user': '5/m'},
+    'users:register': {'ip': '5/m'},
+    'turfs:turf_detail': {'ip': '30/m', 'user': '10/m'},
+}
+# Behind ngrok or another reverse proxy REMOTE_ADDR is the proxy; only trust
+# X-Forwarded-For when the proxy sets it.
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = os.environ.get('DJANGO_TRUST_X_FORWARDED_FOR', 'False') == 'True'
+
+# Background jobs (Turfs/jobs.py), run by `python manage.py runworkers`.
+JOB_WORKER_PROCESSES = 1
+JOB_WORKER_THREADS = 4
+JOB_POLL_INTERVAL = 1.0
+JOB_MAX_ATTEMPTS = 5
+# Seconds before the first retry; doubles with every failed attempt.
+JOB_RETRY_BACKOFF = 10
+# A running job whose worker has not finished it within this many seconds is queued again.
+JOB_LEASE_SECONDS = 10 * 60
+
+# Deleted accounts and turfs are purged by a background job, this many rows per transaction.
+PURGE_CHUNK_SIZE = 1000
+
+# Worker startup budget, checked by `python manage.py profile_startup --check`.
+STARTUP_TIME_BUDGET_MS = 1500
+STARTUP_RSS_BUDGET_MB = 80
+# Heavy dependencies that must only be imported by the code paths that use them.
+STARTUP_LAZY_MODULES = ['weasyprint', 'qrcode', 'PIL']
+
+# Dynamic responses of these types are gzip/brotli compressed by Turfie.compression.
+COMPRESS_CONTENT_TYPES = ['text/html', 'application/json', 'text/plain']
+# 11 is for precompressed static files; a per-request level has to be cheap.
+COMPRESS_BROTLI_QUALITY = 5
+# Inline <style>/<script> blocks at least this big are moved into static bundles
+# by `python manage.py extract_inline_assets`; smaller ones cost less inline than a request.
+INLINE_ASSET_MIN_BYTES = 512
+# Templates whose styles must stay inline: the receipt is rendered to PDF from a string.
+INLINE_ASSET_EXCLUDE = ['turfs/receipt.html']
+
+# Most turfs or users one bulk moderation action (management app) may change.
+BULK_MODERATION_MAX_ITEMS = 500
+# The admin bookings search looks at no more than this many matching turfs and users.
+ADMIN_SEARCH_MAX_MATCHES = 200
+
+# Live slot updates on the turf page (Turfs/live.py, Turfie/pubsub.py). Needs an ASGI server.
+# With REDIS_URL set they fan out through Redis, so every worker sees every booking.
+PUBSUB_REDIS_URL = os.environ.get('REDIS_URL', '')
+PUBSUB_BACKEND = 'Turfie.pubsub.RedisBackend' if PUBSUB_REDIS_URL else 'Turfie.pubsub.LocalBackend'
+# Seconds between keep-alive comments on an idle stream, under typical proxy read timeouts.
+LIVE_STREAM_HEARTBEAT = 15
+# A stream is closed after this many seconds and the browser reconnects, so none lives forever.
+LIVE_STREAM_MAX_SECONDS = 10 * 60
+
+# `python manage.py collect_media` removes uploads that have had no references for this long,
+# this many per transaction. The delay lets cached pages that still show an old image expire.
+MEDIA_GC_GRACE_SECONDS = 24 * 60 * 60
+MEDIA_GC_BATCH_SIZE = 500
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -101,6 +275,34 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# `collectstatic` target. Outside DEBUG the files are content-hashed and
+# precompressed (gzip, plus brotli if installed) by Turfie.storage.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    # Uploads are stored once per distinct content, under hash-sharded names (Turfs/media.py).
+    'default': {
+        'BACKEND': 'Turfs.media.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'Turfie.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Serve /static/ and /media/ through Turfie.serving when DEBUG is off. Leave this
+# on unless nginx/Apache serves STATIC_ROOT and MEDIA_ROOT directly.
+SERVE_FILES = os.environ.get('DJANGO_SERVE_FILES', 'True') == 'True'
+# Hashed static names are always cached as immutable; this applies to the rest.
+STATIC_CACHE_MAX_AGE = 60 * 60
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 7
+# None to stream media from Django, or 'x-accel-redirect' / 'x-sendfile' to hand
+# the file off to the front-end server (nginx needs an `internal` location at MEDIA_ACCEL_PREFIX).
+MEDIA_SENDFILE = os.environ.get('DJANGO_MEDIA_SENDFILE') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,86 @@
+"""
+Static file storage used in production.
+
+`collectstatic` minifies our own bundles (files under `bundles/`, which
+`extract_inline_assets` writes), then writes content-hashed copies of
+every static file (via Django's manifest storage) and, next to each
+compressible one, gzip and brotli variants so neither the web server nor
+Django has to compress them again at request time. Brotli output is
+skipped when the optional `brotli` package is not installed.
+"""
+
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .minify import minify_css, minify_js
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    compressible_extensions = ('.css', '.js', '.mjs', '.svg', '.json', '.map', '.txt', '.xml', '.html', '.ico')
+    # Files smaller than this gain nothing from compression once headers are counted.
+    min_compress_size = 256
+    # Readable sources in STATICFILES_DIRS, minified on the way into STATIC_ROOT.
+    minify_prefixes = ('bundles/',)
+    minifiers = {'.css': minify_css, '.js': minify_js}
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name in paths:
+                if self.minify(name):
+                    # Hash the minified copy in STATIC_ROOT, not the original source.
+                    paths[name] = (self, name)
+        hashed_names = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.append(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+        for hashed_name in hashed_names:
+            for compressed_name in self.compress(hashed_name):
+                yield hashed_name, compressed_name, True
+
+    def minify(self, name):
+        """Minifies `name` in place if it is one of our bundles; returns True if it did."""
+        minifier = self.minifiers.get(name[name.rfind('.'):])
+        if minifier is None or not name.startswith(self.minify_prefixes) or '.min.' in name:
+            return False
+        with self.open(name) as original:
+            source = original.read().decode('utf-8')
+        self.delete(name)
+        self._save(name, ContentFile(minifier(source).encode('utf-8')))
+        return True
+
+    def compress(self, name):
+        """Writes `.gz` (and `.br` when available) variants of `name`, returning their names."""
+        if not name.endswith(self.compressible_extensions):
+            return []
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < self.min_compress_size:
+            return []
+
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data, quality=11)))
+
+        written = []
+        for suffix, compressed in variants:
+            # Only keep variants that are meaningfully smaller than the original.
+            if len(compressed) >= len(data) * 0.95:
+                continue
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            written.append(compressed_name)
+        return written
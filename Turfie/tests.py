@@ -0,0 +1,313 @@
+import gzip
+import io
+import re
+import shutil
+import tempfile
+from datetime import time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.backends.cache import SessionStore
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from Turfie.compression import CompressionMiddleware
+from Turfie.minify import minify_css, minify_js
+from Turfie.replicas import (
+    STICKY_SESSION_KEY, ReplicaRouter, StickyPrimaryMiddleware, reading_from_replica, replica_alias,
+)
+from Turfs.management.commands.extract_inline_assets import Command as ExtractInlineAssets
+from Turfs.models import Booking, Turf
+from Users.models import User
+
+STATIC_TAG_RE = re.compile(r"""\{%\s*static\s+['"]([^'"]+)['"]""")
+
+PRODUCTION_STORAGES = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'Turfie.storage.CompressedManifestStaticFilesStorage'},
+}
+
+
+class ProductionStaticTests(TestCase):
+    """
+    Pages rendered with DEBUG off, against a collected manifest: a `{% static %}`
+    reference to a file that is not shipped raises there, so every page using it fails.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, static_root)
+        production = override_settings(DEBUG=False, STATIC_ROOT=static_root, STORAGES=PRODUCTION_STORAGES)
+        production.enable()
+        cls.addClassCleanup(production.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'x', is_staff=True)
+        cls.turf = Turf.objects.create(
+            owner=cls.owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+        cls.player.favorites.add(cls.turf)
+        start = timezone.now() + timedelta(days=1)
+        cls.booking = Booking.objects.create(
+            turf=cls.turf, user=cls.player, amount=Decimal('500'), status='confirmed',
+            start_time=start, end_time=start + timedelta(hours=1),
+        )
+
+    def test_every_static_reference_is_in_the_manifest(self):
+        templates = [path for path in Path(settings.BASE_DIR).glob('*/templates/**/*.html')]
+        missing = set()
+        for template in templates:
+            for name in STATIC_TAG_RE.findall(template.read_text(encoding='utf-8')):
+                if name not in staticfiles_storage.hashed_files:
+                    missing.add(f'{template.relative_to(settings.BASE_DIR)}: {name}')
+        self.assertEqual(sorted(missing), [])
+
+    def assertPagesRender(self, user, names):
+        self.client.force_login(user)
+        for name, args in names:
+            with self.subTest(user=user.username, page=name):
+                response = self.client.get(reverse(name, args=args))
+                self.assertEqual(response.status_code, 200)
+
+    def test_player_pages(self):
+        self.assertPagesRender(self.player, [
+            ('users:dashboard_player', []),
+            ('users:my_bookings', []),
+            ('users:favorites', []),
+            ('users:notifications', []),
+            ('users:edit_profile', []),
+            ('turfs:turf_list', []),
+            ('turfs:turf_search', []),
+            ('turfs:turf_detail', [self.turf.id]),
+            ('turfs:booking_detail', [self.booking.id]),
+        ])
+
+    def test_owner_pages(self):
+        self.assertPagesRender(self.owner, [
+            ('users:dashboard_turf_owner', []),
+            ('users:edit_profile', []),
+            ('turfs:all_bookings', []),
+            ('turfs:owner_timeline', []),
+            ('turfs:turf_pricing', [self.turf.id]),
+            ('turfs:turf_edit', [self.turf.id]),
+        ])
+
+    def test_staff_pages(self):
+        self.assertPagesRender(self.staff, [
+            ('management:admin_dashboard', []),
+            ('management:turf_requests', []),
+            ('management:manage_users', []),
+            ('management:manage_turfs', []),
+            ('management:manage_bookings', []),
+            ('management:booking_detail_admin', [self.booking.id]),
+        ])
+
+    def test_anonymous_pages(self):
+        for name in ('users:landing', 'users:login', 'users:register'):
+            with self.subTest(page=name):
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True)
+class LoginRateLimitTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user('victim', 'victim@example.com', 'right-password')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def log_in(self, password, ip):
+        return self.client.post(
+            reverse('users:login'), {'username': 'victim', 'password': password}, REMOTE_ADDR=ip,
+        )
+
+    def test_repeated_failures_get_429(self):
+        for _ in range(5):
+            self.assertNotEqual(self.log_in('wrong', '203.0.113.1').status_code, 429)
+        response = self.log_in('wrong', '203.0.113.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_attacker_cannot_lock_out_the_account(self):
+        for _ in range(10):
+            self.log_in('wrong', '203.0.113.1')
+        response = self.log_in('right-password', '198.51.100.7')
+        self.assertNotEqual(response.status_code, 429)
+        self.assertIn('_auth_user_id', self.client.session)
+
+
+@mock.patch('Turfie.replicas.replica_configured', return_value=True)
+class ReplicaRoutingTests(TestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def request(self, session):
+        request = RequestFactory().get('/')
+        request.session = session
+        return request
+
+    def test_only_opted_in_reads_use_the_replica(self, configured):
+        self.assertEqual(self.router.db_for_read(Turf), DEFAULT_DB_ALIAS)
+        with reading_from_replica():
+            self.assertEqual(self.router.db_for_read(Turf), settings.REPLICA_DATABASE_ALIAS)
+            self.assertEqual(self.router.db_for_write(Turf), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(Turf), DEFAULT_DB_ALIAS)
+
+    def test_session_sticks_to_the_primary_after_a_write(self, configured):
+        session = SessionStore()
+        session.create()
+        seen = []
+
+        def view(request, write):
+            if write:
+                self.router.db_for_write(Booking)
+            with reading_from_replica():
+                seen.append(replica_alias())
+            return HttpResponse()
+
+        StickyPrimaryMiddleware(lambda request: view(request, write=False))(self.request(session))
+        StickyPrimaryMiddleware(lambda request: view(request, write=True))(self.request(session))
+        self.assertIn(STICKY_SESSION_KEY, session)
+        StickyPrimaryMiddleware(lambda request: view(request, write=False))(self.request(session))
+        self.assertEqual(seen, [settings.REPLICA_DATABASE_ALIAS, DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS])
+
+        session[STICKY_SESSION_KEY] = 1
+        StickyPrimaryMiddleware(lambda request: view(request, write=False))(self.request(session))
+        self.assertEqual(seen[-1], settings.REPLICA_DATABASE_ALIAS)
+        self.assertNotIn(STICKY_SESSION_KEY, session)
+
+
+class SQLiteProductionProfileTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / 'profile.sqlite3'
+
+    def connect(self, alias, **options):
+        connection = DatabaseWrapper({
+            **connections[DEFAULT_DB_ALIAS].settings_dict, 'NAME': str(self.path),
+            'OPTIONS': {**settings.SQLITE_PRODUCTION_OPTIONS, **options},
+        }, alias)
+        connections[alias] = connection
+        self.addCleanup(connections.__delitem__, alias)
+        self.addCleanup(connection.close)
+        return connection
+
+    def test_pragmas_are_applied(self):
+        with self.connect('profile').cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone(), ('wal',))
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone(), (20000,))
+
+    def test_transactions_take_the_write_lock_at_begin(self):
+        self.connect('first')
+        with self.connect('second', timeout=0.1).cursor() as cursor:
+            cursor.execute('CREATE TABLE slot (id integer)')
+        with transaction.atomic(using='first'):
+            # No write yet, but a second writer must already wait for the lock.
+            with self.assertRaisesMessage(OperationalError, 'locked'):
+                with transaction.atomic(using='second'):
+                    pass
+
+
+class StartupProfileTests(SimpleTestCase):
+
+    @override_settings(STARTUP_TIME_BUDGET_MS=60_000, STARTUP_RSS_BUDGET_MB=1024)
+    def test_heavy_dependencies_are_not_imported_at_boot(self):
+        # The boot runs in a fresh interpreter, so this is what a web worker imports.
+        output = io.StringIO()
+        call_command('profile_startup', runs=1, check=True, stdout=output)
+        self.assertIn("Startup is within budget.", output.getvalue())
+
+
+class MinifyTests(SimpleTestCase):
+
+    def test_css_keeps_strings_and_drops_comments(self):
+        minified = minify_css(
+            '/* header */\n.card  >  a:hover ,\n.card b {\n    content: "a  /* keep */  b";\n}\n'
+            '@media (max-width: 600px) { .card { margin: 0 auto; } }\n'
+        )
+        self.assertEqual(
+            minified, '.card>a:hover,.card b{content:"a  /* keep */  b"}@media (max-width: 600px){.card{margin:0 auto}}',
+        )
+
+    def test_js_keeps_literals_and_statement_breaks(self):
+        minified = minify_js(
+            '// toggle\nconst pattern = /a\\/b +c/g;   // regex\nlet label = `Slot ${ hour }  free`;\n'
+            'let a = 1\nlet b = a\n++b\nif (a < 2 && b > 1) { console.log( "a  b" ) }\n'
+        )
+        self.assertEqual(
+            minified,
+            'const pattern=/a\\/b +c/g;let label=`Slot ${ hour }  free`;let a=1\nlet b=a\n++b\n'
+            'if(a<2&&b>1){console.log("a  b")}',
+        )
+
+
+class ExtractInlineAssetsTests(SimpleTestCase):
+
+    def setUp(self):
+        static_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_dir)
+        self.command = ExtractInlineAssets()
+        self.command.dry_run, self.command.min_bytes = False, 64
+        self.command.bundle_dir = Path(static_dir) / 'bundles'
+        self.command.bundles_by_digest, self.command.bundle_sizes = {}, {}
+
+    def test_moves_large_plain_blocks_into_shared_bundles(self):
+        style = '<style>\n    .hero { background: green; padding: 4rem 2rem; margin: 0 auto; }\n</style>'
+        source = (
+            '{% extends "base.html" %}\n' + style
+            + '\n<style>.small { color: red; }</style>'
+            + '\n<script>const hour = {{ hour }}; document.title = "Slots from " + hour + " onwards";</script>'
+        )
+        result = self.command.extract('turfs/page.html', source)
+        self.assertEqual(result, (
+            '{% extends "base.html" %}\n{% load static %}\n'
+            '<link rel="stylesheet" href="{% static \'bundles/turfs/page.css\' %}">'
+            '\n<style>.small { color: red; }</style>'
+            '\n<script>const hour = {{ hour }}; document.title = "Slots from " + hour + " onwards";</script>'
+        ))
+        bundle = self.command.bundle_dir / 'turfs' / 'page.css'
+        self.assertEqual(bundle.read_text(), '.hero { background: green; padding: 4rem 2rem; margin: 0 auto; }\n')
+
+        # The same block in another template reuses the bundle.
+        other = self.command.extract('users/other.html', '{% load static i18n %}' + style)
+        self.assertEqual(other, '{% load static i18n %}<link rel="stylesheet" href="{% static \'bundles/turfs/page.css\' %}">')
+
+
+class CompressionTests(SimpleTestCase):
+
+    def respond(self, content, content_type='text/html; charset=utf-8', encoding='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: HttpResponse(content, content_type=content_type))(request)
+
+    def test_compresses_pages_only(self):
+        page = '<p>Free slots tonight</p>' * 40
+        response = self.respond(page)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), page)
+        self.assertFalse(self.respond(b'\x89PNG' * 100, content_type='image/png').has_header('Content-Encoding'))
+        self.assertFalse(self.respond('<p>short</p>').has_header('Content-Encoding'))
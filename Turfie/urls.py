@@ -1,8 +1,9 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from Users import views  # ✅ Import views to directly use the landing view
 from django.conf.urls.static import static
 from django.conf import settings
+from . import serving
 
 
 urlpatterns = [
@@ -11,7 +12,14 @@ urlpatterns = [
     path('', views.landing, name='landing'),  # ✅ This makes http://127.0.0.1:8000/ work
     path('turfs/', include('Turfs.urls')),  # All URLs under /turfs/
     path('management/', include ('management.urls'))
-]+static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)  # Serve media files in development
+]
 
-#  static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)  # Serve static files in development
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)  # Serve media files in development
+elif settings.SERVE_FILES:
+    # Production: cached, range-aware serving of collected static files and uploads
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serving.static_view),
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serving.media_view),
+    ]
  
\ No newline at end of file
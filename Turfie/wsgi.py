@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Turfie.settings')
 
 application = get_wsgi_application()
+
+# With a preforking server that loads the app before forking (gunicorn --preload),
+# build the in-memory search suggestions once here so every worker shares them.
+from Turfs.autocomplete import warm_up  # noqa: E402
+
+warm_up()
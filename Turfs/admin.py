@@ -1,9 +1,21 @@
 # Turfs/admin.py
 from django.contrib import admin
-from .models import Turf, Booking, Amenity # Make sure to import Amenity
+from django.utils import timezone
+from .models import Turf, Booking, Amenity, TurfImage, ArchivedBooking, PaymentEvent, PricingRule, TurfRecommendation, ChangeEvent, Job, Deletion, StoredFile # Make sure to import Amenity
+
+class TurfImageInline(admin.TabularInline):
+    model = TurfImage
+    extra = 1
+    fields = ('image', 'position')
+
+class PricingRuleInline(admin.TabularInline):
+    model = PricingRule
+    extra = 0
+    fields = ('applies_to', 'date', 'start_hour', 'end_hour', 'price_per_hour', 'label')
 
 @admin.register(Turf)
 class TurfAdmin(admin.ModelAdmin):
+    inlines = [TurfImageInline, PricingRuleInline]
     # Replace 'location' with 'city' and 'district'
     list_display = ('name', 'city', 'district', 'owner', 'price_per_hour', 'rating')
     search_fields = ('name', 'city', 'district') # Update search fields as well
@@ -15,6 +27,95 @@ class BookingAdmin(admin.ModelAdmin):
     search_fields = ('turf__name', 'user__username')
     list_filter = ('status', 'turf')
 
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'turf', 'user', 'start_time', 'status', 'amount', 'archived_at')
+    search_fields = ('turf__name', 'user__username')
+    list_filter = ('status',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'event_type', 'booking_id', 'created', 'applied', 'received_at')
+    search_fields = ('event_id', 'booking_id')
+    list_filter = ('event_type', 'applied')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Deletion)
+class DeletionAdmin(admin.ModelAdmin):
+    list_display = ('model', 'object_repr', 'status', 'rows_deleted', 'requested_at', 'finished_at')
+    list_filter = ('status', 'model')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'ref_count', 'orphaned_at', 'created_at')
+    search_fields = ('digest', 'name')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Blobs are removed by `collect_media`, together with their files.
+        return False
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'priority', 'run_at', 'attempts', 'max_attempts', 'created_at')
+    list_filter = ('status', 'task')
+    readonly_fields = ('task', 'kwargs', 'attempts', 'claim', 'lease_until', 'last_error', 'created_at')
+    actions = ['requeue']
+
+    @admin.action(description="Requeue selected dead jobs")
+    def requeue(self, request, queryset):
+        requeued = queryset.filter(status='dead').update(status='queued', attempts=0, run_at=timezone.now())
+        self.message_user(request, f"Requeued {requeued} job(s).")
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'entity', 'entity_id', 'created_at')
+    search_fields = ('entity_id',)
+    list_filter = ('entity', 'kind')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(TurfRecommendation)
+class TurfRecommendationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'rank', 'turf', 'score', 'computed_at')
+    search_fields = ('user__username', 'turf__name')
+    list_select_related = ('user', 'turf')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 # Also register your new Amenity model so you can add amenities in the admin
 @admin.register(Amenity)
 class AmenityAdmin(admin.ModelAdmin):
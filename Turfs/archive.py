@@ -0,0 +1,65 @@
+# Turfs/archive.py
+
+"""
+Hot/cold storage for bookings.
+
+Availability only depends on the upcoming week, so finished bookings are
+moved from `Booking` into `ArchivedBooking` once they are old enough.
+The helpers here let views read a player's or owner's full history, and
+look up any booking by id, without caring which table it lives in.
+"""
+
+import heapq
+
+from django.db import transaction
+from django.http import Http404
+
+from . import events
+from .models import ArchivedBooking, Booking
+
+ARCHIVED_FIELDS = [
+    'id', 'turf_id', 'user_id', 'start_time', 'end_time', 'amount',
+    'status', 'payment_id', 'payment_status', 'payment_updated_at', 'booked_at',
+]
+
+
+def archive_bookings(cutoff, statuses, batch_size):
+    """
+    Moves bookings in `statuses` that ended before `cutoff` into the archive.
+
+    Works in batches of `batch_size`, each in its own short transaction so
+    other writers are never blocked for long. Yields the size of every batch.
+    """
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Booking.objects.filter(status__in=statuses, end_time__lt=cutoff)
+                .order_by('id')
+                .values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                return
+            ArchivedBooking.objects.bulk_create(
+                [ArchivedBooking(**row) for row in rows], ignore_conflicts=True
+            )
+            Booking.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            events.record(*[('booking', row['id'], 'booking.archived', {}) for row in rows])
+        yield len(rows)
+
+
+def get_booking_or_404(booking_id):
+    """Returns the booking with this id from the hot table or, failing that, the archive."""
+    for model in (Booking, ArchivedBooking):
+        booking = model.objects.select_related('turf', 'turf__owner', 'user').filter(id=booking_id).first()
+        if booking is not None:
+            return booking
+    raise Http404("No booking matches the given query.")
+
+
+def booking_history(hot, archived, descending=True):
+    """
+    Merges hot and archived bookings into one list ordered by start time.
+
+    Both querysets must already be ordered by start_time in the same direction.
+    """
+    return list(heapq.merge(hot, archived, key=lambda booking: booking.start_time, reverse=descending))
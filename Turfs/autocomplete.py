@@ -0,0 +1,266 @@
+# Turfs/autocomplete.py
+
+"""
+Search-box suggestions from an in-process prefix index.
+
+Every approved turf contributes a suggestion for its name, and every city
+and district one for itself. Each suggestion is indexed under its full
+normalized label and under every later word of it ("green arena" is also
+found as "arena"), in one sorted array searched with `bisect`. Matches are
+ranked by weight: a turf's recent bookings, and for a place the sum over
+its turfs. One- and two-letter prefixes match too much to rank on every
+keystroke, so their top suggestions are kept precomputed.
+
+The index is an immutable snapshot swapped in whole, so lookups never lock.
+A turf change builds the next snapshot from the current one plus that turf
+(see `Turfs.signals`) and bumps a version stamp in the cache; other worker
+processes notice the new stamp and rebuild from the database. Snapshots
+are also rebuilt after AUTOCOMPLETE_MAX_AGE so booking counts stay fresh.
+
+`warm_up()` builds the index before a preforking server forks its workers
+(see `Turfie/wsgi.py`), so they start with it and share its memory pages.
+"""
+
+import bisect
+import gc
+import threading
+import time
+import unicodedata
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from heapq import nlargest
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Count
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Booking, Turf
+
+VERSION_KEY = 'turf_autocomplete:version'
+HOT_PREFIX_LENGTH = 2
+MAX_SUGGESTIONS = 10
+POPULARITY_DAYS = 30
+INCREMENTAL_REFRESH_LIMIT = 50
+
+Suggestion = namedtuple('Suggestion', 'kind label url weight')
+TurfEntry = namedtuple('TurfEntry', 'name city district weight')
+
+_index = None
+_rebuild_lock = threading.Lock()
+
+
+def normalize(text):
+    """Lower-cases, strips accents and collapses whitespace."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.casefold().split())
+
+
+def _terms(label):
+    """The index keys for a label: the whole label, then from each later word on."""
+    words = normalize(label).split(' ')
+    return {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+def _search_url(place):
+    return f"{reverse('turfs:turf_search')}?{urlencode({'q': place})}"
+
+
+class PrefixIndex:
+    """An immutable snapshot of the suggestions and their sorted keys."""
+
+    def __init__(self, turfs, version, suggestions=None, terms=None, refs=None, hot=None):
+        self.turfs = turfs
+        self.version = version
+        self.built_at = time.monotonic()
+        self.suggestions = self._suggestions(turfs) if suggestions is None else suggestions
+        if terms is None:
+            pairs = sorted(
+                (term, ref) for ref, suggestion in self.suggestions.items() for term in _terms(suggestion.label)
+            )
+            terms, refs = [term for term, _ in pairs], [ref for _, ref in pairs]
+        self.terms, self.refs = terms, refs
+        if hot is None:
+            hot = {}
+            for term, ref in zip(terms, refs):
+                for length in range(1, HOT_PREFIX_LENGTH + 1):
+                    hot.setdefault(term[:length], set()).add(ref)
+            hot = {prefix: self._rank(prefix_refs, MAX_SUGGESTIONS) for prefix, prefix_refs in hot.items()}
+        self.hot = hot
+
+    @staticmethod
+    def _suggestions(turfs, refs=None):
+        """Suggestions for every turf and place, or only for the given refs."""
+        suggestions, places = {}, {}
+        for turf_id, entry in turfs.items():
+            if refs is None or ('turf', turf_id) in refs:
+                suggestions[('turf', turf_id)] = Suggestion(
+                    'turf', entry.name, reverse('turfs:turf_detail', args=[turf_id]), entry.weight
+                )
+            for kind, place in (('city', entry.city), ('district', entry.district)):
+                key = (kind, normalize(place))
+                if key[1] and (refs is None or key in refs):
+                    label, weight = places.get(key, (place, 0))
+                    places[key] = (label, weight + entry.weight)
+        for (kind, key), (label, weight) in places.items():
+            suggestions[(kind, key)] = Suggestion(kind, label, _search_url(label), weight)
+        return suggestions
+
+    def _rank(self, refs, limit):
+        ranked = nlargest(limit, refs, key=lambda ref: (self.suggestions[ref].weight, ref[0] == 'turf'))
+        return [self.suggestions[ref] for ref in ranked]
+
+    def _scan(self, prefix, limit):
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + '\uffff', start)
+        return self._rank(set(self.refs[start:end]), limit)
+
+    def search(self, prefix, limit=MAX_SUGGESTIONS):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= HOT_PREFIX_LENGTH:
+            return self.hot.get(prefix, [])[:limit]
+        return self._scan(prefix, limit)
+
+    def replace_turf(self, turf_id, entry, version):
+        """
+        The next snapshot with one turf added, changed or (entry=None) removed.
+
+        Only the keys of that turf and of its old and new city and district
+        are spliced out of and back into copies of the sorted arrays, and
+        only the precomputed prefixes of those keys are re-ranked; nothing
+        is re-read from the database.
+        """
+        turfs = dict(self.turfs)
+        old = turfs.pop(turf_id, None)
+        if entry is not None:
+            turfs[turf_id] = entry
+        touched = {('turf', turf_id)} | {
+            (kind, normalize(place))
+            for turf in (old, entry) if turf is not None
+            for kind, place in (('city', turf.city), ('district', turf.district))
+        }
+        suggestions = {ref: suggestion for ref, suggestion in self.suggestions.items() if ref not in touched}
+        suggestions.update(self._suggestions(turfs, touched))
+        terms, refs = list(self.terms), list(self.refs)
+        changed_terms = set()
+        for ref in touched:
+            suggestion = self.suggestions.get(ref)
+            for term in _terms(suggestion.label) if suggestion else ():
+                position = bisect.bisect_left(terms, term)
+                while refs[position] != ref:
+                    position += 1
+                del terms[position], refs[position]
+                changed_terms.add(term)
+        for ref in touched:
+            suggestion = suggestions.get(ref)
+            for term in _terms(suggestion.label) if suggestion else ():
+                position = bisect.bisect_right(terms, term)
+                terms.insert(position, term)
+                refs.insert(position, ref)
+                changed_terms.add(term)
+
+        index = PrefixIndex(turfs, version, suggestions, terms, refs, hot=dict(self.hot))
+        for prefix in {term[:length] for term in changed_terms for length in range(1, HOT_PREFIX_LENGTH + 1)}:
+            ranked = index._scan(prefix, MAX_SUGGESTIONS)
+            if ranked:
+                index.hot[prefix] = ranked
+            else:
+                index.hot.pop(prefix, None)
+        return index
+
+
+def _turf_rows(queryset):
+    return queryset.filter(approval_status='approved', owner__is_active=True).values_list(
+        'id', 'name', 'city', 'district'
+    )
+
+
+def build_index(version=None):
+    """Reads every approved turf and its recent booking count into a new snapshot."""
+    since = timezone.now() - timedelta(days=POPULARITY_DAYS)
+    bookings = dict(
+        Booking.objects.filter(start_time__gte=since).exclude(status='cancelled')
+        .values('turf_id').annotate(count=Count('id')).values_list('turf_id', 'count')
+    )
+    turfs = {
+        turf_id: TurfEntry(name, city, district, 1 + bookings.get(turf_id, 0))
+        for turf_id, name, city, district in _turf_rows(Turf.objects.all())
+    }
+    return PrefixIndex(turfs, version)
+
+
+def _is_stale(index, version):
+    return (
+        index is None or index.version != version
+        or time.monotonic() - index.built_at > settings.AUTOCOMPLETE_MAX_AGE
+    )
+
+
+def get_index():
+    """The current snapshot, rebuilt first if another process changed a turf or it has aged out."""
+    global _index
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    if _is_stale(_index, version):
+        with _rebuild_lock:
+            if _is_stale(_index, version):
+                _index = build_index(version)
+    return _index
+
+
+def suggest(prefix, limit=MAX_SUGGESTIONS):
+    return get_index().search(prefix, limit)
+
+
+def refresh_turfs(turf_ids):
+    """Applies the turfs' current state to this process's snapshot and tells the others to rebuild."""
+    global _index
+    rows = {row[0]: row for row in _turf_rows(Turf.objects.filter(id__in=turf_ids))}
+    with _rebuild_lock:
+        version = uuid.uuid4().hex
+        cache.set(VERSION_KEY, version, None)
+        if _index is None:
+            return
+        if len(turf_ids) > INCREMENTAL_REFRESH_LIMIT:
+            # Splicing copies the arrays once per turf; past this, one rebuild is cheaper.
+            _index = build_index(version)
+            return
+        index = _index
+        for turf_id in turf_ids:
+            entry = None
+            if turf_id in rows:
+                old = index.turfs.get(turf_id)
+                entry = TurfEntry(*rows[turf_id][1:], old.weight if old else 1)
+            index = index.replace_turf(turf_id, entry, version)
+        _index = index
+
+
+def schedule_refresh(*turf_ids):
+    transaction.on_commit(lambda: refresh_turfs(turf_ids))
+
+
+def warm_up():
+    """
+    Builds the index in the server's master process before it forks.
+
+    Its database connection is closed so workers do not share it, and the
+    index is moved out of the garbage collector's reach (`gc.freeze`) so
+    collections in the workers do not write to, and so copy, its pages.
+    """
+    try:
+        get_index()
+    except DatabaseError:
+        # Not migrated yet: workers build the index on first use
+        return
+    finally:
+        connections.close_all()
+    gc.freeze()
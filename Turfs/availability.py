@@ -0,0 +1,170 @@
+# Turfs/availability.py
+
+"""
+Per-turf, per-day free-slot summaries for availability search.
+
+A turf's bookable slots are one hour long and start every hour from its
+opening time, so a day fits in a 24-bit mask with bit h standing for the
+slot that starts during hour h. `Turf.open_mask` marks the slots a turf
+offers; `DailySlotSummary.booked_mask` marks the ones taken on a given day.
+A slot in a search window is free when it is open and not booked, which
+the search query checks with bitwise operations against the summary row,
+found through its (turf, day) unique index.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .live import publish_slots
+from .models import Booking, DailySlotSummary, Turf
+
+HOURS_PER_DAY = 24
+BOOKING_HORIZON_DAYS = 7
+
+
+def last_bookable_day(today):
+    """The furthest day BookingForm accepts, and so the last one worth offering."""
+    return today + timedelta(days=BOOKING_HORIZON_DAYS)
+
+
+def slot_mask(opening_time, closing_time):
+    """Bits for every slot start between opening and closing time, like turf_detail_view's slot grid."""
+    if opening_time is None or closing_time is None:
+        return 0
+    mask = 0
+    start = datetime.combine(datetime.min, opening_time)
+    end = datetime.combine(datetime.min, closing_time)
+    while start < end:
+        mask |= 1 << start.hour
+        start += timedelta(hours=1)
+    return mask
+
+
+def window_mask(start, end):
+    """Bits for slots starting in [start, end); `end` of None means midnight."""
+    last = HOURS_PER_DAY if end is None else end.hour + (end.minute > 0)
+    mask = 0
+    for hour in range(start.hour, min(last, HOURS_PER_DAY)):
+        mask |= 1 << hour
+    return mask
+
+
+def _booked_mask(bookings, day, opening_time, closing_time):
+    """
+    Bits of the slots on `day` that overlap a booking. The slots are stepped
+    from the opening time, as in turf_detail_view, so a booking only marks
+    the slots it actually covers when the turf opens off the hour.
+    """
+    if opening_time is None or closing_time is None:
+        return 0
+    tz = timezone.get_current_timezone()
+    bookings = list(bookings)
+    current = timezone.make_aware(datetime.combine(day, opening_time), tz)
+    closing = timezone.make_aware(datetime.combine(day, closing_time), tz)
+    mask = 0
+    while current < closing:
+        slot_end = current + timedelta(hours=1)
+        if any(start < slot_end and end > current for start, end in bookings):
+            mask |= 1 << timezone.localtime(current, tz).hour
+        current = slot_end
+    return mask
+
+
+def _started_mask(now, minute):
+    """
+    Slots of today that have already started (and so cannot be booked), for
+    slots starting `minute` past each hour: every earlier hour's, and this
+    hour's once `now` has reached it.
+    """
+    return (1 << (now.hour + (now.minute >= minute))) - 1
+
+
+def refresh_days(turf_id, days):
+    """Recomputes the summaries of `turf_id` for `days` from its bookings, and pushes them to open turf pages."""
+    tz = timezone.get_current_timezone()
+    # A purged turf has no row left; its summaries go with it.
+    hours = Turf._base_manager.filter(pk=turf_id).values_list('opening_time', 'closing_time').first()
+    opening_time, closing_time = hours or (None, None)
+    for day in set(days):
+        day_start = timezone.make_aware(datetime.combine(day, time.min), tz)
+        bookings = Booking.objects.filter(
+            turf_id=turf_id, start_time__lt=day_start + timedelta(days=1), end_time__gt=day_start
+        ).exclude(status='cancelled').values_list('start_time', 'end_time')
+        mask = _booked_mask(bookings, day, opening_time, closing_time)
+        if mask:
+            DailySlotSummary.objects.update_or_create(turf_id=turf_id, day=day, defaults={'booked_mask': mask})
+        else:
+            DailySlotSummary.objects.filter(turf_id=turf_id, day=day).delete()
+        publish_slots(turf_id, day, mask)
+
+
+def refresh_booking(booking):
+    """Call after a booking is created or its status changes."""
+    start, end = timezone.localtime(booking.start_time), timezone.localtime(booking.end_time)
+    days = [start.date() + timedelta(days=offset) for offset in range((end.date() - start.date()).days + 1)]
+    refresh_days(booking.turf_id, days)
+
+
+def with_free_slot(turfs, day, start, end):
+    """
+    Restricts a Turf queryset to turfs with at least one free slot starting
+    between `start` and `end` on `day`.
+    """
+    mask = window_mask(start, end)
+    now = timezone.localtime()
+    if day == now.date():
+        # Earlier hours' slots have started everywhere; this hour's only at
+        # turfs whose slots start no later than the current minute.
+        earlier = (1 << now.hour) - 1
+        mask = Case(
+            When(opening_time__minute__lte=now.minute, then=Value(mask & ~(earlier | 1 << now.hour))),
+            default=Value(mask & ~earlier),
+        )
+    else:
+        mask = Value(mask)
+    booked = DailySlotSummary.objects.filter(turf=OuterRef('pk'), day=day).values('booked_mask')[:1]
+    return (
+        turfs.alias(
+            open_in_window=F('open_mask').bitand(mask),
+            booked=Coalesce(Subquery(booked), Value(0), output_field=IntegerField()),
+        )
+        .alias(booked_in_window=F('open_in_window').bitand(F('booked')))
+        .filter(open_in_window__gt=F('booked_in_window'))
+    )
+
+
+def next_available(turfs, now=None):
+    """
+    Maps turf id -> aware datetime of its next free slot within the booking
+    horizon (or None), using one query over the summaries.
+    """
+    now = timezone.localtime(now)
+    today = now.date()
+    turfs = list(turfs)
+    booked = {}
+    days = (last_bookable_day(today) - today).days + 1
+    rows = DailySlotSummary.objects.filter(
+        turf__in=[turf.id for turf in turfs], day__gte=today, day__lte=last_bookable_day(today)
+    ).values_list('turf_id', 'day', 'booked_mask')
+    for turf_id, day, mask in rows:
+        booked[turf_id, day] = mask
+
+    result = {}
+    for turf in turfs:
+        result[turf.id] = None
+        if not turf.open_mask:
+            continue
+        minute = turf.opening_time.minute
+        for offset in range(days):
+            day = today + timedelta(days=offset)
+            free = turf.open_mask & ~booked.get((turf.id, day), 0)
+            if offset == 0:
+                free &= ~_started_mask(now, minute)
+            if free:
+                hour = (free & -free).bit_length() - 1
+                result[turf.id] = timezone.make_aware(datetime.combine(day, time(hour, minute)))
+                break
+    return result
@@ -0,0 +1,84 @@
+# Turfs/events.py
+
+"""
+Append-only log of booking and turf state changes, and its change feed.
+
+Code that changes a booking or turf records what happened with `record`,
+inside the same transaction as the change, so the log holds exactly the
+changes that committed. Consumers read the feed with a cursor: the id of
+the last event they processed. Every page is one range scan on the
+primary key, however large the booking tables grow.
+
+Event kinds and their data:
+
+* booking.created - turf_id, user_id, start_time, end_time, amount, status
+* booking.status_changed - from, to
+* booking.payment_changed - payment_status, payment_id
+* booking.archived - moved to the archive table; its id is unchanged
+* turf.created - owner_id, name, approval_status
+* turf.updated - changed (the names of the edited fields)
+* turf.approval_changed - from, to
+* turf.deleted - the turf's bookings are deleted with it
+
+Ids come from one autoincrement sequence and SQLite serializes writers,
+so events become visible in id order and a cursor never skips one.
+"""
+
+import hmac
+
+from django.conf import settings
+
+from .models import ChangeEvent
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def booking_event(booking, kind, **data):
+    return ('booking', booking.id, kind, data)
+
+
+def turf_event(turf, kind, **data):
+    return ('turf', turf.id, kind, data)
+
+
+def booking_created(booking):
+    return booking_event(
+        booking, 'booking.created',
+        turf_id=booking.turf_id, user_id=booking.user_id, start_time=booking.start_time,
+        end_time=booking.end_time, amount=booking.amount, status=booking.status,
+    )
+
+
+def record(*events):
+    """
+    Appends events in a single INSERT. Call inside the transaction making the change.
+
+    Each argument is an `(entity, entity_id, kind, data)` tuple, usually
+    built with `booking_event` or `turf_event`.
+    """
+    return ChangeEvent.objects.bulk_create([
+        ChangeEvent(entity=entity, entity_id=entity_id, kind=kind, data=data)
+        for entity, entity_id, kind, data in events
+    ])
+
+
+def read_feed(after=0, limit=DEFAULT_PAGE_SIZE, entity=None):
+    """
+    The events after cursor `after`, oldest first.
+
+    Returns `(events, has_more)`; the next cursor is the last event's id.
+    """
+    events = ChangeEvent.objects.filter(id__gt=after).order_by('id')
+    if entity:
+        events = events.filter(entity=entity)
+    page = list(events[:limit + 1])
+    return page[:limit], len(page) > limit
+
+
+def valid_token(authorization):
+    """Checks an `Authorization: Bearer <token>` header against CHANGE_FEED_TOKEN."""
+    token = settings.CHANGE_FEED_TOKEN
+    if not token or not authorization or not authorization.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(authorization[len('Bearer '):].encode(), token.encode())
@@ -1,16 +1,47 @@
 # Turfs/forms.py
 
 from django import forms
-from .models import Turf, Amenity, Booking
+from django.db.models import Max
+from django.utils import timezone
+from .models import Turf, Amenity, Booking, TurfImage, PricingRule
+from .pricing import quote
+from .availability import BOOKING_HORIZON_DAYS, last_bookable_day, refresh_booking
+from . import events
 from django.core.exceptions import ValidationError
 from datetime import date,datetime, timedelta
 
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+class MultipleImageField(forms.ImageField):
+    """ An image field that accepts several uploads from one <input multiple>. """
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_file_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_file_clean(d, initial) for d in data]
+        return [single_file_clean(data, initial)] if data else []
+
 class TurfForm(forms.ModelForm):
+    MAX_GALLERY_IMAGES = 8
+
     amenities = forms.ModelMultipleChoiceField(
         queryset=Amenity.objects.all(),
         widget=forms.CheckboxSelectMultiple,
         required=False
     )
+    gallery_images = MultipleImageField(
+        required=False,
+        widget=MultipleFileInput(attrs={'class': 'form-control-file', 'accept': 'image/*'})
+    )
+    remove_images = forms.ModelMultipleChoiceField(
+        queryset=TurfImage.objects.none(),
+        widget=forms.CheckboxSelectMultiple,
+        required=False
+    )
 
     class Meta:
         model = Turf
@@ -35,6 +66,62 @@ class TurfForm(forms.ModelForm):
             'closing_time': forms.TimeInput(attrs={'class': 'form-control', 'type': 'time'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['remove_images'].queryset = self.instance.images.all()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        existing = self.instance.images.count() if self.instance.pk else 0
+        removed = len(cleaned_data.get('remove_images') or [])
+        added = len(cleaned_data.get('gallery_images') or [])
+        if existing - removed + added > self.MAX_GALLERY_IMAGES:
+            raise ValidationError(f"A turf can have at most {self.MAX_GALLERY_IMAGES} gallery images.")
+        return cleaned_data
+
+    def save_gallery(self, turf):
+        """ Adds newly uploaded gallery images and deletes the ones marked for removal. """
+        for image in self.cleaned_data.get('remove_images') or []:
+            # Its file and renditions are released by a post_delete handler (Turfs.signals).
+            image.delete()
+        next_position = (turf.images.aggregate(Max('position'))['position__max'] or 0) + 1
+        created = []
+        for offset, upload in enumerate(self.cleaned_data.get('gallery_images') or []):
+            created.append(TurfImage.objects.create(turf=turf, image=upload, position=next_position + offset))
+        return created
+
+class PricingRuleForm(forms.ModelForm):
+    """ One peak/off-peak, holiday or specific-date price on the turf's pricing page. """
+    class Meta:
+        model = PricingRule
+        fields = ['applies_to', 'date', 'start_hour', 'end_hour', 'price_per_hour', 'label']
+        widgets = {
+            'applies_to': forms.Select(attrs={'class': 'form-control'}),
+            'date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'start_hour': forms.NumberInput(attrs={'class': 'form-control', 'min': 0, 'max': 23}),
+            'end_hour': forms.NumberInput(attrs={'class': 'form-control', 'min': 1, 'max': 24}),
+            'price_per_hour': forms.NumberInput(attrs={'class': 'form-control'}),
+            'label': forms.TextInput(attrs={'class': 'form-control'}),
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        applies_to = cleaned_data.get('applies_to')
+        start_hour, end_hour = cleaned_data.get('start_hour'), cleaned_data.get('end_hour')
+        if applies_to in PricingRule.DATED and not cleaned_data.get('date'):
+            self.add_error('date', "Pick the date this price applies to.")
+        if applies_to not in PricingRule.DATED:
+            cleaned_data['date'] = None
+        if start_hour is not None and end_hour is not None:
+            if not (0 <= start_hour < end_hour <= 24):
+                raise ValidationError("Hours must satisfy 0 <= from < until <= 24.")
+        return cleaned_data
+
+PricingRuleFormSet = forms.inlineformset_factory(
+    Turf, PricingRule, form=PricingRuleForm, extra=3, can_delete=True
+)
+
 # --- NEW BOOKING FORM ---
 class BookingForm(forms.Form):
     """ A form for players to book a time slot. """
@@ -50,10 +137,11 @@ class BookingForm(forms.Form):
     def clean_date(self):
         selected_date = self.cleaned_data.get('date')
         if selected_date:
-            if selected_date < date.today():
+            today = timezone.localdate()
+            if selected_date < today:
                 raise ValidationError("You cannot book a date in the past.")
-            if selected_date > (date.today() + timedelta(days=7)):
-                raise ValidationError("You can only book up to 7 days in advance.")
+            if selected_date > last_bookable_day(today):
+                raise ValidationError(f"You can only book up to {BOOKING_HORIZON_DAYS} days in advance.")
         return selected_date
     
     def clean(self):
@@ -89,11 +177,27 @@ class BookingForm(forms.Form):
         # 5. Check for overlapping bookings
         conflicting_bookings = Booking.objects.filter(
             turf=self.turf,
-            start_time__lt=end_datetime,
-            end_time__gt=start_datetime
+            start_time__lt=timezone.make_aware(end_datetime),
+            end_time__gt=timezone.make_aware(start_datetime)
         ).exclude(status='cancelled')
 
         if conflicting_bookings.exists():
             raise ValidationError("This time slot is already booked. Please choose another time.")
 
         return cleaned_data
+
+    def save(self, user):
+        """ Creates the pending booking. Call inside the same transaction as is_valid(). """
+        date_val = self.cleaned_data['date']
+        start_datetime = timezone.make_aware(datetime.combine(date_val, self.cleaned_data['start_time']))
+        end_datetime = timezone.make_aware(datetime.combine(date_val, self.cleaned_data['end_time']))
+
+        amount = quote(self.turf, start_datetime, end_datetime)
+
+        booking = Booking.objects.create(
+            turf=self.turf, user=user, start_time=start_datetime,
+            end_time=end_datetime, amount=amount, status='pending'
+        )
+        refresh_booking(booking)
+        events.record(events.booking_created(booking))
+        return booking
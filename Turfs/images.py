@@ -0,0 +1,159 @@
+# Turfs/images.py
+
+"""
+Resized image renditions for uploaded turf and profile pictures.
+
+Every uploaded image gets a set of smaller WebP and JPEG copies (one per
+rendition and width) so pages never have to ship the original multi-megabyte
+upload. The generated file names are stored on the owning model in a
+`<field>_renditions` JSON column, which is what the `responsive_image`
+template tag reads to build `srcset` attributes.
+"""
+
+import io
+import logging
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from . import jobs
+from .media import release, stored_names
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height, widths to generate). Every width keeps the same aspect ratio.
+RENDITIONS = {
+    'thumbnail': (160, 120, (160, 320)),
+    'card': (480, 270, (480, 960)),
+    'hero': (1280, 800, (640, 1280, 1920)),
+    'receipt': (600, 340, (600,)),
+    'avatar': (96, 96, (48, 96, 192)),
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def rendition_name(source_name, rendition, width, fmt):
+    """Returns the storage path of one rendition of `source_name`."""
+    stem, _ = os.path.splitext(source_name)
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    return f'renditions/{stem}/{rendition}-{width}.{extension}'
+
+
+def _encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    buffer = io.BytesIO()
+    # Pillow only writes EXIF when it is passed explicitly, so re-encoding strips it.
+    image.save(buffer, format=pil_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_renditions(fieldfile, renditions):
+    """
+    Writes every requested rendition of `fieldfile` to storage.
+
+    Returns a mapping of `{rendition: [[width, webp_name, jpeg_name], ...]}`
+    suitable for storing in the model's `<field>_renditions` column.
+    """
+    from PIL import Image, ImageOps
+
+    with fieldfile.open('rb') as source:
+        original = Image.open(source)
+        original = ImageOps.exif_transpose(original)
+        original = original.convert('RGB')
+
+    result = {}
+    for rendition in renditions:
+        base_width, base_height, widths = RENDITIONS[rendition]
+        entries = []
+        for width in widths:
+            if width > original.width and entries:
+                # Never upscale; the smaller widths already cover this image.
+                break
+            height = round(width * base_height / base_width)
+            resized = ImageOps.fit(original, (width, height), Image.Resampling.LANCZOS)
+            names = []
+            for fmt in FORMATS:
+                name = rendition_name(fieldfile.name, rendition, width, fmt)
+                names.append(default_storage.save(name, _encode(resized, fmt)))
+            entries.append([width] + names)
+        result[rendition] = entries
+    return result
+
+
+def build_renditions(model, pk, field_name, renditions):
+    """
+    Generates renditions for one image field and saves their names.
+
+    The update is conditional on the field still pointing at the same file,
+    so a slow run never overwrites the renditions of a newer upload.
+    Renditions are saved under new names, never over the ones pages may be
+    showing; the replaced ones are released afterwards.
+    """
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return
+    fieldfile = getattr(instance, field_name)
+    if not fieldfile:
+        return
+    from PIL import Image
+
+    try:
+        data = generate_renditions(fieldfile, renditions)
+    except (OSError, Image.DecompressionBombError):
+        logger.exception("Could not build renditions for %s #%s (%s)", model.__name__, pk, field_name)
+        return
+    previous = getattr(instance, f'{field_name}_renditions')
+    updated = model._default_manager.filter(pk=pk, **{field_name: fieldfile.name}).update(
+        **{f'{field_name}_renditions': data}
+    )
+    # Release whichever set of renditions is no longer referenced (see Turfs.media).
+    release(stored_names(None, previous if updated else data))
+
+
+@jobs.task
+def build_renditions_task(model, pk, field_name, renditions):
+    build_renditions(apps.get_model(model), pk, field_name, renditions)
+
+
+def schedule_renditions(instance, field_name, renditions):
+    """
+    Queues a job that builds renditions for `instance.<field_name>`.
+
+    The upload request returns immediately; templates fall back to the
+    original file until a `runworkers` process has run the job.
+    """
+    if not getattr(instance, field_name):
+        return
+    jobs.enqueue(
+        build_renditions_task, model=instance._meta.label, pk=instance.pk,
+        field_name=field_name, renditions=list(renditions),
+    )
+
+
+# Renditions generated for each kind of image field.
+TURF_IMAGE_RENDITIONS = ('thumbnail', 'card', 'hero', 'receipt')
+GALLERY_IMAGE_RENDITIONS = ('thumbnail', 'hero')
+PROFILE_PICTURE_RENDITIONS = ('avatar',)
+
+
+def rendition_entries(fieldfile, rendition):
+    """Returns the stored `[width, webp_name, jpeg_name]` entries of one rendition, if built."""
+    if not fieldfile:
+        return []
+    renditions = getattr(fieldfile.instance, f'{fieldfile.field.name}_renditions', None) or {}
+    return renditions.get(rendition, [])
+
+
+def rendition_name_for(fieldfile, rendition, fmt='jpeg'):
+    """Returns the storage name of the largest built rendition, or the original file's name."""
+    entries = rendition_entries(fieldfile, rendition)
+    if not entries:
+        return fieldfile.name if fieldfile else None
+    width, webp_name, jpeg_name = entries[-1]
+    return webp_name if fmt == 'webp' else jpeg_name
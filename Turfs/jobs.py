@@ -0,0 +1,194 @@
+# Turfs/jobs.py
+
+"""
+A small database-backed job queue, run by `python manage.py runworkers`.
+
+Views call `enqueue(task_function, **kwargs)` and return at once. The job
+row is written in the caller's transaction, so a rolled-back request never
+leaves work behind. Workers claim ready jobs, highest priority first,
+with one conditional UPDATE. Under SQLite's single writer that statement
+is atomic. Databases that support it also skip rows locked by other
+workers (FOR UPDATE SKIP LOCKED). A failed job is retried with
+exponential backoff. After `max_attempts` failures it is marked 'dead'
+and kept for inspection. A claim is a lease: if a worker dies mid-job,
+the job is queued again once the lease runs out. Finished jobs are
+deleted, so the table only holds pending work.
+
+Only functions decorated with `@task` can be enqueued. Their arguments
+must be JSON-serializable.
+"""
+
+import logging
+import random
+import signal
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 10
+PRIORITY_DEFAULT = 0
+PRIORITY_LOW = -10
+# How often each runworkers process looks for jobs whose worker died
+REAP_INTERVAL = 60
+
+
+def task(func):
+    """Marks a module-level function as runnable by the job queue."""
+    func.is_job_task = True
+    return func
+
+
+def task_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, priority=PRIORITY_DEFAULT, delay=None, max_attempts=None, **kwargs):
+    """Queues `func(**kwargs)`; it becomes visible to workers when the current transaction commits."""
+    if not getattr(func, 'is_job_task', False):
+        raise ValueError(f"{task_name(func)} is not decorated with @task")
+    return Job.objects.create(
+        task=task_name(func),
+        kwargs=kwargs,
+        priority=priority,
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim(limit=1, now=None):
+    """Claims up to `limit` ready jobs for this worker and returns them."""
+    now = now or timezone.now()
+    token = uuid.uuid4()
+    with transaction.atomic():
+        ready = Job.objects.filter(status='queued', run_at__lte=now).order_by('-priority', 'run_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids, status='queued').update(
+            status='running', claim=token, lease_until=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+        )
+    return list(Job.objects.filter(claim=token, status='running').order_by('-priority', 'run_at', 'id'))
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: base, 2x base, 4x base, ... capped at an hour."""
+    delay = min(settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1), 60 * 60)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def run(job):
+    """Runs one claimed job and records the outcome. Returns True if it succeeded."""
+    try:
+        func = import_string(job.task)
+        if not getattr(func, 'is_job_task', False):
+            raise ValueError(f"{job.task} is not decorated with @task")
+        func(**job.kwargs)
+    except Exception:
+        attempts = job.attempts + 1
+        error = traceback.format_exc()
+        mine = Job.objects.filter(id=job.id, claim=job.claim)
+        if attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed for good after %s attempts", job.id, job.task, attempts)
+            mine.update(status='dead', attempts=attempts, claim=None, lease_until=None, last_error=error)
+        else:
+            logger.warning("Job %s (%s) failed, retrying", job.id, job.task)
+            mine.update(
+                status='queued', attempts=attempts, claim=None, lease_until=None, last_error=error,
+                run_at=timezone.now() + retry_delay(attempts),
+            )
+        return False
+    Job.objects.filter(id=job.id, claim=job.claim).delete()
+    return True
+
+
+def requeue_expired(now=None):
+    """
+    Queues again the jobs whose worker's lease ran out (the worker died, or
+    the job outlived JOB_LEASE_SECONDS); the lost run counts as an attempt.
+    Tasks should therefore be safe to run twice.
+    """
+    now = now or timezone.now()
+    requeued = 0
+    for job in Job.objects.filter(status='running', lease_until__lt=now):
+        attempts = job.attempts + 1
+        requeued += Job.objects.filter(id=job.id, claim=job.claim).update(
+            status='dead' if attempts >= job.max_attempts else 'queued',
+            attempts=attempts, claim=None, lease_until=None, run_at=now,
+            last_error="Worker lease expired before the job finished.",
+        )
+    return requeued
+
+
+def work(stop, poll_interval=None, burst=False):
+    """
+    One worker thread: claims and runs jobs until `stop` is set.
+
+    With `burst`, returns as soon as no job is ready instead of polling.
+    """
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            jobs = claim()
+            if not jobs:
+                if burst:
+                    break
+                stop.wait(poll_interval)
+                continue
+            for job in jobs:
+                run(job)
+                processed += 1
+    finally:
+        connection.close()
+    return processed
+
+
+def run_threads(threads, stop, poll_interval=None, burst=False):
+    """
+    Runs `threads` worker threads in this process until `stop` is set (or,
+    with `burst`, the queue is empty), requeueing expired leases meanwhile.
+    Returns the number of jobs run.
+    """
+    counts = []
+
+    def target():
+        counts.append(work(stop, poll_interval, burst))
+
+    pool = [threading.Thread(target=target, name=f'job-worker-{i}', daemon=True) for i in range(threads)]
+    last_reap = None
+    for thread in pool:
+        thread.start()
+    while any(thread.is_alive() for thread in pool):
+        if last_reap is None or time.monotonic() - last_reap > REAP_INTERVAL:
+            close_old_connections()
+            requeue_expired()
+            last_reap = time.monotonic()
+        time.sleep(0.2)
+    connection.close()
+    return sum(counts)
+
+
+def process_main(threads, stop, poll_interval=None, burst=False):
+    """Entry point of a `runworkers` child process; the parent handles Ctrl+C and SIGTERM."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        # Started with the 'spawn' method (Windows, macOS): nothing is inherited.
+        django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    run_threads(threads, stop, poll_interval, burst)
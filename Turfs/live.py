@@ -0,0 +1,84 @@
+# Turfs/live.py
+
+"""
+Live slot updates for the turf page.
+
+Every (turf, day) has a pub/sub channel (see Turfie.pubsub). Whenever
+`availability.refresh_days` recomputes a day's booked slots (a booking
+is made, confirmed, rejected or cancelled, or a turf is purged) the new
+`booked_mask` is published on it once the transaction commits. The turf page
+holds a Server-Sent Events stream open on its channel and updates the slot
+grid when a message arrives, instead of polling.
+
+Messages carry the whole mask, not the change, so a client that misses
+one is still right after the next. The mask is built on the turf's own
+slot grid (see `availability._booked_mask`): bit h is the slot that starts
+during hour h, whatever its minute.
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import SyncToAsync, sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+
+from Turfie import pubsub
+
+from .models import DailySlotSummary
+
+# How long a browser waits before reconnecting a dropped stream.
+RECONNECT_MS = 3000
+
+
+def slot_channel(turf_id, day):
+    return f'slots:{turf_id}:{day.isoformat()}'
+
+
+def publish_slots(turf_id, day, booked_mask):
+    """Publishes a day's booked slots after the current transaction commits."""
+    message = {'turf': turf_id, 'date': day.isoformat(), 'booked': booked_mask}
+    transaction.on_commit(lambda: pubsub.publish(slot_channel(turf_id, day), message))
+
+
+def _release_sync_thread():
+    """
+    Shuts down the worker thread Django's ASGI handler keeps for the current
+    request's sync code (session, auth and the database run there) until the
+    response ends. Sync code called later in the request gets a new one.
+    """
+    context = SyncToAsync.thread_sensitive_context.get(None)
+    executor = SyncToAsync.context_to_thread_executor.pop(context, None) if context else None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+def _event(name, data):
+    return f'event: {name}\ndata: {json.dumps(data)}\n\n'
+
+
+async def slot_events(turf_id, day):
+    """
+    The SSE stream of a turf's slots on `day`: the current state, then every
+    change, with a keep-alive comment while idle. Ends after
+    LIVE_STREAM_MAX_SECONDS; the browser then reconnects by itself.
+    """
+    subscription = pubsub.subscribe(slot_channel(turf_id, day))
+    try:
+        yield f'retry: {RECONNECT_MS}\n\n'
+        # Read after subscribing, so a booking made in between is not missed.
+        booked = await DailySlotSummary.objects.filter(turf_id=turf_id, day=day) \
+            .values_list('booked_mask', flat=True).afirst()
+        yield _event('slots', {'turf': turf_id, 'date': day.isoformat(), 'booked': booked or 0})
+        # Nothing below touches the database or runs sync code: close the connection and
+        # let the request's sync worker thread go, instead of holding both for the stream's lifetime.
+        await sync_to_async(connections.close_all)()
+        _release_sync_thread()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.LIVE_STREAM_MAX_SECONDS
+        while (remaining := deadline - loop.time()) > 0:
+            message = await subscription.get(timeout=min(settings.LIVE_STREAM_HEARTBEAT, remaining))
+            yield ': keep-alive\n\n' if message is None else _event('slots', message)
+    finally:
+        subscription.close()
@@ -0,0 +1,128 @@
+import multiprocessing
+import random
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from Turfs.forms import BookingForm
+from Turfs.models import Booking, Turf
+from Users.models import User
+
+OPENING_HOUR, CLOSING_HOUR = 6, 22
+
+
+def _book_until(args):
+    """Worker: books random one-hour slots through BookingForm until the deadline."""
+    worker, user_id, turf_ids, deadline = args
+    connections.close_all()
+    rng = random.Random(worker)
+    user = User.objects.get(pk=user_id)
+    turfs = {turf.pk: turf for turf in Turf.objects.filter(pk__in=turf_ids)}
+    counts = {'booked': 0, 'conflicts': 0, 'locked': 0, 'errors': 0}
+    latencies = []
+
+    while time.monotonic() < deadline:
+        hour = rng.randrange(OPENING_HOUR, CLOSING_HOUR)
+        form = BookingForm({
+            'date': date.today() + timedelta(days=rng.randint(1, 7)),
+            'start_time': dtime(hour),
+            'end_time': dtime(hour + 1),
+        }, turf=turfs[rng.choice(turf_ids)])
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                booking = form.save(user) if form.is_valid() else None
+        except OperationalError as exc:
+            counts['locked' if 'locked' in str(exc) else 'errors'] += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        counts['booked' if booking is not None else 'conflicts'] += 1
+
+    connections.close_all()
+    return counts, latencies
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks concurrent booking writes against a scratch SQLite database "
+        "using the development or production database profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--seconds', type=float, default=10.0)
+        parser.add_argument('--turfs', type=int, default=500, help="Number of turfs to spread bookings over.")
+        parser.add_argument('--profile', choices=['production', 'development'], default='production')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        scratch = tempfile.TemporaryDirectory(prefix='turfie-bench-')
+        db_settings = connections[DEFAULT_DB_ALIAS].settings_dict
+        connections.close_all()
+        db_settings['NAME'] = str(Path(scratch.name) / 'bench.sqlite3')
+        if options['profile'] == 'production':
+            db_settings['OPTIONS'] = dict(settings.SQLITE_PRODUCTION_OPTIONS)
+            db_settings['CONN_MAX_AGE'] = 600
+        else:
+            db_settings['OPTIONS'] = {}
+            db_settings['CONN_MAX_AGE'] = 0
+
+        self.stdout.write(f"Preparing scratch database in {scratch.name} ...")
+        call_command('migrate', verbosity=0, skip_checks=True)
+        owner = User.objects.create_user('bench_owner', user_type='turf_owner')
+        players = User.objects.bulk_create(
+            User(username=f'bench_player_{i}', user_type='player') for i in range(workers)
+        )
+        turfs = Turf.objects.bulk_create(
+            Turf(
+                owner=owner, name=f'Bench Turf {i}', price_per_hour=1000, approval_status='approved',
+                address_line_1='-', city='Bench', district='Bench', state='Bench', pincode='000000',
+                opening_time=dtime(OPENING_HOUR), closing_time=dtime(CLOSING_HOUR),
+            )
+            for i in range(options['turfs'])
+        )
+        turf_ids = [turf.pk for turf in turfs]
+        connections.close_all()
+
+        deadline = time.monotonic() + options['seconds']
+        jobs = [(i, players[i].pk, turf_ids, deadline) for i in range(workers)]
+        started = time.perf_counter()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            results = pool.map(_book_until, jobs)
+        elapsed = time.perf_counter() - started
+
+        totals = {'booked': 0, 'conflicts': 0, 'locked': 0, 'errors': 0}
+        latencies = []
+        for counts, worker_latencies in results:
+            for key, value in counts.items():
+                totals[key] += value
+            latencies.extend(worker_latencies)
+        latencies.sort()
+
+        double_booked = Booking.objects.raw(
+            'SELECT a.id FROM "Turfs_booking" a JOIN "Turfs_booking" b '
+            'ON a.turf_id = b.turf_id AND a.id < b.id '
+            'AND a.start_time < b.end_time AND b.start_time < a.end_time '
+            "WHERE a.status != 'cancelled' AND b.status != 'cancelled'"
+        )
+        double_booked = len(list(double_booked))
+        connections.close_all()
+        scratch.cleanup()
+
+        self.stdout.write(f"Profile:           {options['profile']} ({workers} workers, {elapsed:.1f}s)")
+        self.stdout.write(f"Bookings written:  {totals['booked']} ({totals['booked'] / elapsed:.0f} writes/sec)")
+        self.stdout.write(f"Slot conflicts:    {totals['conflicts']}")
+        self.stdout.write(f"Lock errors:       {totals['locked']}")
+        self.stdout.write(f"Other DB errors:   {totals['errors']}")
+        if latencies:
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            self.stdout.write(f"Latency p50/p99:   {p50:.1f} ms / {p99:.1f} ms")
+        style = self.style.SUCCESS if not (totals['locked'] or double_booked) else self.style.ERROR
+        self.stdout.write(style(f"Double bookings:   {double_booked}"))
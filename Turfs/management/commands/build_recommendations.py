@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Turfs.models import TurfRecommendation
+from Turfs.recommendations import build_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per-player turf recommendations shown on the player dashboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=settings.RECOMMENDATION_TOP_K)
+        parser.add_argument('--half-life-days', type=float, default=settings.RECOMMENDATION_POPULARITY_HALF_LIFE_DAYS)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        players = build_recommendations(options['top_k'], options['half_life_days'], options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Built recommendations for {players} player(s) in {elapsed:.1f}s "
+            f"({TurfRecommendation.objects.count()} row(s), including the cold-start list)."
+        ))
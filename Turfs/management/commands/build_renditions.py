@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from Turfs.images import (
+    build_renditions,
+    TURF_IMAGE_RENDITIONS, GALLERY_IMAGE_RENDITIONS, PROFILE_PICTURE_RENDITIONS,
+)
+from Turfs.models import Turf, TurfImage
+from Users.models import User
+
+TARGETS = [
+    (Turf, 'main_image', TURF_IMAGE_RENDITIONS),
+    (TurfImage, 'image', GALLERY_IMAGE_RENDITIONS),
+    (User, 'profile_picture', PROFILE_PICTURE_RENDITIONS),
+]
+
+
+class Command(BaseCommand):
+    help = "Builds resized WebP/JPEG renditions for uploaded images that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Rebuild renditions that already exist.")
+
+    def handle(self, *args, **options):
+        for model, field_name, renditions in TARGETS:
+            queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            if not options['force']:
+                queryset = queryset.filter(**{f'{field_name}_renditions': {}})
+            built = 0
+            for pk in queryset.values_list('pk', flat=True).iterator():
+                build_renditions(model, pk, field_name, renditions)
+                built += 1
+            self.stdout.write(f"{model.__name__}.{field_name}: processed {built} image(s)")
+        self.stdout.write(self.style.SUCCESS("Renditions are up to date."))
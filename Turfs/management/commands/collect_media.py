@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from Turfs.media import ContentAddressedStorage, collect_garbage, recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Removes uploaded files that nothing has referenced for MEDIA_GC_GRACE_SECONDS, "
+        "MEDIA_GC_BATCH_SIZE per transaction. Safe to run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be removed.")
+        parser.add_argument('--batch-size', type=int, default=settings.MEDIA_GC_BATCH_SIZE)
+        parser.add_argument('--grace-seconds', type=int, default=settings.MEDIA_GC_GRACE_SECONDS,
+                            help="Keep orphans younger than this.")
+        parser.add_argument('--recount', action='store_true',
+                            help="First recompute every reference count from the models. Run when the site is quiet.")
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("The default storage is not Turfs.media.ContentAddressedStorage.")
+        if options['recount'] and options['dry_run']:
+            raise CommandError("--recount updates the counts; it cannot be combined with --dry-run.")
+        if options['recount']:
+            self.stdout.write(f"Corrected the reference count of {recount(options['batch_size'])} file(s).")
+        removed, freed = collect_garbage(options['batch_size'], options['grace_seconds'], options['dry_run'])
+        verb = "Would remove" if options['dry_run'] else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {removed} unreferenced file(s), {freed} bytes."))
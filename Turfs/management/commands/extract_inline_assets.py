@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Turfie.minify import minify_css, minify_js
+
+BLOCK_RE = re.compile(r'<(style|script)\b([^>]*)>(.*?)</\1\s*>', re.S | re.I)
+LOAD_STATIC_RE = re.compile(r'{%\s*load\s[^%]*\bstatic\b')
+LEADING_LOAD_RE = re.compile(r'^({%\s*load\s+)')
+# {% extends %} must stay the first tag, so {% load static %} goes after it.
+LEADING_EXTENDS_RE = re.compile(r'^(\s*{%\s*extends\s[^%]*%}\n?)')
+TEMPLATE_SYNTAX = ('{{', '{%', '{#')
+JS_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+# Attributes that describe the inline block itself and do not carry over to the external tag.
+DROPPED_ATTRS_RE = re.compile(r'\s+type\s*=\s*["\']?text/(?:css|javascript)["\']?', re.I)
+SRC_ATTR_RE = re.compile(r'(?<![\w-])src\s*=', re.I)
+TYPE_ATTR_RE = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]+)', re.I)
+
+
+def _template_dirs():
+    """The project's own template directories, not those of installed packages."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = [Path(d) for engine in settings.TEMPLATES for d in engine.get('DIRS', [])]
+    dirs += [Path(app_config.path) / 'templates' for app_config in apps.get_app_configs()]
+    return [d for d in dirs if d.is_dir() and d.resolve().is_relative_to(base_dir)]
+
+
+def _gzipped_size(text):
+    return len(gzip.compress(text.encode('utf-8'), compresslevel=6, mtime=0))
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves inline <style>/<script> blocks out of the project's templates into static/bundles/ "
+        "so browsers can cache them, and reports the bytes each page sends before and after. "
+        "collectstatic minifies, hashes and precompresses the bundles (see Turfie/storage.py). "
+        "Blocks using template syntax, and smaller than INLINE_ASSET_MIN_BYTES, stay inline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only print the report; change no files.")
+        parser.add_argument('--min-bytes', type=int, default=settings.INLINE_ASSET_MIN_BYTES,
+                            help="Leave smaller blocks inline.")
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.min_bytes = options['min_bytes']
+        self.bundle_dir = Path(settings.STATICFILES_DIRS[0]) / 'bundles'
+        # Identical blocks in several templates share one bundle (and one cache entry).
+        self.bundles_by_digest = {}
+        self.bundle_sizes = {}
+
+        rows = []
+        for template_dir in _template_dirs():
+            for path in sorted(template_dir.rglob('*.html')):
+                name = path.relative_to(template_dir).as_posix()
+                if any(fnmatch(name, pattern) for pattern in settings.INLINE_ASSET_EXCLUDE):
+                    continue
+                before = path.read_text(encoding='utf-8')
+                after = self.extract(name, before)
+                if after != before and not self.dry_run:
+                    path.write_text(after, encoding='utf-8')
+                rows.append((name, before, after))
+        self.report(rows)
+
+    def extract(self, name, source):
+        counters = {}
+
+        def replace(match):
+            tag, attrs, body = match.group(1).lower(), match.group(2), match.group(3)
+            if tag == 'script':
+                script_type = TYPE_ATTR_RE.search(attrs)
+                if SRC_ATTR_RE.search(attrs) or (script_type and script_type.group(1).lower() not in JS_TYPES):
+                    return match.group(0)
+            if any(syntax in body for syntax in TEMPLATE_SYNTAX) or len(body.strip().encode()) < self.min_bytes:
+                return match.group(0)
+
+            extension = '.css' if tag == 'style' else '.js'
+            counters[extension] = counters.get(extension, 0) + 1
+            bundle = self.bundle(name, extension, counters[extension], body)
+            attrs = DROPPED_ATTRS_RE.sub('', attrs)
+            if tag == 'style':
+                return f'<link rel="stylesheet" href="{{% static \'{bundle}\' %}}"{attrs}>'
+            return f'<script src="{{% static \'{bundle}\' %}}"{attrs}></script>'
+
+        result = BLOCK_RE.sub(replace, source)
+        if result != source and not LOAD_STATIC_RE.search(result):
+            if LEADING_LOAD_RE.match(result):
+                result = LEADING_LOAD_RE.sub(r'\1static ', result, count=1)
+            elif LEADING_EXTENDS_RE.match(result):
+                result = LEADING_EXTENDS_RE.sub(lambda match: match.group(1) + '{% load static %}\n', result, count=1)
+            else:
+                result = '{% load static %}\n' + result
+        return result
+
+    def bundle(self, template_name, extension, number, body):
+        """Writes `body` to a bundle file (unless an identical one exists) and returns its static path."""
+        content = self.dedent(body)
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        if digest in self.bundles_by_digest:
+            return self.bundles_by_digest[digest]
+
+        stem = template_name.removesuffix('.html') + (f'-{number}' if number > 1 else '')
+        candidate = f'bundles/{stem}{extension}'
+        suffix = 1
+        # Never overwrite an existing bundle with different content.
+        while (self.bundle_dir.parent / candidate).exists() and \
+                (self.bundle_dir.parent / candidate).read_text(encoding='utf-8') != content:
+            suffix += 1
+            candidate = f'bundles/{stem}-{suffix}{extension}'
+        if not self.dry_run:
+            target = self.bundle_dir.parent / candidate
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content, encoding='utf-8')
+        self.bundles_by_digest[digest] = candidate
+        minify = minify_css if extension == '.css' else minify_js
+        self.bundle_sizes[candidate] = (len(content.encode()), len(minify(content).encode()))
+        return candidate
+
+    @staticmethod
+    def dedent(body):
+        """The block's contents as a standalone file: common indentation removed, one trailing newline."""
+        lines = body.strip('\n').splitlines()
+        indents = [len(line) - len(line.lstrip()) for line in lines if line.strip()]
+        cut = min(indents, default=0)
+        return '\n'.join(line[cut:].rstrip() for line in lines) + '\n'
+
+    def report(self, rows):
+        self.stdout.write(f"{'template':<42} {'before':>8} {'after':>8} {'saved':>7} {'after gz':>9}")
+        total_before = total_after = 0
+        for name, before, after in rows:
+            before_bytes, after_bytes = len(before.encode()), len(after.encode())
+            total_before += before_bytes
+            total_after += after_bytes
+            saved = f'{(1 - after_bytes / before_bytes) * 100:.0f}%' if before_bytes else '-'
+            self.stdout.write(
+                f"{name:<42} {before_bytes:>8} {after_bytes:>8} {saved:>7} {_gzipped_size(after):>9}"
+            )
+        self.stdout.write(f"{'total':<42} {total_before:>8} {total_after:>8}")
+
+        sizes = self.bundle_sizes
+        if sizes:
+            self.stdout.write("Bundles (source -> minified bytes, fetched once and cached):")
+            for bundle, (source_bytes, minified_bytes) in sorted(sizes.items()):
+                self.stdout.write(f"  {bundle:<48} {source_bytes:>7} -> {minified_bytes:>7}")
+        verb = "Would extract" if self.dry_run else "Extracted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(sizes)} bundle(s); page templates {total_before} -> {total_after} bytes."
+        ))
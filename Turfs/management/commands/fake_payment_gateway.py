@@ -0,0 +1,141 @@
+import json
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time as dtime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from Turfs import jobs
+from Turfs.models import Booking, PaymentEvent, Turf
+from Turfs.payments import EVENT_PAYMENT_STATUS, SIGNATURE_HEADER, sign
+from Users.models import Notification, User
+
+# Event sequences a booking can go through, as (event type, seconds after the first event)
+SCENARIOS = [
+    [('payment.succeeded', 0)],
+    [('payment.failed', 0), ('payment.succeeded', 30)],
+    [('payment.succeeded', 0), ('payment.refunded', 600)],
+    [('payment.failed', 0)],
+]
+
+
+def _events_for(booking, rng, counter):
+    first = time.time() - rng.randint(0, 3600)
+    events = []
+    for event_type, offset in rng.choice(SCENARIOS):
+        counter[0] += 1
+        events.append({
+            'id': f'evt_{counter[0]:08d}',
+            'type': event_type,
+            'created': first + offset,
+            'data': {'booking_id': booking.id, 'payment_id': f'pay_{booking.id}', 'amount': str(booking.amount)},
+        })
+    return events
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays thousands of signed payment webhooks, shuffled and with duplicate "
+        "deliveries, against a scratch database and checks every booking ends in the right state."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=2000)
+        parser.add_argument('--duplicate-rate', type=float, default=0.3,
+                            help="Fraction of events delivered a second time.")
+        parser.add_argument('--forged-rate', type=float, default=0.01,
+                            help="Fraction of deliveries sent with a bad signature.")
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        scratch = tempfile.TemporaryDirectory(prefix='turfie-payments-')
+        db_settings = connections[DEFAULT_DB_ALIAS].settings_dict
+        connections.close_all()
+        db_settings['NAME'] = str(Path(scratch.name) / 'payments.sqlite3')
+        db_settings['OPTIONS'] = dict(settings.SQLITE_PRODUCTION_OPTIONS)
+
+        self.stdout.write(f"Preparing scratch database in {scratch.name} ...")
+        call_command('migrate', verbosity=0, skip_checks=True)
+        owner = User.objects.create_user('gateway_owner', user_type='turf_owner')
+        player = User.objects.create_user('gateway_player')
+        turf = Turf.objects.create(
+            owner=owner, name='Gateway Turf', price_per_hour=1000, approval_status='approved',
+            address_line_1='-', city='Gateway', district='Gateway', state='Gateway', pincode='000000',
+            opening_time=dtime(6), closing_time=dtime(22),
+        )
+        start = timezone.now() + timedelta(days=1)
+        bookings = Booking.objects.bulk_create(
+            Booking(
+                turf=turf, user=player, amount=rng.choice([800, 1000, 1500]),
+                start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i + 1),
+            )
+            for i in range(options['bookings'])
+        )
+
+        counter = [0]
+        events = [event for booking in bookings for event in _events_for(booking, rng, counter)]
+        expected = {}
+        for event in sorted(events, key=lambda event: event['created']):
+            expected[event['data']['booking_id']] = EVENT_PAYMENT_STATUS[event['type']]
+        deliveries = events + [event for event in events if rng.random() < options['duplicate_rate']]
+        rng.shuffle(deliveries)
+        forged = {i for i in range(len(deliveries)) if rng.random() < options['forged_rate']}
+        # A forged delivery is followed by the gateway's genuine retry.
+        deliveries += [deliveries[i] for i in forged]
+
+        url = reverse('turfs:payment_webhook')
+
+        def deliver(indexed):
+            index, event = indexed
+            body = json.dumps(event).encode()
+            signature = sign(body) if index not in forged else sign(body, 'wrong-secret')
+            client = Client(HTTP_HOST='localhost')
+            started = time.perf_counter()
+            response = client.post(url, body, content_type='application/json', headers={SIGNATURE_HEADER: signature})
+            latency = time.perf_counter() - started
+            connections.close_all()
+            if response.status_code != 200:
+                return str(response.status_code), latency
+            return response.json()['status'], latency
+
+        self.stdout.write(f"Delivering {len(deliveries)} webhook(s) for {len(events)} event(s) ...")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            results = list(pool.map(deliver, enumerate(deliveries)))
+        elapsed = time.perf_counter() - started
+        # Run the queued player notifications, as a runworkers process would.
+        jobs.work(threading.Event(), burst=True)
+
+        outcomes = Counter(status for status, _ in results)
+        latencies = sorted(latency for _, latency in results)
+        final = dict(Booking.objects.values_list('id', 'payment_status'))
+        wrong = sum(1 for booking_id, status in expected.items() if final[booking_id] != status)
+        recorded = PaymentEvent.objects.count()
+        notified = Notification.objects.filter(kind__startswith='payment_').count()
+        applied = PaymentEvent.objects.filter(applied=True).count()
+        connections.close_all()
+        scratch.cleanup()
+
+        self.stdout.write(f"Throughput:        {len(deliveries) / elapsed:.0f} webhooks/sec ({options['workers']} workers)")
+        self.stdout.write(f"Latency p50/p99:   {latencies[len(latencies) // 2] * 1000:.1f} ms / "
+                          f"{latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+        for status in ('applied', 'ignored', 'duplicate', '403'):
+            self.stdout.write(f"  {status:<10} {outcomes[status]}")
+        self.stdout.write(f"Events recorded:   {recorded} of {len(events)}")
+        self.stdout.write(f"Notifications:     {notified} for {applied} applied event(s)")
+        ok = not wrong and recorded == len(events) and notified == applied
+        style = self.style.SUCCESS if ok else self.style.ERROR
+        self.stdout.write(style(f"Bookings in the wrong payment state: {wrong}"))
@@ -0,0 +1,124 @@
+import os
+import posixpath
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q, Sum
+
+from Turfs.media import (
+    BLOB_PREFIX, ContentAddressedStorage, file_digest, is_blob, media_fields, release, stored_names,
+)
+from Turfs.models import StoredFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves uploads stored under their original names (turf_images/, profile_pics/, renditions/) "
+        "into the content-addressed media storage, keeping one copy of identical files, and deletes "
+        "the originals. Can be interrupted and rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many files would move and how many are duplicates.")
+        parser.add_argument('--batch-size', type=int, default=100, help="Rows read per query.")
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("The default storage is not Turfs.media.ContentAddressedStorage.")
+        self.dry_run = options['dry_run']
+        self.files = self.bytes = self.duplicate_bytes = 0
+        self.digests = set()
+        self.emptied_dirs = set()
+        blob_bytes_before = StoredFile.objects.aggregate(size=Sum('size'))['size'] or 0
+
+        for model, field_name in media_fields():
+            renditions_field = f'{field_name}_renditions'
+            legacy = model._base_manager.exclude(
+                Q(**{f'{field_name}__isnull': True}) | Q(**{field_name: ''})
+                | Q(**{f'{field_name}__startswith': BLOB_PREFIX})
+            ).order_by('pk')
+            moved = missing = 0
+            last_pk = 0
+            while True:
+                rows = list(legacy.filter(pk__gt=last_pk).values_list('pk', field_name, renditions_field)
+                            [:options['batch_size']])
+                if not rows:
+                    break
+                last_pk = rows[-1][0]
+                for pk, name, renditions in rows:
+                    if self.migrate_row(model, pk, field_name, name, renditions):
+                        moved += 1
+                    else:
+                        missing += 1
+            self.stdout.write(f"{model.__name__}.{field_name}: {moved} moved, {missing} missing or changed meanwhile")
+
+        verb = "Would move" if self.dry_run else "Moved"
+        if self.dry_run:
+            stored = self.bytes - self.duplicate_bytes
+        else:
+            self.prune(self.emptied_dirs)
+            stored = (StoredFile.objects.aggregate(size=Sum('size'))['size'] or 0) - blob_bytes_before
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {self.files} file(s), {self.bytes} bytes, into {stored} bytes of blobs."
+        ))
+
+    def migrate_row(self, model, pk, field_name, name, renditions):
+        """Moves one row's file and renditions. Returns False if the file is missing or the row changed."""
+        claimed = []
+        try:
+            new_name = self.move(name, claimed)
+        except FileNotFoundError:
+            return False
+        try:
+            new_renditions = {
+                rendition: [[width, *(self.move(rendition_name, claimed) for rendition_name in names)]
+                            for width, *names in entries]
+                for rendition, entries in (renditions or {}).items()
+            }
+        except FileNotFoundError:
+            # `build_renditions` makes them again from the moved original.
+            release(claimed[1:])
+            claimed = claimed[:1]
+            new_renditions = {}
+        if self.dry_run:
+            return True
+
+        updated = model._base_manager.filter(pk=pk, **{field_name: name}).update(
+            **{field_name: new_name, f'{field_name}_renditions': new_renditions}
+        )
+        if not updated:
+            release(claimed)
+            return False
+        originals = [old for old in stored_names(name, renditions) if not is_blob(old)]
+        release(originals)
+        self.emptied_dirs.update(posixpath.dirname(old) for old in originals)
+        return True
+
+    def move(self, name, claimed):
+        """Saves a copy of a file as a blob and returns the blob's name (the name itself in a dry run)."""
+        if is_blob(name):
+            return name
+        with default_storage.open(name, 'rb') as source:
+            self.files += 1
+            self.bytes += source.size
+            if self.dry_run:
+                digest, size = file_digest(source)
+                if digest in self.digests or StoredFile.objects.filter(digest=digest).exists():
+                    self.duplicate_bytes += size
+                self.digests.add(digest)
+                return name
+            new_name = default_storage.save(name, source)
+        claimed.append(new_name)
+        return new_name
+
+    def prune(self, directories):
+        """Removes the directories the originals were in, and their parents, once they are empty."""
+        for directory in sorted(directories, key=len, reverse=True):
+            while directory:
+                try:
+                    os.rmdir(default_storage.path(directory))
+                except OSError:
+                    # Not empty, or already gone.
+                    break
+                directory = posixpath.dirname(directory)
@@ -0,0 +1,106 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: boot Django the way a WSGI worker does and
+# import every view module through the URLconf, then report what it cost.
+BOOT_SCRIPT = """
+import json, os, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+rss = None
+try:
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                rss = int(line.split()[1]) * 1024
+except OSError:
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss = usage if sys.platform == 'darwin' else usage * 1024
+    except ImportError:
+        pass
+print(json.dumps({'seconds': elapsed, 'rss': rss, 'modules': sorted(sys.modules)}))
+"""
+
+
+def _parse_importtime(stderr):
+    """`-X importtime` lines -> [(module, self_us, cumulative_us)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Boots the app in a fresh interpreter like a web worker and reports import time per "
+        "module and resident memory. With --check, fails when over the startup budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help="How many modules and packages to list.")
+        parser.add_argument('--check', action='store_true',
+                            help="Exit with an error if boot time, memory or eagerly imported modules exceed the budget.")
+        parser.add_argument('--runs', type=int, default=3, help="Boot this many times and keep the fastest.")
+
+    def boot(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'Turfie.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Booting the app failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1]), _parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        runs = [self.boot() for _ in range(max(options['runs'], 1))]
+        report, imports = min(runs, key=lambda run: run[0]['seconds'])
+        top = options['top']
+
+        by_package = defaultdict(int)
+        for name, self_us, _ in imports:
+            by_package[name.split('.')[0]] += self_us
+        self.stdout.write("Slowest top-level packages (own import time):")
+        for package, micros in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"  {micros / 1000:8.1f} ms  {package}")
+        self.stdout.write("Slowest modules (including what they import):")
+        for name, _, cumulative_us in sorted(imports, key=lambda row: -row[2])[:top]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+        seconds, rss = report['seconds'], report['rss']
+        rss_mb = rss / (1024 * 1024) if rss else None
+        self.stdout.write(f"Boot time: {seconds * 1000:.0f} ms (budget {settings.STARTUP_TIME_BUDGET_MS} ms)")
+        if rss_mb is not None:
+            self.stdout.write(f"Resident memory: {rss_mb:.1f} MB (budget {settings.STARTUP_RSS_BUDGET_MB} MB)")
+
+        if not options['check']:
+            return
+        problems = []
+        if seconds * 1000 > settings.STARTUP_TIME_BUDGET_MS:
+            problems.append(f"boot took {seconds * 1000:.0f} ms")
+        if rss_mb is not None and rss_mb > settings.STARTUP_RSS_BUDGET_MB:
+            problems.append(f"resident memory is {rss_mb:.1f} MB")
+        eager = sorted(
+            module for module in settings.STARTUP_LAZY_MODULES
+            if any(name == module or name.startswith(module + '.') for name in report['modules'])
+        )
+        if eager:
+            problems.append(f"imported at boot instead of on first use: {', '.join(eager)}")
+        if problems:
+            raise CommandError("Startup budget exceeded: " + "; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("Startup is within budget."))
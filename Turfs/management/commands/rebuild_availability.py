@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from Turfs.availability import BOOKING_HORIZON_DAYS, refresh_days
+from Turfs.models import Turf
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-day free-slot summaries used by availability search for the booking horizon."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=BOOKING_HORIZON_DAYS + 1,
+                            help="Number of days from today to rebuild.")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        days = [today + timedelta(days=offset) for offset in range(options['days'])]
+        turf_ids = list(Turf.objects.values_list('id', flat=True))
+        for turf_id in turf_ids:
+            refresh_days(turf_id, days)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(days)} day(s) of summaries for {len(turf_ids)} turf(s)."))
@@ -0,0 +1,59 @@
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from Turfs.jobs import process_main, run_threads
+
+
+class Command(BaseCommand):
+    help = "Runs background jobs from the database queue until stopped (Ctrl+C or SIGTERM)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.JOB_WORKER_PROCESSES)
+        parser.add_argument('--threads', type=int, default=settings.JOB_WORKER_THREADS,
+                            help="Worker threads per process.")
+        parser.add_argument('--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL,
+                            help="Seconds an idle worker waits before looking for jobs again.")
+        parser.add_argument('--burst', action='store_true',
+                            help="Exit once no job is ready instead of waiting for more.")
+
+    def handle(self, *args, **options):
+        processes, threads = options['processes'], options['threads']
+        poll_interval, burst = options['poll_interval'], options['burst']
+        self.stdout.write(f"Starting {processes} process(es) x {threads} thread(s).")
+
+        if processes <= 1:
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *args: stop.set())
+            try:
+                processed = run_threads(threads, stop, poll_interval, burst)
+            except KeyboardInterrupt:
+                stop.set()
+                processed = None
+            if processed is not None:
+                self.stdout.write(self.style.SUCCESS(f"Ran {processed} job(s)."))
+            return
+
+        # Children must not inherit open database connections.
+        connections.close_all()
+        stop = multiprocessing.Event()
+        children = [
+            multiprocessing.Process(target=process_main, args=(threads, stop, poll_interval, burst))
+            for _ in range(processes)
+        ]
+        for child in children:
+            child.start()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after the current jobs finish...")
+            stop.set()
+            for child in children:
+                child.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Turfs.reminders import due_reminders, send_booking_reminders
+
+
+class Command(BaseCommand):
+    help = "Emails reminders for bookings starting soon. Safe to run from cron while a previous run is still going."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=settings.BOOKING_REMINDER_HOURS,
+                            help="Remind bookings starting within this many hours.")
+        parser.add_argument('--batch-size', type=int, default=settings.BOOKING_REMINDER_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many reminders are due.")
+
+    def handle(self, *args, **options):
+        statuses = settings.BOOKING_REMINDER_STATUSES
+        if options['dry_run']:
+            due = due_reminders(options['hours'], statuses).count()
+            self.stdout.write(f"{due} reminder(s) due in the next {options['hours']:g} hour(s).")
+            return
+
+        started = time.perf_counter()
+        claimed = sent = 0
+        for batch_claimed, batch_sent in send_booking_reminders(options['hours'], statuses, options['batch_size']):
+            claimed += batch_claimed
+            sent += batch_sent
+            self.stdout.write(f"  {claimed} booking(s) processed, {sent} email(s) sent")
+        elapsed = time.perf_counter() - started
+
+        rate = f" ({claimed / elapsed * 60:.0f} bookings/min)" if claimed else ""
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} reminder(s) for {claimed} booking(s) in {elapsed:.2f}s{rate}."))
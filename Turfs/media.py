@@ -0,0 +1,277 @@
+# Turfs/media.py
+
+"""
+Content-addressed storage for uploaded images and their renditions.
+
+`ContentAddressedStorage` (the default storage) files every upload under
+the SHA-256 digest of its contents,
+`blobs/<2 hex digits>/<2 hex digits>/<digest><extension>`, whatever name
+or `upload_to` directory it was saved with. The two levels of at most 256
+directories keep every directory small. Identical uploads (the same photo
+on several turfs, a rendition rebuilt from an unchanged original) are
+stored once.
+
+Each blob has a `StoredFile` row counting its references: `save()` adds
+one and `delete()` drops one. A blob whose count reaches zero is only
+marked as orphaned; `collect_garbage` (`python manage.py collect_media`,
+from cron) removes orphans older than MEDIA_GC_GRACE_SECONDS, in batches.
+Cached pages that still show an old image keep working until then.
+
+References are dropped when an image is replaced or its row deleted
+(through the models' save and delete signals, so purges are covered) and by
+`images.build_renditions` when it replaces renditions. A reference lost any
+other way (a raw UPDATE, a crash between steps) is drift, which
+`collect_media --recount` corrects from the file names the models
+actually hold.
+
+Files saved before this storage was enabled keep their names and are
+deleted outright; `python manage.py migrate_media` moves them into blobs.
+"""
+
+import hashlib
+import os
+import re
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DateTimeField, F, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import StoredFile
+
+BLOB_PREFIX = 'blobs/'
+EXTENSION_RE = re.compile(r'^\.[a-z0-9]{1,10}$')
+
+# (model, file field) pairs whose files are reference counted. Each model
+# also has a `<field>_renditions` column (see Turfs.images).
+MEDIA_FIELDS = [
+    ('Turfs.Turf', 'main_image'),
+    ('Turfs.TurfImage', 'image'),
+    ('Users.User', 'profile_picture'),
+]
+
+
+def is_blob(name):
+    return name.startswith(BLOB_PREFIX)
+
+
+def blob_name(digest, extension):
+    extension = extension.lower()
+    if not EXTENSION_RE.match(extension):
+        extension = ''
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def file_digest(content):
+    """`(sha256 hex digest, size)` of a File, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _claim(digest):
+    """Adds a reference to the blob with `digest` and returns its name, or None if there is no such blob."""
+    if StoredFile.objects.filter(digest=digest).update(ref_count=F('ref_count') + 1, orphaned_at=None):
+        return StoredFile.objects.values_list('name', flat=True).get(digest=digest)
+    return None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that stores each distinct content once, under its digest, and counts references."""
+
+    def _save(self, name, content):
+        digest, size = file_digest(content)
+        # Claiming first locks the blob row, so collect_garbage cannot remove it under us.
+        with transaction.atomic():
+            name_in_store = _claim(digest)
+            if name_in_store is None:
+                name_in_store = blob_name(digest, os.path.splitext(name)[1])
+                try:
+                    with transaction.atomic():
+                        StoredFile.objects.create(digest=digest, name=name_in_store, size=size, ref_count=1)
+                except IntegrityError:
+                    # The same content was uploaded concurrently.
+                    name_in_store = _claim(digest)
+            if not self.exists(name_in_store):
+                written = super()._save(name_in_store, content)
+                if written != name_in_store:
+                    # An identical file appeared since the check; keep one copy.
+                    super().delete(written)
+        return name_in_store
+
+    def delete(self, name):
+        """Drops one reference to a blob. Files from before blobs are deleted at once."""
+        self.release([name])
+
+    def release(self, names):
+        """Drops one reference per occurrence of each name, with one UPDATE for all of them."""
+        counts = Counter(name for name in names if name)
+        by_count = defaultdict(list)
+        for name, count in counts.items():
+            if is_blob(name):
+                by_count[count].append(name)
+            else:
+                super().delete(name)
+        now = timezone.now()
+        for count, group in by_count.items():
+            StoredFile.objects.filter(name__in=group, ref_count__gt=0).update(
+                ref_count=Greatest(F('ref_count') - count, Value(0)),
+                # Evaluated against the count before this update.
+                orphaned_at=Case(
+                    When(ref_count__lte=count, then=Value(now)), default=None, output_field=DateTimeField(),
+                ),
+            )
+
+    def remove(self, name):
+        """Deletes a blob's file, whatever its count. Only for collect_garbage."""
+        super().delete(name)
+
+
+def media_fields():
+    """`(model class, field name)` for every reference-counted image field."""
+    return [(apps.get_model(label), field_name) for label, field_name in MEDIA_FIELDS]
+
+
+def stored_names(name, renditions):
+    """The file an image field holds and every rendition built from it."""
+    names = [name] if name else []
+    for entries in (renditions or {}).values():
+        for width, *rendition_names in entries:
+            names.extend(rendition_names)
+    return names
+
+
+def release(names):
+    """Drops a reference to each of `names` once the current transaction commits."""
+    names = [name for name in names if name]
+    if not names:
+        return
+
+    def drop():
+        if hasattr(default_storage, 'release'):
+            default_storage.release(names)
+        else:
+            for name in names:
+                default_storage.delete(name)
+
+    transaction.on_commit(drop)
+
+
+def _renditions_field(field_name):
+    return f'{field_name}_renditions'
+
+
+def _current_names(instance, field_name):
+    renditions_field = _renditions_field(field_name)
+    return type(instance)._base_manager.filter(pk=instance.pk).values_list(field_name, renditions_field).first()
+
+
+def remember_replaced(instance, field_name, update_fields=None):
+    """
+    pre_save: if the save puts a different file in `field_name`, clears the
+    renditions of the old one (a job builds new ones) and notes both for
+    `release_remembered`. A save whose `update_fields` name the image but not
+    its renditions has the renditions column cleared after it, so the row
+    never keeps names whose references were dropped.
+    """
+    if instance._state.adding or (update_fields is not None and field_name not in update_fields):
+        return
+    current = _current_names(instance, field_name)
+    if current is None:
+        return
+    # An upload not yet saved still has its original name, which never matches a stored one.
+    if (getattr(instance, field_name).name or '') != (current[0] or ''):
+        renditions_field = _renditions_field(field_name)
+        instance._released_media = stored_names(*current)
+        setattr(instance, renditions_field, {})
+        if update_fields is not None and renditions_field not in update_fields:
+            instance._unsaved_renditions = renditions_field
+
+
+def remember_deleted(instance, field_name):
+    """
+    pre_delete: notes the row's file and renditions for `release_remembered`.
+    They are read from the row, since a job may have built renditions since
+    `instance` was loaded.
+    """
+    current = _current_names(instance, field_name)
+    if current is not None:
+        instance._released_media = stored_names(*current)
+
+
+def release_remembered(instance):
+    """post_save / post_delete: releases what `remember_replaced` or `remember_deleted` noted."""
+    renditions_field = instance.__dict__.pop('_unsaved_renditions', None)
+    if renditions_field is not None:
+        type(instance)._base_manager.filter(pk=instance.pk).update(**{renditions_field: {}})
+    release(instance.__dict__.pop('_released_media', []))
+
+
+def collect_garbage(batch_size, grace_seconds, dry_run=False):
+    """
+    Removes blobs that have had no references for `grace_seconds`, and their
+    files, `batch_size` at a time. Returns `(blobs, bytes)` removed (or that
+    would be, with `dry_run`).
+    """
+    orphans = StoredFile.objects.filter(
+        orphaned_at__lt=timezone.now() - timedelta(seconds=grace_seconds), ref_count=0,
+    ).order_by('orphaned_at')
+    if dry_run:
+        totals = orphans.aggregate(blobs=Count('id'), size=Sum('size'))
+        return totals['blobs'], totals['size'] or 0
+
+    removed = freed = 0
+    while True:
+        blobs = list(orphans.values_list('id', 'name', 'size')[:batch_size])
+        if not blobs:
+            break
+        with transaction.atomic():
+            for blob_id, name, size in blobs:
+                # An upload may have claimed the blob since the SELECT. The DELETE repeats the
+                # orphan conditions (StoredFile has no relations or delete signals, so it is one
+                # statement), and the file goes only if the row did; a claimed blob is skipped
+                # here and no longer selected.
+                deleted, _ = orphans.filter(id=blob_id).delete()
+                if deleted:
+                    default_storage.remove(name)
+                    removed += 1
+                    freed += size
+    return removed, freed
+
+
+def recount(batch_size):
+    """
+    Sets every blob's reference count to the number of references the
+    models actually hold. Returns the number of blobs corrected. Uploads
+    during the scan can be miscounted, so run it when the site is quiet.
+    """
+    counts = Counter()
+    for model, field_name in media_fields():
+        rows = model._base_manager.values_list(field_name, _renditions_field(field_name))
+        for name, renditions in rows.iterator(chunk_size=batch_size):
+            counts.update(name for name in stored_names(name, renditions) if is_blob(name))
+
+    corrected = 0
+    now = timezone.now()
+    last_id = 0
+    while True:
+        blobs = list(StoredFile.objects.filter(id__gt=last_id).order_by('id')
+                     .values_list('id', 'name', 'ref_count', 'orphaned_at')[:batch_size])
+        if not blobs:
+            break
+        last_id = blobs[-1][0]
+        for blob_id, name, ref_count, orphaned_at in blobs:
+            actual = counts.get(name, 0)
+            if actual != ref_count:
+                StoredFile.objects.filter(id=blob_id).update(
+                    ref_count=actual, orphaned_at=None if actual else (orphaned_at or now),
+                )
+                corrected += 1
+    return corrected
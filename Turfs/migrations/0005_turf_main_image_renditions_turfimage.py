@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Turfs', '0004_turf_approval_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='turf',
+            name='main_image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.CreateModel(
+            name='TurfImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(upload_to='turf_images/gallery/')),
+                ('image_renditions', models.JSONField(blank=True, default=dict, editable=False)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('turf', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='Turfs.turf')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+            },
+        ),
+    ]
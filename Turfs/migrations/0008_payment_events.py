@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Turfs', '0007_booking_reminder_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentEvent',
+            fields=[
+                ('event_id', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('event_type', models.CharField(max_length=40)),
+                ('booking_id', models.BigIntegerField(db_index=True)),
+                ('created', models.DateTimeField(help_text='When the gateway created the event.')),
+                ('payload', models.JSONField()),
+                ('applied', models.BooleanField(default=False, help_text='False if the event was stale or did not match a booking.')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedbooking',
+            name='payment_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='payment_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Turfs', '0008_payment_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='turf',
+            name='price_table',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.CreateModel(
+            name='PricingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('applies_to', models.CharField(choices=[('weekday', 'Weekdays (Mon-Fri)'), ('weekend', 'Weekends (Sat-Sun)'), ('holiday', 'Holiday'), ('slot', 'Specific date')], max_length=10)),
+                ('date', models.DateField(blank=True, help_text='Required for holiday and specific-date rules.', null=True)),
+                ('start_hour', models.PositiveSmallIntegerField(default=0, help_text='First hour covered (0-23).')),
+                ('end_hour', models.PositiveSmallIntegerField(default=24, help_text='Hour the rule stops at (1-24).')),
+                ('price_per_hour', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('label', models.CharField(blank=True, help_text='e.g. Peak hours, Diwali', max_length=100)),
+                ('turf', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pricing_rules', to='Turfs.turf')),
+            ],
+            options={
+                'ordering': ['applies_to', 'date', 'start_hour'],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:14
+
+from django.db import migrations, models
+
+
+def backfill_amenity_bits(apps, schema_editor):
+    Amenity = apps.get_model('Turfs', 'Amenity')
+    Turf = apps.get_model('Turfs', 'Turf')
+    bits = {}
+    for bit, amenity in enumerate(Amenity.objects.order_by('id')):
+        amenity.bit = bit
+        amenity.save(update_fields=['bit'])
+        bits[amenity.id] = bit
+    masks = {}
+    for turf_id, amenity_id in Turf.amenities.through.objects.values_list('turf_id', 'amenity_id'):
+        masks[turf_id] = masks.get(turf_id, 0) | (1 << bits[amenity_id])
+    for turf_id, mask in masks.items():
+        Turf.objects.filter(pk=turf_id).update(amenity_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Turfs', '0009_pricing_rules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='amenity',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='turf',
+            name='amenity_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_amenity_bits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:17
+
+from datetime import datetime, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_open_masks(apps, schema_editor):
+    Turf = apps.get_model('Turfs', 'Turf')
+    for turf in Turf.objects.only('opening_time', 'closing_time'):
+        mask = 0
+        start = datetime.combine(datetime.min, turf.opening_time)
+        end = datetime.combine(datetime.min, turf.closing_time)
+        while start < end:
+            mask |= 1 << start.hour
+            start += timedelta(hours=1)
+        Turf.objects.filter(pk=turf.pk).update(open_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Turfs', '0010_search_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='turf',
+            name='open_mask',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='DailySlotSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('booked_mask', models.IntegerField(default=0)),
+                ('turf', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_summaries', to='Turfs.turf')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('turf', 'day'), name='unique_slot_summary_per_day')],
+            },
+        ),
+        migrations.RunPython(backfill_open_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:27
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Turfs', '0012_turf_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('booking', 'Booking'), ('turf', 'Turf')], max_length=10)),
+                ('entity_id', models.BigIntegerField()),
+                ('kind', models.CharField(max_length=40)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['entity', 'id'], name='Turfs_chang_entity_e264f6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 20:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Turfs', '0016_stored_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_reminder_due_idx',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='reminder_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('reminder_sent_at__isnull', True)), fields=['start_time'], name='booking_reminder_due_idx'),
+        ),
+    ]
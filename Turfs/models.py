@@ -2,12 +2,18 @@
 
 from django.db import models
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 
 class Amenity(models.Model):
     """Represents a single amenity that a turf can offer, like Parking or Floodlights."""
+    MAX_AMENITIES = 63  # one bit each in Turf.amenity_mask
+
     name = models.CharField(max_length=100, unique=True)
     # You can store the Font Awesome class, e.g., 'fas fa-parking'
     icon_class = models.CharField(max_length=50, blank=True, null=True)
+    # This amenity's bit in Turf.amenity_mask, assigned on first save
+    bit = models.PositiveSmallIntegerField(unique=True, null=True, editable=False)
 
     class Meta:
         verbose_name_plural = "Amenities" # Corrects plural form in admin
@@ -15,6 +21,21 @@ class Amenity(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            used = set(Amenity.objects.exclude(bit=None).values_list('bit', flat=True))
+            free = [bit for bit in range(self.MAX_AMENITIES) if bit not in used]
+            if not free:
+                raise ValidationError(f"A site can have at most {self.MAX_AMENITIES} amenities.")
+            self.bit = free[0]
+        super().save(*args, **kwargs)
+
+class TurfManager(models.Manager):
+    """Hides turfs that are waiting to be purged (see Turfs.purge)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 class Turf(models.Model):
         # --- NEW APPROVAL STATUS ---
     APPROVAL_CHOICES = [
@@ -37,6 +58,10 @@ class Turf(models.Model):
     description = models.TextField(blank=True)
     price_per_hour = models.DecimalField(max_digits=8, decimal_places=2)
     main_image = models.ImageField(upload_to='turf_images/', blank=True, null=True)
+    # Resized copies of main_image, filled in by Turfs.images after upload
+    main_image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Hourly prices compiled from pricing_rules by Turfs.pricing; empty means a flat price_per_hour
+    price_table = models.JSONField(default=dict, blank=True, editable=False)
 
     # --- New Detailed Location Fields ---
     address_line_1 = models.CharField(max_length=255, help_text="Street address, building, etc.")
@@ -49,21 +74,130 @@ class Turf(models.Model):
     # --- New Time Fields ---
     opening_time = models.TimeField()
     closing_time = models.TimeField()
+    # Bit h is set when a one-hour slot starts in hour h (see Turfs.availability)
+    open_mask = models.IntegerField(default=0, editable=False)
 
     # --- New Many-to-Many relationship for Amenities ---
     amenities = models.ManyToManyField(Amenity, blank=True)
+    # Bitset of the amenities above (see Amenity.bit), kept in sync by Turfs.signals for faceted search
+    amenity_mask = models.BigIntegerField(default=0, editable=False)
 
     # --- Existing Fields ---
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
     review_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the owner deletes the turf; the rows are purged in the background
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = TurfManager()
+    all_objects = models.Manager()
     
     # We are removing the old 'location' field. Migrations will handle this.
 
     def __str__(self):
         return f"{self.name} ({self.city})"
 
+    def save(self, *args, **kwargs):
+        from .availability import slot_mask
+        self.open_mask = slot_mask(self.opening_time, self.closing_time)
+        if kwargs.get('update_fields') is not None and {'opening_time', 'closing_time'} & set(kwargs['update_fields']):
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'open_mask'}
+        super().save(*args, **kwargs)
+
+class TurfImage(models.Model):
+    """An additional photo shown in a turf's gallery."""
+    turf = models.ForeignKey(Turf, on_delete=models.CASCADE, related_name='images')
+    image = models.ImageField(upload_to='turf_images/gallery/')
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    position = models.PositiveSmallIntegerField(default=0)
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['position', 'id']
+
+    def __str__(self):
+        return f"Image {self.position} of {self.turf.name}"
+
+class PricingRule(models.Model):
+    """
+    An owner-defined price for some hours of the day, replacing price_per_hour.
+
+    Weekday and weekend rules repeat every week. Holiday and slot rules apply
+    to a single date; on that date holiday rules override the weekly rules
+    and slot rules override everything else.
+    """
+    APPLIES_TO_CHOICES = [
+        ('weekday', 'Weekdays (Mon-Fri)'),
+        ('weekend', 'Weekends (Sat-Sun)'),
+        ('holiday', 'Holiday'),
+        ('slot', 'Specific date'),
+    ]
+    DATED = ('holiday', 'slot')
+
+    turf = models.ForeignKey(Turf, on_delete=models.CASCADE, related_name='pricing_rules')
+    applies_to = models.CharField(max_length=10, choices=APPLIES_TO_CHOICES)
+    date = models.DateField(blank=True, null=True, help_text="Required for holiday and specific-date rules.")
+    start_hour = models.PositiveSmallIntegerField(default=0, help_text="First hour covered (0-23).")
+    end_hour = models.PositiveSmallIntegerField(default=24, help_text="Hour the rule stops at (1-24).")
+    price_per_hour = models.DecimalField(max_digits=8, decimal_places=2)
+    label = models.CharField(max_length=100, blank=True, help_text="e.g. Peak hours, Diwali")
+
+    class Meta:
+        ordering = ['applies_to', 'date', 'start_hour']
+
+    def __str__(self):
+        when = self.date if self.applies_to in self.DATED else self.get_applies_to_display()
+        return f"{self.turf.name}: {when} {self.start_hour:02d}:00-{self.end_hour:02d}:00 @ {self.price_per_hour}"
+
+class DailySlotSummary(models.Model):
+    """
+    Which of a turf's hourly slots are taken on one day, as a bitset.
+
+    Rewritten by Turfs.availability whenever a booking on that day is
+    created or changes status. Days without a row have no bookings.
+    """
+    turf = models.ForeignKey(Turf, on_delete=models.CASCADE, related_name='slot_summaries')
+    day = models.DateField()
+    booked_mask = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['turf', 'day'], name='unique_slot_summary_per_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.turf.name} on {self.day}: {self.booked_mask:024b}"
+
+class TurfRecommendation(models.Model):
+    """
+    One precomputed "Recommended Turfs" entry, written by the
+    `build_recommendations` command (see Turfs.recommendations).
+
+    Rows with no user are the cold-start list shown to players the job has
+    nothing personal for yet.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='turf_recommendations',
+        null=True, blank=True,
+    )
+    turf = models.ForeignKey(Turf, on_delete=models.CASCADE, related_name='recommendations')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['user', 'rank']
+        constraints = [
+            # Also the index the player dashboard reads through
+            models.UniqueConstraint(fields=['user', 'rank'], name='unique_recommendation_rank'),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.turf.name} for {self.user.username if self.user else 'everyone'}"
+
 class Booking(models.Model):
     """Represents a booking made by a player for a specific turf."""
     STATUS_CHOICES = [
@@ -85,7 +219,30 @@ class Booking(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     payment_id = models.CharField(max_length=100, blank=True, null=True)
     payment_status = models.CharField(max_length=20, default='unpaid')
+    # Gateway timestamp of the last payment webhook applied; older events are ignored
+    payment_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
     booked_at = models.DateTimeField(auto_now_add=True)
+    # Set by the reminder scheduler: the run that claimed the booking, when (claims expire, see
+    # Turfs.reminders), and when its email went out
+    reminder_claim = models.UUIDField(null=True, blank=True, editable=False)
+    reminder_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    is_archived = False
+
+    class Meta:
+        indexes = [
+            # Overlap checks and per-turf/per-player listings
+            models.Index(fields=['turf', 'start_time']),
+            models.Index(fields=['user', 'start_time']),
+            # Finding bookings to archive
+            models.Index(fields=['status', 'end_time']),
+            # Upcoming bookings still waiting for a reminder; shrinks as reminders go out
+            models.Index(
+                fields=['start_time'], name='booking_reminder_due_idx',
+                condition=models.Q(reminder_sent_at__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return f"Booking for {self.turf.name} by {self.user.username} on {self.start_time.strftime('%Y-%m-%d')}"
@@ -95,3 +252,179 @@ class Booking(models.Model):
         if self.start_time and self.end_time:
             return (self.end_time - self.start_time).total_seconds() / 3600
         return 0
+
+class ArchivedBooking(models.Model):
+    """
+    A completed or cancelled booking moved out of the hot Booking table by
+    the `archive_bookings` command. It keeps its original id, so booking
+    detail pages and receipts keep working for old bookings.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    turf = models.ForeignKey(Turf, on_delete=models.CASCADE, related_name='archived_bookings')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_bookings'
+    )
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    payment_id = models.CharField(max_length=100, blank=True, null=True)
+    payment_status = models.CharField(max_length=20, default='unpaid')
+    payment_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    booked_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+    duration_hours = Booking.duration_hours
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['turf', 'start_time']),
+            models.Index(fields=['user', 'start_time']),
+        ]
+
+    def __str__(self):
+        return f"Archived booking for {self.turf.name} by {self.user.username} on {self.start_time.strftime('%Y-%m-%d')}"
+
+
+class PaymentEvent(models.Model):
+    """
+    A payment gateway webhook event. The gateway's event id is the primary
+    key, so a retried delivery of the same event is recognised and ignored.
+    """
+    event_id = models.CharField(max_length=100, primary_key=True)
+    event_type = models.CharField(max_length=40)
+    # Not a foreign key: the booking may since have moved to the archive.
+    booking_id = models.BigIntegerField(db_index=True)
+    created = models.DateTimeField(help_text="When the gateway created the event.")
+    payload = models.JSONField()
+    applied = models.BooleanField(default=False, help_text="False if the event was stale or did not match a booking.")
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} for booking {self.booking_id}"
+
+
+class ChangeEvent(models.Model):
+    """
+    One entry in the append-only log of booking and turf state changes.
+
+    Events are written in the same transaction as the change they describe
+    (see Turfs.events), and their ids are the cursor of the change feed.
+    """
+    ENTITY_CHOICES = [
+        ('booking', 'Booking'),
+        ('turf', 'Turf'),
+    ]
+
+    entity = models.CharField(max_length=10, choices=ENTITY_CHOICES)
+    # Not a foreign key: events outlive deleted turfs and archived bookings.
+    entity_id = models.BigIntegerField()
+    kind = models.CharField(max_length=40)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # The change feed filtered to one entity type
+            models.Index(fields=['entity', 'id']),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} {self.entity} {self.entity_id}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work waiting for, or being run by, `runworkers`.
+
+    Finished jobs are deleted. Jobs that keep failing stay behind with
+    status 'dead' for inspection and can be requeued from the admin.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('dead', 'Dead'),
+    ]
+
+    task = models.CharField(max_length=200, help_text="Dotted path of a function decorated with Turfs.jobs.task.")
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    run_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    # Set while running: which worker claimed the job and when its claim expires
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    lease_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers take the next ready job from here; only queued jobs are indexed
+            models.Index(
+                fields=['-priority', 'run_at', 'id'], name='job_ready_idx',
+                condition=models.Q(status='queued'),
+            ),
+            # Finding jobs whose worker died mid-run
+            models.Index(
+                fields=['lease_until'], name='job_running_idx',
+                condition=models.Q(status='running'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.id} ({self.status})"
+
+
+class Deletion(models.Model):
+    """
+    Progress of purging a deleted account or turf and everything that
+    cascades from it, in chunks (see Turfs.purge).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+    ]
+
+    model = models.CharField(max_length=100, help_text="App label and model name, e.g. Turfs.Turf.")
+    object_id = models.BigIntegerField()
+    object_repr = models.CharField(max_length=200)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    rows_deleted = models.PositiveIntegerField(default=0)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Deletion of {self.model} {self.object_repr} ({self.status})"
+
+
+class StoredFile(models.Model):
+    """
+    One distinct uploaded file in the content-addressed media storage (see
+    Turfs.media), shared by every image field and rendition with the same
+    contents. Orphans (no references left) are removed by `collect_media`.
+    """
+    digest = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the contents, in hex.")
+    name = models.CharField(max_length=100, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    # Set when ref_count drops to zero
+    orphaned_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Garbage collection takes the oldest orphans from here; only orphans are indexed
+            models.Index(
+                fields=['orphaned_at'], name='storedfile_orphan_idx',
+                condition=models.Q(orphaned_at__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} reference{'' if self.ref_count == 1 else 's'})"
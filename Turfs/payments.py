@@ -0,0 +1,150 @@
+# Turfs/payments.py
+
+"""
+Payment gateway webhooks.
+
+Every delivery is signed with HMAC-SHA256 over the raw body using
+PAYMENT_WEBHOOK_SECRET. An accepted event costs two statements in one
+transaction: a conditional UPDATE of the booking, which only applies when
+the event is newer than the last one applied (gateways retry and do not
+deliver in order), and an INSERT into `PaymentEvent`, whose primary key is
+the gateway's event id. A retried delivery fails that INSERT and rolls
+back, so it changes nothing. Notifying the player is queued in the same
+transaction as a job (see Turfs.jobs), so it is dropped with a duplicate
+and survives a restart; a `runworkers` process sends it after the
+response.
+"""
+
+import hashlib
+import hmac
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from Users.notifications import notify
+from . import events, jobs
+from .models import ArchivedBooking, Booking, PaymentEvent
+
+SIGNATURE_HEADER = 'X-Turfie-Signature'
+
+# Gateway event type -> Booking.payment_status
+EVENT_PAYMENT_STATUS = {
+    'payment.succeeded': 'paid',
+    'payment.failed': 'failed',
+    'payment.refunded': 'refunded',
+}
+
+
+class InvalidEvent(ValueError):
+    """The webhook body is not a well-formed payment event."""
+
+
+def sign(body, secret=None):
+    """Hex HMAC-SHA256 of `body`, as sent by the gateway in SIGNATURE_HEADER."""
+    secret = secret or settings.PAYMENT_WEBHOOK_SECRET
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature):
+    return bool(signature) and hmac.compare_digest(sign(body), signature)
+
+
+def parse_event(body):
+    """
+    Parses a webhook body into a flat dict.
+
+    Expected shape: {"id", "type", "created" (unix seconds, may be fractional),
+    "data": {"booking_id", "payment_id", "amount"}}.
+    """
+    try:
+        payload = json.loads(body)
+        data = payload['data']
+        event = {
+            'id': str(payload['id']),
+            'type': payload['type'],
+            'created': datetime.fromtimestamp(float(payload['created']), tz=dt_timezone.utc),
+            'booking_id': int(data['booking_id']),
+            'payment_id': str(data['payment_id']),
+            'amount': Decimal(str(data['amount'])),
+            'payload': payload,
+        }
+    except (ValueError, KeyError, TypeError, InvalidOperation) as exc:
+        raise InvalidEvent(f"Malformed payment event: {exc!r}")
+    if event['type'] not in EVENT_PAYMENT_STATUS:
+        raise InvalidEvent(f"Unsupported event type: {event['type']}")
+    return event
+
+
+def _apply(event):
+    """Updates the booking (hot or archived) if this event is newer than its last payment update."""
+    newer = Q(payment_updated_at__isnull=True) | Q(payment_updated_at__lt=event['created'])
+    changes = {
+        'payment_status': EVENT_PAYMENT_STATUS[event['type']],
+        'payment_id': event['payment_id'],
+        'payment_updated_at': event['created'],
+    }
+    for model in (Booking, ArchivedBooking):
+        matching = model.objects.filter(newer, id=event['booking_id'], amount=event['amount'])
+        if matching.update(**changes):
+            return True
+    return False
+
+
+def handle_event(event):
+    """
+    Applies a parsed event exactly once.
+
+    Returns 'applied', 'ignored' (stale, or no booking with that id and
+    amount) or 'duplicate' (this event id was already received).
+    """
+    try:
+        with transaction.atomic():
+            applied = _apply(event)
+            PaymentEvent.objects.create(
+                event_id=event['id'],
+                event_type=event['type'],
+                booking_id=event['booking_id'],
+                created=event['created'],
+                payload=event['payload'],
+                applied=applied,
+            )
+            if applied:
+                events.record(('booking', event['booking_id'], 'booking.payment_changed', {
+                    'payment_status': EVENT_PAYMENT_STATUS[event['type']], 'payment_id': event['payment_id'],
+                }))
+                jobs.enqueue(notify_player_task, event_id=event['id'])
+    except IntegrityError:
+        return 'duplicate'
+    return 'applied' if applied else 'ignored'
+
+
+# --- Deferred side effects ---
+
+NOTIFICATION_KINDS = {
+    'payment.succeeded': ('payment_received', "We received your payment of ₹{amount} for {turf} on {when}."),
+    'payment.failed': ('payment_failed', "Your payment of ₹{amount} for {turf} on {when} failed."),
+    'payment.refunded': ('payment_refunded', "₹{amount} for {turf} on {when} has been refunded."),
+}
+
+
+@jobs.task
+def notify_player_task(event_id):
+    """Tells the player about an applied payment event."""
+    event = PaymentEvent.objects.get(pk=event_id)
+    booking = (
+        Booking.objects.filter(id=event.booking_id).select_related('turf').first()
+        or ArchivedBooking.objects.filter(id=event.booking_id).select_related('turf').first()
+    )
+    if booking is None:
+        return
+    kind, template = NOTIFICATION_KINDS[event.event_type]
+    amount = Decimal(str(event.payload['data']['amount']))
+    when = timezone.localtime(booking.start_time).strftime('%d %b, %I:%M %p')
+    message = template.format(amount=amount, turf=booking.turf.name, when=when)
+    notify((booking.user_id, kind, message, reverse('turfs:booking_detail', args=[booking.id])))
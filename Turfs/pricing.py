@@ -0,0 +1,134 @@
+# Turfs/pricing.py
+
+"""
+Slot pricing.
+
+A turf's pricing rules are compiled into `Turf.price_table`: one list of 24
+hourly prices for weekdays, one for weekends, and one per date that has a
+holiday or specific-date rule. Hours no rule covers hold None and fall back
+to `price_per_hour`, so changing the flat price needs no recompilation.
+Prices are kept as strings and only turned into `Decimal` for the day being
+quoted, which makes a quote a plain sum over the hours it covers.
+
+The table is rebuilt by `compile_price_table` whenever a rule is saved or
+deleted (see `Turfs.signals`).
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PricingRule, Turf
+
+HOURS_PER_DAY = 24
+CENT = Decimal('0.01')
+MINUTES_PER_HOUR = Decimal(60)
+
+
+def _day_kind(day):
+    return 'weekend' if day.weekday() >= 5 else 'weekday'
+
+
+def _apply(hours, rule):
+    for hour in range(rule.start_hour, min(rule.end_hour, HOURS_PER_DAY)):
+        hours[hour] = str(rule.price_per_hour)
+
+
+def compile_price_table(turf):
+    """Rebuilds and saves `turf.price_table` from its current pricing rules."""
+    # Dated rules in the past can never be quoted again, so they are left out.
+    rules = list(
+        turf.pricing_rules.filter(Q(date__isnull=True) | Q(date__gte=timezone.localdate())).order_by('id')
+    )
+    table = {}
+    # Weekly rules first; in id order, so a later rule wins where two overlap.
+    for rule in rules:
+        if rule.applies_to not in PricingRule.DATED:
+            _apply(table.setdefault(rule.applies_to, [None] * HOURS_PER_DAY), rule)
+
+    dates = {}
+    for kind in PricingRule.DATED:
+        for rule in rules:
+            if rule.applies_to == kind:
+                key = rule.date.isoformat()
+                if key not in dates:
+                    dates[key] = list(table.get(_day_kind(rule.date), [None] * HOURS_PER_DAY))
+                _apply(dates[key], rule)
+    if dates:
+        table['dates'] = dates
+
+    turf.price_table = table
+    Turf.objects.filter(pk=turf.pk).update(price_table=table)
+    return table
+
+
+def schedule_recompile(turf_id):
+    """Recompiles the turf's price table once the current transaction commits."""
+    def recompile():
+        turf = Turf.objects.filter(pk=turf_id).first()
+        if turf is not None:
+            compile_price_table(turf)
+
+    transaction.on_commit(recompile)
+
+
+def _to_decimals(turf, hours):
+    base = Decimal(turf.price_per_hour)
+    if not hours:
+        return [base] * HOURS_PER_DAY
+    return [Decimal(price) if price is not None else base for price in hours]
+
+
+def day_prices(turf, day):
+    """The 24 hourly prices of `turf` on `day`, as Decimals."""
+    table = turf.price_table or {}
+    return _to_decimals(turf, table.get('dates', {}).get(day.isoformat()) or table.get(_day_kind(day)))
+
+
+def weekly_prices(turf):
+    """`(hour, weekday price, weekend price)` for every hour of the day."""
+    table = turf.price_table or {}
+    weekday, weekend = _to_decimals(turf, table.get('weekday')), _to_decimals(turf, table.get('weekend'))
+    return list(zip(range(HOURS_PER_DAY), weekday, weekend))
+
+
+def quote(turf, start, end):
+    """
+    Exact price of booking `turf` from `start` to `end` (aware datetimes).
+
+    Whole hours are summed straight from the table; a partial hour is
+    charged pro rata by the minute.
+    """
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    total = Decimal(0)
+    day, prices = None, None
+    cursor = start
+    while cursor < end:
+        if cursor.date() != day:
+            day = cursor.date()
+            prices = day_prices(turf, day)
+        hour_end = cursor.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        chunk_end = min(hour_end, end)
+        minutes = int((chunk_end - cursor).total_seconds() // 60)
+        if minutes == 60:
+            total += prices[cursor.hour]
+        else:
+            total += prices[cursor.hour] * minutes / MINUTES_PER_HOUR
+        cursor = chunk_end
+    return total.quantize(CENT)
+
+
+def slot_prices(turf, day, slot_starts):
+    """Price of each one-hour slot starting at the given times on `day`."""
+    prices = day_prices(turf, day)
+    if all(start.minute == 0 for start in slot_starts):
+        return [prices[start.hour] for start in slot_starts]
+    tz = timezone.get_current_timezone()
+    return [
+        quote(turf, timezone.make_aware(datetime.combine(day, start), tz),
+              timezone.make_aware(datetime.combine(day, start), tz) + timedelta(hours=1))
+        for start in slot_starts
+    ]
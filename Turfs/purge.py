@@ -0,0 +1,106 @@
+# Turfs/purge.py
+
+"""
+Soft-delete-then-purge for accounts and turfs.
+
+Deleting a large owner with `user.delete()` cascades through every turf,
+booking and favorite in one transaction and holds SQLite's write lock for
+as long as that takes. Instead, `delete_account` and `delete_turf` hide
+the object straight away: the account is deactivated and the turf drops
+out of `Turf.objects`. They then queue a job that removes the rows in
+bounded chunks, each in its own short transaction.
+
+The purge walks the same relations Django's cascade would. Rows of models
+that cascade further (a user's turfs) are purged one at a time,
+recursively. Leaf rows (bookings, favorites) are deleted PURGE_CHUNK_SIZE at
+a time. A `Deletion` row records progress. The purge can be interrupted
+and rerun: it carries on from whatever rows are left.
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import jobs
+from .availability import refresh_days
+from .models import Booking, Deletion, Turf
+
+
+def _cascades(model):
+    """`(model, field name)` for every table whose rows go when a `model` row is deleted."""
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            yield relation.through, relation.field.m2m_reverse_field_name()
+        elif relation.on_delete is models.CASCADE:
+            yield relation.related_model, relation.field.name
+    for field in model._meta.local_many_to_many:
+        yield field.remote_field.through, field.m2m_field_name()
+
+
+def _purge(model, pk, deletion, chunk_size):
+    for related_model, field_name in _cascades(model):
+        rows = related_model._base_manager.filter(**{field_name: pk})
+        if any(_cascades(related_model)):
+            for child_pk in list(rows.values_list('pk', flat=True)):
+                _purge(related_model, child_pk, deletion, chunk_size)
+            continue
+        while True:
+            ids = list(rows.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted, _ = related_model._base_manager.filter(pk__in=ids).delete()
+                Deletion.objects.filter(pk=deletion.pk).update(rows_deleted=F('rows_deleted') + deleted)
+    with transaction.atomic():
+        deleted, _ = model._base_manager.filter(pk=pk).delete()
+        Deletion.objects.filter(pk=deletion.pk).update(rows_deleted=F('rows_deleted') + deleted)
+
+
+@jobs.task
+def purge_task(deletion_id):
+    deletion = Deletion.objects.get(pk=deletion_id)
+    if deletion.status == 'done':
+        return
+    Deletion.objects.filter(pk=deletion_id).update(status='running')
+    model = apps.get_model(deletion.model)
+
+    # A player's upcoming bookings free slots on other turfs, whose summaries need rebuilding.
+    freed = {}
+    if model is not Turf:
+        upcoming = Booking.objects.filter(user_id=deletion.object_id, start_time__gte=timezone.now())
+        for turf_id, start_time in upcoming.exclude(status='cancelled').values_list('turf_id', 'start_time'):
+            freed.setdefault(turf_id, set()).add(timezone.localtime(start_time).date())
+
+    _purge(model, deletion.object_id, deletion, settings.PURGE_CHUNK_SIZE)
+
+    for turf_id, days in freed.items():
+        refresh_days(turf_id, days)
+    Deletion.objects.filter(pk=deletion_id).update(status='done', finished_at=timezone.now())
+
+
+def _schedule(instance):
+    deletion = Deletion.objects.create(
+        model=instance._meta.label, object_id=instance.pk, object_repr=str(instance)[:200],
+    )
+    jobs.enqueue(purge_task, priority=jobs.PRIORITY_LOW, deletion_id=deletion.pk)
+    return deletion
+
+
+def delete_turf(turf):
+    """Hides the turf at once and queues the purge of it and its bookings. Call inside a transaction."""
+    turf.deleted_at = timezone.now()
+    turf.save(update_fields=['deleted_at'])
+    return _schedule(turf)
+
+
+def delete_account(user):
+    """
+    Deactivates the account at once, which also hides the owner's turfs,
+    and queues the purge of everything it owns. Call inside a transaction.
+    """
+    user.is_active = False
+    user.deleted_at = timezone.now()
+    user.save(update_fields=['is_active', 'deleted_at'])
+    return _schedule(user)
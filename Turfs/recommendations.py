@@ -0,0 +1,222 @@
+# Turfs/recommendations.py
+
+"""
+Precomputed "Recommended Turfs" for the player dashboard.
+
+`build_recommendations` runs offline (the `build_recommendations` command)
+and writes each player's top turfs to `TurfRecommendation`, so the
+dashboard only does one indexed read. A turf's score for a player blends:
+
+* item-item similarity: turfs often booked or favourited by the same
+  players are similar (cosine similarity over a sparse player x turf
+  matrix of interaction weights), and a candidate scores by its similarity
+  to the turfs the player already uses;
+* city proximity: the share of the player's activity in the turf's city;
+* recent popularity: bookings per turf, each decaying with a half-life.
+
+The matrices are kept as dicts of dicts holding only non-zero entries, so
+the cost grows with the number of interactions rather than players x turfs.
+Players with no interactions get the cold-start list (rows with no user),
+ranked by popularity and rating.
+"""
+
+import math
+from collections import defaultdict
+from heapq import nlargest
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ArchivedBooking, Booking, Turf, TurfRecommendation
+
+# Blend of the three signals for players with history
+SIMILARITY_WEIGHT = 0.6
+CITY_WEIGHT = 0.25
+POPULARITY_WEIGHT = 0.15
+# Blend for the cold-start list; with no bookings yet this is the old by-rating order
+COLD_START_POPULARITY_WEIGHT = 0.7
+COLD_START_RATING_WEIGHT = 0.3
+FAVORITE_WEIGHT = 1.0
+# Bound the pairwise work for very active players and very connected turfs
+MAX_TURFS_PER_PLAYER = 50
+MAX_NEIGHBOURS = 50
+
+
+def _interactions(now, half_life_days):
+    """
+    Reads bookings (hot and archived, not cancelled) and favourites.
+
+    Returns the sparse player x turf weight matrix, where repeat bookings
+    count logarithmically and a favourite adds FAVORITE_WEIGHT, and each
+    turf's time-decayed booking count.
+    """
+    from Users.models import User
+
+    booking_counts = defaultdict(lambda: defaultdict(int))
+    popularity = defaultdict(float)
+    decay = math.log(2) / (half_life_days * 86400)
+    for model in (Booking, ArchivedBooking):
+        rows = model.objects.exclude(status='cancelled').values_list('user_id', 'turf_id', 'start_time')
+        for user_id, turf_id, start_time in rows.iterator(chunk_size=5000):
+            booking_counts[user_id][turf_id] += 1
+            age = max((now - start_time).total_seconds(), 0)
+            popularity[turf_id] += math.exp(-decay * age)
+
+    weights = defaultdict(dict)
+    for user_id, turfs in booking_counts.items():
+        for turf_id, count in turfs.items():
+            weights[user_id][turf_id] = 1 + math.log(count)
+    favorites = User.favorites.through.objects.values_list('user_id', 'turf_id')
+    for user_id, turf_id in favorites.iterator(chunk_size=5000):
+        weights[user_id][turf_id] = weights[user_id].get(turf_id, 0) + FAVORITE_WEIGHT
+    return weights, popularity
+
+
+def item_similarity(weights):
+    """
+    Cosine similarity between turfs from the player x turf weight matrix.
+
+    Returns {turf_id: {other_turf_id: similarity}} with each turf's
+    MAX_NEIGHBOURS most similar turfs.
+    """
+    co_occurrence = defaultdict(lambda: defaultdict(float))
+    norms = defaultdict(float)
+    for turfs in weights.values():
+        top = nlargest(MAX_TURFS_PER_PLAYER, turfs.items(), key=lambda item: item[1])
+        for turf_id, weight in top:
+            norms[turf_id] += weight * weight
+        for i, (turf_a, weight_a) in enumerate(top):
+            for turf_b, weight_b in top[i + 1:]:
+                product = weight_a * weight_b
+                co_occurrence[turf_a][turf_b] += product
+                co_occurrence[turf_b][turf_a] += product
+
+    similarity = {}
+    for turf_a, row in co_occurrence.items():
+        scored = ((turf_b, value / math.sqrt(norms[turf_a] * norms[turf_b])) for turf_b, value in row.items())
+        similarity[turf_a] = dict(nlargest(MAX_NEIGHBOURS, scored, key=lambda item: item[1]))
+    return similarity
+
+
+def _cold_start(turfs, popularity, top_k):
+    """The list for players with no history: recent popularity blended with rating."""
+    scored = (
+        (turf_id, COLD_START_POPULARITY_WEIGHT * popularity.get(turf_id, 0)
+         + COLD_START_RATING_WEIGHT * float(rating) / 5)
+        for turf_id, (_, rating) in turfs.items()
+    )
+    return nlargest(top_k, scored, key=lambda item: item[1])
+
+
+def recommend_for(user_turfs, similarity, turfs, popularity, city_top, cold_start, top_k):
+    """
+    Scores candidate turfs for one player from their {turf_id: weight} row.
+
+    Candidates are the neighbours of the player's turfs, the most popular
+    turfs in their cities and the cold-start list; turfs the player already
+    booked or favourited are left out.
+    """
+    affinity = defaultdict(float)
+    cities = defaultdict(float)
+    for turf_id, weight in user_turfs.items():
+        for other, value in similarity.get(turf_id, {}).items():
+            affinity[other] += weight * value
+        if turf_id in turfs:
+            cities[turfs[turf_id][0]] += weight
+    max_affinity = max(affinity.values(), default=0) or 1
+    total_city = sum(cities.values()) or 1
+
+    candidates = set(affinity)
+    for city in cities:
+        candidates.update(city_top.get(city, ()))
+    candidates.update(turf_id for turf_id, _ in cold_start)
+    candidates.difference_update(user_turfs)
+
+    scored = (
+        (turf_id,
+         SIMILARITY_WEIGHT * affinity.get(turf_id, 0) / max_affinity
+         + CITY_WEIGHT * cities.get(turfs[turf_id][0], 0) / total_city
+         + POPULARITY_WEIGHT * popularity.get(turf_id, 0))
+        for turf_id in candidates if turf_id in turfs
+    )
+    return nlargest(top_k, scored, key=lambda item: item[1])
+
+
+def _rows(user_id, ranked, computed_at):
+    return [
+        TurfRecommendation(user_id=user_id, turf_id=turf_id, rank=rank, score=score, computed_at=computed_at)
+        for rank, (turf_id, score) in enumerate(ranked, start=1)
+    ]
+
+
+def build_recommendations(top_k=None, half_life_days=None, batch_size=500):
+    """
+    Recomputes every player's recommendations and the cold-start list.
+
+    Rows are replaced a batch of players at a time, each batch in its own
+    transaction, so the dashboard never sees a player with half a list.
+    Returns the number of players with personal recommendations.
+    """
+    top_k = top_k or settings.RECOMMENDATION_TOP_K
+    half_life_days = half_life_days or settings.RECOMMENDATION_POPULARITY_HALF_LIFE_DAYS
+    now = timezone.now()
+
+    weights, popularity = _interactions(now, half_life_days)
+    similarity = item_similarity(weights)
+
+    turfs = {
+        turf_id: (city, rating)
+        for turf_id, city, rating in Turf.objects.filter(
+            approval_status='approved', owner__is_active=True
+        ).values_list('id', 'city', 'rating')
+    }
+    top_popularity = max((popularity.get(turf_id, 0) for turf_id in turfs), default=0) or 1
+    popularity = {turf_id: popularity.get(turf_id, 0) / top_popularity for turf_id in turfs}
+    by_city = defaultdict(list)
+    for turf_id, (city, _) in turfs.items():
+        by_city[city].append(turf_id)
+    city_top = {
+        city: nlargest(top_k, ids, key=lambda turf_id: popularity[turf_id]) for city, ids in by_city.items()
+    }
+    cold_start = _cold_start(turfs, popularity, top_k)
+
+    with transaction.atomic():
+        TurfRecommendation.objects.filter(user=None).delete()
+        TurfRecommendation.objects.bulk_create(_rows(None, cold_start, now))
+
+    user_ids = sorted(weights)
+    for offset in range(0, len(user_ids), batch_size):
+        batch = user_ids[offset:offset + batch_size]
+        rows = []
+        for user_id in batch:
+            ranked = recommend_for(weights[user_id], similarity, turfs, popularity, city_top, cold_start, top_k)
+            rows.extend(_rows(user_id, ranked, now))
+        with transaction.atomic():
+            TurfRecommendation.objects.filter(user_id__in=batch).delete()
+            TurfRecommendation.objects.bulk_create(rows)
+
+    # Players whose only interactions went away fall back to the cold-start list
+    TurfRecommendation.objects.filter(user__isnull=False, computed_at__lt=now).delete()
+    return len(user_ids)
+
+
+def recommended_turfs_for(user, limit=None):
+    """
+    The player's precomputed recommendations, or the cold-start list if the
+    job has none for them. One query: both lists are read together through
+    the (user, rank) index, the player's own rows sorting first. Filters on
+    the id so a snapshot `request.user` is not loaded just to build it.
+    """
+    limit = limit or settings.RECOMMENDATION_TOP_K
+    rows = list(
+        TurfRecommendation.objects
+        .filter(Q(user_id=user.pk) | Q(user=None), rank__lte=limit,
+                turf__approval_status='approved', turf__deleted_at__isnull=True,
+                turf__owner__is_active=True)
+        .select_related('turf')
+        .order_by(F('user').asc(nulls_last=True), 'rank')
+    )
+    personal = [row.turf for row in rows if row.user_id is not None]
+    return personal or [row.turf for row in rows]
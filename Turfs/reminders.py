@@ -0,0 +1,98 @@
+# Turfs/reminders.py
+
+"""
+Reminder emails for upcoming bookings.
+
+`send_booking_reminders` is meant to be run every few minutes (see the
+`send_booking_reminders` command). Each run claims due bookings a batch at
+a time with a conditional UPDATE on `reminder_claim`, so two overlapping
+runs can never pick up the same booking, then loads the claimed batch in
+one query and sends its emails over a single backend connection.
+
+A claim is a lease, like a job's (see Turfs.jobs): if a run dies before
+stamping `reminder_sent_at`, its bookings are due again once
+BOOKING_REMINDER_LEASE_SECONDS have passed. Only bookings whose email
+actually went out are stamped. A run that dies between sending and
+stamping sends those reminders twice; none is ever lost.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Booking
+
+
+def _reminder_email(booking):
+    start, end = timezone.localtime(booking.start_time), timezone.localtime(booking.end_time)
+    body = render_to_string('turfs/emails/booking_reminder.txt', {
+        'booking': booking,
+        'start': start,
+        'end': end,
+        'booking_url': settings.SITE_URL + reverse('turfs:booking_detail', args=[booking.id]),
+    })
+    subject = f"Reminder: {booking.turf.name} at {start:%I:%M %p} on {start:%d %b}"
+    return EmailMessage(subject, body, to=[booking.user.email])
+
+
+def due_reminders(hours, statuses, now=None):
+    """Bookings starting within `hours` that still need a reminder and that no live run has claimed."""
+    now = now or timezone.now()
+    stale = now - timedelta(seconds=settings.BOOKING_REMINDER_LEASE_SECONDS)
+    return Booking.objects.filter(
+        Q(reminder_claimed_at__isnull=True) | Q(reminder_claimed_at__lt=stale),
+        reminder_sent_at__isnull=True,
+        start_time__gte=now,
+        start_time__lt=now + timedelta(hours=hours),
+        status__in=statuses,
+    )
+
+
+def send_booking_reminders(hours, statuses, batch_size, connection=None):
+    """
+    Emails players whose bookings start within `hours`.
+
+    Yields `(claimed, sent)` for every batch; players without an email
+    address are claimed and marked done without being sent anything. A
+    message the backend reports as not sent stays claimed until its lease
+    runs out. If the email backend fails, the unsent part of the current
+    batch is released for the next run and the error is re-raised.
+    """
+    claim = uuid.uuid4()
+    due = due_reminders(hours, statuses)
+    connection = connection or get_connection()
+    with connection:
+        while True:
+            ids = list(due.order_by('start_time').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return
+            # Rows another run claimed since the SELECT above no longer match `due` and are skipped.
+            claimed = due.filter(id__in=ids).update(reminder_claim=claim, reminder_claimed_at=timezone.now())
+            if not claimed:
+                continue
+
+            batch = Booking.objects.filter(id__in=ids, reminder_claim=claim).select_related('turf', 'user')
+            done = []
+            sent = 0
+            try:
+                for booking in batch:
+                    if booking.user.email:
+                        # One message per call, on the shared connection, so the count says which went out.
+                        if not connection.send_messages([_reminder_email(booking)]):
+                            continue
+                        sent += 1
+                    done.append(booking.id)
+            except Exception:
+                Booking.objects.filter(id__in=done).update(reminder_sent_at=timezone.now())
+                Booking.objects.filter(reminder_claim=claim, reminder_sent_at__isnull=True).update(
+                    reminder_claim=None, reminder_claimed_at=None,
+                )
+                raise
+            Booking.objects.filter(id__in=done).update(reminder_sent_at=timezone.now())
+            yield claimed, sent
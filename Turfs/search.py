@@ -0,0 +1,185 @@
+# Turfs/search.py
+
+"""
+Faceted turf search.
+
+Every turf carries `amenity_mask`, a bitset of its amenities, so "has all
+of these amenities" is a single bitwise test instead of a join per
+amenity. Facet counts are aggregated in the database: each option is
+counted among the turfs that pass every *other* active filter (amenities,
+which combine with AND, count among the current results). One query
+counts the results, every amenity bit (one conditional COUNT each) and
+every facet without an active filter; each active price or rating filter
+adds one, and cities and districts are one GROUP BY each. No turf rows
+are loaded, and the page costs at most five queries however many turfs
+match or filters are applied.
+"""
+
+from collections import defaultdict
+from datetime import time
+
+from django.db.models import Count, F, Q
+from django.db.models.lookups import Exact
+
+from .models import Turf
+
+# (key, label, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = [
+    ('under-500', 'Under ₹500', None, 500),
+    ('500-1000', '₹500 – ₹1,000', 500, 1000),
+    ('1000-1500', '₹1,000 – ₹1,500', 1000, 1500),
+    ('1500-up', '₹1,500 & above', 1500, None),
+]
+RATING_FLOORS = (4, 3, 2)
+MAX_PLACE_OPTIONS = 15
+
+# Filter values that mean "not filtering", see `parse_filters`
+NO_FILTER = {'amenities': [], 'price': '', 'rating': None, 'city': '', 'district': '', 'open_at': None}
+
+
+def amenity_mask(bits):
+    mask = 0
+    for bit in bits:
+        mask |= 1 << bit
+    return mask
+
+
+def refresh_amenity_masks(turf_ids):
+    """Recomputes `amenity_mask` for the given turfs from their amenities."""
+    bits = defaultdict(list)
+    rows = Turf.amenities.through.objects.filter(turf_id__in=turf_ids).values_list('turf_id', 'amenity__bit')
+    for turf_id, bit in rows:
+        bits[turf_id].append(bit)
+    turfs = [Turf(pk=turf_id, amenity_mask=amenity_mask(bits[turf_id])) for turf_id in turf_ids]
+    Turf.objects.bulk_update(turfs, ['amenity_mask'], batch_size=500)
+
+
+def _place(value):
+    return (value or '').strip().title()
+
+
+def parse_time(value):
+    try:
+        return time.fromisoformat(value or '')
+    except ValueError:
+        return None
+
+
+def parse_filters(params, amenities):
+    """Reads the search filters from a QueryDict, dropping anything invalid."""
+    by_id = {str(amenity.id): amenity for amenity in amenities}
+    selected = [by_id[value] for value in params.getlist('amenity') if value in by_id]
+    price = params.get('price', '')
+    try:
+        rating = int(params.get('rating', ''))
+    except ValueError:
+        rating = None
+    open_at = parse_time(params.get('open_at'))
+    return {
+        'amenities': selected,
+        'price': price if price in {bucket[0] for bucket in PRICE_BUCKETS} else '',
+        'rating': rating if rating in RATING_FLOORS else None,
+        'city': _place(params.get('city')),
+        'district': _place(params.get('district')),
+        'open_at': open_at,
+    }
+
+
+def _price_bounds(key):
+    for bucket_key, _, low, high in PRICE_BUCKETS:
+        if bucket_key == key:
+            return low, high
+
+
+def apply_filters(queryset, filters):
+    """Restricts `queryset` to the turfs matching every active filter."""
+    mask = amenity_mask(amenity.bit for amenity in filters['amenities'])
+    if mask:
+        queryset = queryset.alias(selected_amenities=F('amenity_mask').bitand(mask)).filter(selected_amenities=mask)
+    if filters['price']:
+        low, high = _price_bounds(filters['price'])
+        if low is not None:
+            queryset = queryset.filter(price_per_hour__gte=low)
+        if high is not None:
+            queryset = queryset.filter(price_per_hour__lt=high)
+    if filters['rating'] is not None:
+        queryset = queryset.filter(rating__gte=filters['rating'])
+    if filters['city']:
+        queryset = queryset.filter(city__iexact=filters['city'])
+    if filters['district']:
+        queryset = queryset.filter(district__iexact=filters['district'])
+    if filters['open_at'] is not None:
+        queryset = queryset.filter(opening_time__lte=filters['open_at'], closing_time__gt=filters['open_at'])
+    return queryset
+
+
+def _price_range(key):
+    low, high = _price_bounds(key)
+    condition = Q()
+    if low is not None:
+        condition &= Q(price_per_hour__gte=low)
+    if high is not None:
+        condition &= Q(price_per_hour__lt=high)
+    return condition
+
+
+def _place_counts(queryset, field):
+    """`{place: turfs}` over `queryset`, grouped in SQL and merged by normalized name."""
+    counts = {}
+    for value, count in queryset.values_list(field).annotate(count=Count('id')).order_by():
+        place = _place(value)
+        counts[place] = counts.get(place, 0) + count
+    return counts
+
+
+def facet_counts(queryset, filters, amenities):
+    """
+    Counts for every facet option, aggregated in SQL over `queryset` (the
+    turfs matching the text search, before any facet filter).
+    """
+    # Each facet is counted over the turfs passing every other filter; a facet
+    # with no active filter shares the query over the current results.
+    def counted_over(name):
+        return name if filters[name] != NO_FILTER[name] else None
+
+    aggregates = defaultdict(dict)
+    aggregates[None]['total'] = Count('id')
+    for amenity in amenities:
+        bit = 1 << amenity.bit
+        aggregates[None][f'amenity_{amenity.bit}'] = Count('id', filter=Exact(F('amenity_mask').bitand(bit), bit))
+    for key, _, _, _ in PRICE_BUCKETS:
+        aggregates[counted_over('price')][f'price_{key}'] = Count('id', filter=_price_range(key))
+    for floor in RATING_FLOORS:
+        aggregates[counted_over('rating')][f'rating_{floor}'] = Count('id', filter=Q(rating__gte=floor))
+
+    totals = {}
+    for excluded, group in aggregates.items():
+        over = filters if excluded is None else {**filters, excluded: NO_FILTER[excluded]}
+        totals.update(apply_filters(queryset, over).order_by().aggregate(**group))
+    city_counts = _place_counts(apply_filters(queryset, {**filters, 'city': NO_FILTER['city']}), 'city')
+    district_counts = _place_counts(apply_filters(queryset, {**filters, 'district': NO_FILTER['district']}), 'district')
+
+    def places(counts, selected):
+        top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:MAX_PLACE_OPTIONS]
+        if selected and selected not in dict(top):
+            top.append((selected, counts.get(selected, 0)))
+        return [{'value': name, 'count': count, 'selected': name == selected} for name, count in top]
+
+    selected_bits = {amenity.bit for amenity in filters['amenities']}
+    return {
+        'total': totals['total'],
+        'amenities': [
+            {'amenity': amenity, 'count': totals[f'amenity_{amenity.bit}'], 'selected': amenity.bit in selected_bits}
+            for amenity in amenities
+        ],
+        'price': [
+            {'value': key, 'label': label, 'count': totals[f'price_{key}'], 'selected': key == filters['price']}
+            for key, label, _, _ in PRICE_BUCKETS
+        ],
+        'rating': [
+            {'value': floor, 'count': totals[f'rating_{floor}'], 'selected': floor == filters['rating']}
+            for floor in RATING_FLOORS
+        ],
+        'city': places(city_counts, filters['city']),
+        'district': places(district_counts, filters['district']),
+    }
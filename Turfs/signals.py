@@ -0,0 +1,72 @@
+# Turfs/signals.py
+
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import media
+from .models import Amenity, PricingRule, Turf, TurfImage
+from .autocomplete import schedule_refresh
+from .pricing import schedule_recompile
+from .search import refresh_amenity_masks
+
+
+@receiver(post_save, sender=PricingRule)
+@receiver(post_delete, sender=PricingRule)
+def recompile_price_table(sender, instance, **kwargs):
+    """Keeps the compiled price table in step with the turf's rules."""
+    schedule_recompile(instance.turf_id)
+
+
+@receiver(m2m_changed, sender=Turf.amenities.through)
+def refresh_amenity_mask(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keeps Turf.amenity_mask in step with Turf.amenities, whichever side was edited."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_amenity_masks([instance.pk])
+    elif action == 'post_clear':
+        # amenity.turf_set.clear(): pk_set is not provided, so clear the bit everywhere
+        Turf.objects.update(amenity_mask=F('amenity_mask').bitand(~(1 << instance.bit)))
+    else:
+        refresh_amenity_masks(list(pk_set))
+
+
+@receiver(post_delete, sender=Amenity)
+def clear_amenity_bit(sender, instance, **kwargs):
+    """Deleting an amenity removes it from every turf without m2m signals."""
+    if instance.bit is not None:
+        Turf.objects.update(amenity_mask=F('amenity_mask').bitand(~(1 << instance.bit)))
+
+
+@receiver(post_save, sender=Turf)
+@receiver(post_delete, sender=Turf)
+def refresh_autocomplete(sender, instance, update_fields=None, **kwargs):
+    """Keeps the search-box suggestions in step with turf names, places and approval."""
+    if update_fields is not None and not {'name', 'city', 'district', 'approval_status', 'deleted_at'} & set(update_fields):
+        return
+    schedule_refresh(instance.pk)
+
+
+IMAGE_FIELDS = {Turf: 'main_image', TurfImage: 'image'}
+
+
+@receiver(pre_save, sender=Turf)
+@receiver(pre_save, sender=TurfImage)
+def remember_replaced_image(sender, instance, update_fields=None, **kwargs):
+    media.remember_replaced(instance, IMAGE_FIELDS[sender], update_fields)
+
+
+@receiver(pre_delete, sender=Turf)
+@receiver(pre_delete, sender=TurfImage)
+def remember_deleted_image(sender, instance, **kwargs):
+    media.remember_deleted(instance, IMAGE_FIELDS[sender])
+
+
+@receiver(post_save, sender=Turf)
+@receiver(post_save, sender=TurfImage)
+@receiver(post_delete, sender=Turf)
+@receiver(post_delete, sender=TurfImage)
+def release_image(sender, instance, **kwargs):
+    """A replaced or deleted image and its renditions lose a reference in the media storage (Turfs.media)."""
+    media.release_remembered(instance)
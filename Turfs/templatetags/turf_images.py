@@ -0,0 +1,49 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from Turfs.images import rendition_entries, rendition_name_for
+
+register = template.Library()
+
+
+def _srcset(entries, index):
+    return ', '.join(f'{default_storage.url(entry[index])} {entry[0]}w' for entry in entries)
+
+
+@register.filter(name='rendition_url')
+def rendition_url(fieldfile, rendition):
+    """URL of the largest JPEG rendition of an image, falling back to the original upload."""
+    name = rendition_name_for(fieldfile, rendition)
+    return default_storage.url(name) if name else ''
+
+
+@register.filter(name='rendition_srcset')
+def rendition_srcset(fieldfile, rendition):
+    """JPEG `srcset` value for a rendition, or an empty string if it has not been built yet."""
+    return _srcset(rendition_entries(fieldfile, rendition), 2)
+
+
+@register.simple_tag
+def responsive_image(fieldfile, rendition, sizes='100vw', **attrs):
+    """
+    Renders a <picture> with WebP and JPEG sources for an uploaded image.
+
+    Extra keyword arguments become attributes of the <img> tag (underscores
+    turn into hyphens, so `data_index=1` renders `data-index="1"`). Until the
+    renditions exist the original upload is used as a plain <img>.
+    """
+    attrs.setdefault('loading', 'lazy')
+    img_attrs = format_html_join(
+        ' ', '{}="{}"', ((key.replace('_', '-'), value) for key, value in attrs.items())
+    )
+    entries = rendition_entries(fieldfile, rendition)
+    if not entries:
+        return format_html('<img src="{}" {}>', fieldfile.url if fieldfile else '', img_attrs)
+    return format_html(
+        '<picture class="contents"><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" {}></picture>',
+        _srcset(entries, 1), sizes,
+        default_storage.url(entries[0][2]), _srcset(entries, 2), sizes,
+        img_attrs,
+    )
@@ -1,3 +1,898 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection, transaction
+from django.http import HttpResponse, QueryDict
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from Turfie.ratelimit import RateLimitMiddleware
+from Turfie.replicas import StickyPrimaryMiddleware
+from Users.middleware import CheckUserActiveMiddleware
+from Users.models import Notification, User
+from . import archive, autocomplete, events, images, jobs, media, payments, pricing, purge, search, timeline
+from .availability import last_bookable_day, next_available, refresh_booking, with_free_slot
+from .forms import BookingForm
+from .recommendations import build_recommendations, recommended_turfs_for
+from .reminders import send_booking_reminders
+from .models import (
+    Amenity, ArchivedBooking, Booking, DailySlotSummary, Job, PaymentEvent, PricingRule, StoredFile, Turf,
+    TurfRecommendation,
+)
+from .templatetags import turf_images
+
+
+@jobs.task
+def record_run_task(calls, fail=False):
+    JobQueueTests.runs.append(calls)
+    if fail:
+        raise RuntimeError("boom")
+
+class HalfHourTurfAvailabilityTests(TestCase):
+    """A turf opening at 06:30 has slots 06:30, 07:30, ...; a booking must only mark the ones it covers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.turf = Turf.objects.create(
+            owner=owner, name="Half Past", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6, 30), closing_time=time(22, 30),
+        )
+        cls.day = timezone.localdate() + timedelta(days=2)
+
+    def book(self, start, end):
+        booking = Booking.objects.create(
+            turf=self.turf, user=self.player, amount=Decimal('500'), status='confirmed',
+            start_time=timezone.make_aware(datetime.combine(self.day, start)),
+            end_time=timezone.make_aware(datetime.combine(self.day, end)),
+        )
+        refresh_booking(booking)
+        return booking
+
+    def test_booking_marks_only_its_own_slot(self):
+        self.book(time(6, 30), time(7, 30))
+        summary = DailySlotSummary.objects.get(turf=self.turf, day=self.day)
+        self.assertEqual(summary.booked_mask, 1 << 6)
+
+    def test_next_slot_stays_free(self):
+        self.book(time(6, 30), time(7, 30))
+        turfs = Turf.objects.filter(pk=self.turf.pk)
+        self.assertQuerySetEqual(with_free_slot(turfs, self.day, time(7), time(8)), [self.turf])
+        self.assertQuerySetEqual(with_free_slot(turfs, self.day, time(6), time(7)), [])
+
+        now = timezone.make_aware(datetime.combine(self.day - timedelta(days=1), time(23)))
+        self.assertEqual(
+            next_available([self.turf], now=now)[self.turf.id],
+            timezone.make_aware(datetime.combine(self.day, time(7, 30))),
+        )
+
+    def test_booking_across_slot_boundary_marks_both(self):
+        self.book(time(7), time(8))
+        summary = DailySlotSummary.objects.get(turf=self.turf, day=self.day)
+        self.assertEqual(summary.booked_mask, 1 << 6 | 1 << 7)
+
+    def test_slot_later_this_hour_has_not_started(self):
+        today = timezone.localdate()
+        turfs = Turf.objects.filter(pk=self.turf.pk)
+        for now, free in [(time(7, 10), [self.turf]), (time(7, 40), [])]:
+            with self.subTest(now=now), mock.patch(
+                'django.utils.timezone.now', return_value=timezone.make_aware(datetime.combine(today, now)),
+            ):
+                self.assertQuerySetEqual(with_free_slot(turfs, today, time(7), time(8)), free)
+                self.assertEqual(
+                    next_available([self.turf])[self.turf.id],
+                    timezone.make_aware(datetime.combine(today, time(7, 30) if free else time(8, 30))),
+                )
+
+    def test_next_available_stays_within_what_booking_form_accepts(self):
+        today = timezone.localdate()
+        last_day = last_bookable_day(today)
+        DailySlotSummary.objects.bulk_create([
+            DailySlotSummary(turf=self.turf, day=today + timedelta(days=offset), booked_mask=self.turf.open_mask)
+            for offset in range((last_day - today).days)
+        ])
+        slot = next_available([self.turf])[self.turf.id]
+        self.assertEqual(timezone.localdate(slot), last_day)
+        form = BookingForm({'date': last_day, 'start_time': time(6, 30), 'end_time': time(7, 30)}, turf=self.turf)
+        self.assertTrue(form.is_valid(), form.errors)
+
+        DailySlotSummary.objects.create(turf=self.turf, day=last_day, booked_mask=self.turf.open_mask)
+        self.assertIsNone(next_available([self.turf])[self.turf.id])
+        form = BookingForm({'date': last_day + timedelta(days=1), 'start_time': time(6, 30), 'end_time': time(7, 30)},
+                           turf=self.turf)
+        self.assertFalse(form.is_valid())
+
+
+class RenditionTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        self.turf = Turf.objects.create(
+            owner=owner, name="Corner Ground", price_per_hour=Decimal('500'),
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+
+    def upload(self, width, height):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), 'green').save(buffer, format='JPEG')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.turf.main_image.save('ground.jpg', ContentFile(buffer.getvalue()))
+
+    def test_worker_builds_renditions_without_upscaling(self):
+        from PIL import Image
+
+        self.upload(1000, 800)
+        images.schedule_renditions(self.turf, 'main_image', ('card', 'hero'))
+        jobs.work(threading.Event(), burst=True)
+
+        self.turf.refresh_from_db()
+        renditions = self.turf.main_image_renditions
+        self.assertEqual([entry[0] for entry in renditions['card']], [480, 960])
+        # 1280 and 1920 would be upscaled; 640 covers the image.
+        self.assertEqual([entry[0] for entry in renditions['hero']], [640])
+        width, webp_name, jpeg_name = renditions['card'][0]
+        for name, image_format in [(webp_name, 'WEBP'), (jpeg_name, 'JPEG')]:
+            with default_storage.open(name) as stored, Image.open(stored) as image:
+                self.assertEqual((image.format, image.size), (image_format, (480, 270)))
+
+        html = turf_images.responsive_image(self.turf.main_image, 'card', sizes='50vw', alt="Corner Ground")
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(f'{default_storage.url(jpeg_name)} 480w', html)
+
+    def test_templates_fall_back_to_the_original_until_built(self):
+        self.upload(200, 100)
+        html = turf_images.responsive_image(self.turf.main_image, 'card')
+        self.assertEqual(html, f'<img src="{self.turf.main_image.url}" loading="lazy">')
+        self.assertEqual(turf_images.rendition_url(self.turf.main_image, 'card'), self.turf.main_image.url)
+
+class PricingQuoteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.turf = Turf.objects.create(
+            owner=owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+        today = timezone.localdate()
+        cls.holiday = today + timedelta(days=(2 - today.weekday()) % 7 or 7)  # the next Wednesday
+        cls.weekday = cls.holiday + timedelta(days=1)
+        cls.weekend = cls.holiday + timedelta(days=3)
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for applies_to, day, start_hour, end_hour, price in [
+                ('weekday', None, 18, 22, '800'),
+                ('holiday', self.holiday, 18, 20, '1000'),
+                ('slot', self.holiday, 19, 20, '1200'),
+            ]:
+                PricingRule.objects.create(
+                    turf=self.turf, applies_to=applies_to, date=day,
+                    start_hour=start_hour, end_hour=end_hour, price_per_hour=Decimal(price),
+                )
+        self.turf.refresh_from_db()
+
+    def quote(self, day, start, end):
+        return pricing.quote(
+            self.turf, timezone.make_aware(datetime.combine(day, start)), timezone.make_aware(datetime.combine(day, end)),
+        )
+
+    def test_quotes_from_the_compiled_table(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.quote(self.weekday, time(17), time(19)), Decimal('1300.00'))
+            # Partial hours are charged by the minute.
+            self.assertEqual(self.quote(self.weekday, time(17, 30), time(18, 30)), Decimal('650.00'))
+            # Slot rules beat holiday rules, which beat the weekly ones.
+            self.assertEqual(self.quote(self.holiday, time(18), time(21)), Decimal('3000.00'))
+            self.assertEqual(self.quote(self.weekend, time(18), time(19)), Decimal('500.00'))
+
+    def test_unruled_hours_follow_the_flat_price(self):
+        self.turf.price_per_hour = Decimal('600')
+        self.assertEqual(self.quote(self.weekday, time(17), time(19)), Decimal('1400.00'))
+
+    def test_deleting_a_rule_recompiles_the_table(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.turf.pricing_rules.filter(applies_to='slot').delete()
+        self.turf.refresh_from_db()
+        self.assertEqual(self.quote(self.holiday, time(19), time(20)), Decimal('1000.00'))
+
+class CollectGarbageTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def orphan(self, content):
+        name = default_storage.save('turf_images/photo.jpg', ContentFile(content))
+        default_storage.delete(name)
+        StoredFile.objects.filter(name=name).update(orphaned_at=timezone.now() - timedelta(days=1))
+        return name
+
+    def test_removes_orphans(self):
+        name = self.orphan(b'old photo')
+        self.assertEqual(media.collect_garbage(batch_size=10, grace_seconds=60), (1, len(b'old photo')))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_keeps_blob_claimed_after_selection(self):
+        claimed, unclaimed = self.orphan(b'uploaded again'), self.orphan(b'gone for good')
+        digest = StoredFile.objects.get(name=claimed).digest
+        delete = QuerySet.delete
+        uploads = []
+
+        def upload_then_delete(queryset):
+            # The same content is uploaded again between the SELECT and the first DELETE.
+            if not uploads:
+                uploads.append(media._claim(digest))
+            return delete(queryset)
+
+        with mock.patch.object(QuerySet, 'delete', autospec=True, side_effect=upload_then_delete):
+            removed, _ = media.collect_garbage(batch_size=10, grace_seconds=60)
+
+        self.assertEqual(uploads, [claimed])
+        self.assertEqual(removed, 1)
+        self.assertEqual(StoredFile.objects.get(name=claimed).ref_count, 1)
+        self.assertTrue(default_storage.exists(claimed))
+        self.assertFalse(StoredFile.objects.filter(name=unclaimed).exists())
+        self.assertFalse(default_storage.exists(unclaimed))
+
+
+
+class ReplacedImageTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        self.turf = Turf.objects.create(
+            owner=owner, name="Corner Ground", price_per_hour=Decimal('500'),
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+        rendition = default_storage.save('renditions/photo/card-400.webp', ContentFile(b'old card'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.turf.main_image.save('photo.jpg', ContentFile(b'old photo'))
+        # As build_renditions records them.
+        self.turf.main_image_renditions = {'card': [[400, rendition]]}
+        Turf.objects.filter(pk=self.turf.pk).update(main_image_renditions=self.turf.main_image_renditions)
+        self.old = [self.turf.main_image.name, rendition]
+
+    def ref_counts(self, names):
+        return [StoredFile.objects.get(name=name).ref_count for name in names]
+
+    def test_image_only_update_fields_releases_old_image(self):
+        self.assertEqual(self.ref_counts(self.old), [1, 1])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.turf.main_image.save('photo.jpg', ContentFile(b'new photo'), save=False)
+            self.turf.save(update_fields=['main_image'])
+        self.assertEqual(self.ref_counts(self.old), [0, 0])
+        self.turf.refresh_from_db()
+        self.assertEqual(self.turf.main_image_renditions, {})
+        self.assertEqual(self.ref_counts([self.turf.main_image.name]), [1])
+
+    def test_unrelated_update_fields_keep_image(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.turf.name = "Renamed Ground"
+            self.turf.save(update_fields=['name'])
+        self.assertEqual(self.ref_counts(self.old), [1, 1])
+
+
+class ArchiveBookingsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.turf = Turf.objects.create(
+            owner=owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+
+    def book(self, days_ago, status):
+        start = timezone.now() - timedelta(days=days_ago)
+        return Booking.objects.create(
+            turf=self.turf, user=self.player, amount=Decimal('500'), status=status,
+            start_time=start, end_time=start + timedelta(hours=1),
+        )
+
+    def test_moves_only_old_finished_bookings(self):
+        completed, cancelled = self.book(60, 'completed'), self.book(50, 'cancelled')
+        unfinished, recent = self.book(70, 'confirmed'), self.book(2, 'completed')
+        call_command('archive_bookings', batch_size=1, stdout=io.StringIO())
+
+        self.assertQuerySetEqual(Booking.objects.order_by('id'), [unfinished, recent])
+        self.assertEqual(
+            list(ArchivedBooking.objects.order_by('id').values_list('id', 'status', 'amount')),
+            [(completed.id, 'completed', Decimal('500')), (cancelled.id, 'cancelled', Decimal('500'))],
+        )
+        self.assertIsInstance(archive.get_booking_or_404(completed.id), ArchivedBooking)
+
+    def test_history_reads_both_tables(self):
+        bookings = [self.book(days_ago, 'completed') for days_ago in (90, 2, 40)]
+        call_command('archive_bookings', stdout=io.StringIO())
+
+        self.client.force_login(self.player)
+        response = self.client.get(reverse('users:my_bookings'))
+        self.assertEqual([booking.id for booking in response.context['past_bookings']],
+                         [bookings[1].id, bookings[2].id, bookings[0].id])
+        response = self.client.get(reverse('turfs:booking_detail', args=[bookings[0].id]))
+        self.assertEqual(response.status_code, 200)
+
+class OwnerTimelineTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.turfs = [
+            Turf.objects.create(
+                owner=cls.owner, name=name, price_per_hour=Decimal('500'), approval_status='approved',
+                address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+                opening_time=time(6), closing_time=time(22),
+            )
+            for name in ("Annexe", "Main Ground")
+        ]
+        cls.day = timezone.localdate() + timedelta(days=1)
+
+    def book(self, turf, start, end, status='confirmed'):
+        return Booking.objects.create(
+            turf=turf, user=self.player, amount=Decimal('500'), status=status,
+            start_time=timezone.make_aware(datetime.combine(self.day, start)),
+            end_time=timezone.make_aware(datetime.combine(self.day, end)),
+        )
+
+    def test_overlapping_bookings_get_their_own_lanes(self):
+        annexe, main = self.turfs
+        first = self.book(annexe, time(9), time(10), 'pending')
+        overlapping = self.book(annexe, time(9, 30), time(10, 30))
+        later = self.book(annexe, time(10, 30), time(11, 30))
+        self.book(annexe, time(12), time(13), 'cancelled')
+        other = self.book(main, time(6), time(7))
+
+        self.client.force_login(self.owner)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('turfs:owner_timeline'), {'date': self.day.isoformat()})
+        self.assertEqual(sum('"Turfs_booking"' in query['sql'] for query in queries), 1)
+
+        annexe_row, main_row = response.context['rows']
+        lanes = {item['booking'].id: item['top'] // timeline.LANE_HEIGHT for item in annexe_row['items']}
+        self.assertEqual(lanes, {first.id: 0, overlapping.id: 1, later.id: 0})
+        self.assertEqual(annexe_row['height'], 2 * timeline.LANE_HEIGHT)
+        # The day view spans 06:00-22:00, so a 06:00-07:00 booking starts at the left edge.
+        [item] = main_row['items']
+        self.assertEqual((item['booking'].id, item['left'], item['width']), (other.id, 0, 100 / 16))
+
+class RecommendationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.turfs = {
+            name: Turf.objects.create(
+                owner=owner, name=name, price_per_hour=Decimal('500'), approval_status='approved', rating=rating,
+                address_line_1="1 Main Road", city=city, district=city, state="Kerala", pincode='682001',
+                opening_time=time(6), closing_time=time(22),
+            )
+            for name, city, rating in [
+                ("Arena", "Kochi", Decimal('3.0')), ("Box", "Kochi", Decimal('3.0')),
+                ("Court", "Kochi", Decimal('3.0')), ("Dome", "Thrissur", Decimal('5.0')),
+            ]
+        }
+        cls.regular, cls.newcomer, cls.fresh = [
+            User.objects.create_user(name, f'{name}@example.com', 'x') for name in ('regular', 'newcomer', 'fresh')
+        ]
+        start = timezone.now() - timedelta(days=3)
+        for user, name in [(cls.regular, "Arena"), (cls.regular, "Box"), (cls.newcomer, "Arena")]:
+            Booking.objects.create(
+                turf=cls.turfs[name], user=user, amount=Decimal('500'), status='completed',
+                start_time=start, end_time=start + timedelta(hours=1),
+            )
+
+    def test_similar_turfs_rank_first(self):
+        self.assertEqual(build_recommendations(top_k=3), 2)
+        names = [turf.name for turf in recommended_turfs_for(self.newcomer)]
+        # Box is booked by the player who shares Arena with them; Arena itself is left out.
+        self.assertEqual(names[0], "Box")
+        self.assertNotIn("Arena", names)
+
+    def test_players_without_history_get_the_cold_start_list(self):
+        build_recommendations(top_k=2)
+        self.assertFalse(TurfRecommendation.objects.filter(user=self.fresh).exists())
+        self.assertEqual([turf.name for turf in recommended_turfs_for(self.fresh)], ["Arena", "Box"])
+
+        self.client.force_login(self.fresh)
+        response = self.client.get(reverse('users:dashboard_player'))
+        self.assertEqual([turf.name for turf in response.context['recommended_turfs']], ["Arena", "Box"])
+
+class AutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.turfs = {
+            name: Turf.objects.create(
+                owner=cls.owner, name=name, price_per_hour=Decimal('500'), approval_status=status,
+                address_line_1="1 Main Road", city=city, district="Ernakulam", state="Kerala", pincode='682001',
+                opening_time=time(6), closing_time=time(22),
+            )
+            for name, city, status in [
+                ("Green Arena", "Kochi", 'approved'), ("Arena One", "Kakkanad", 'approved'),
+                ("Arena Pending", "Kochi", 'pending'),
+            ]
+        }
+        start = timezone.now() - timedelta(days=1)
+        for _ in range(2):
+            Booking.objects.create(
+                turf=cls.turfs["Green Arena"], user=player, amount=Decimal('500'), status='completed',
+                start_time=start, end_time=start + timedelta(hours=1),
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        autocomplete._index = None
+        self.addCleanup(setattr, autocomplete, '_index', None)
+        self.client.force_login(self.owner)
+
+    def suggest(self, q):
+        response = self.client.get(reverse('turfs:turf_autocomplete'), {'q': q})
+        return [(result['kind'], result['label']) for result in response.json()['results']]
+
+    def test_matches_later_words_most_booked_first(self):
+        self.assertEqual(self.suggest('  ARENA'), [('turf', "Green Arena"), ('turf', "Arena One")])
+        self.assertEqual(self.suggest('k'), [('city', "Kochi"), ('city', "Kakkanad")])
+        self.assertEqual(self.suggest('ka'), [('city', "Kakkanad")])
+
+    def test_turf_changes_are_spliced_into_the_snapshot(self):
+        self.suggest('arena')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.turfs["Arena One"].name = "Blue Court"
+            self.turfs["Arena One"].save()
+            self.turfs["Arena Pending"].approval_status = 'approved'
+            self.turfs["Arena Pending"].save()
+        spliced = autocomplete._index
+        rebuilt = autocomplete.build_index(spliced.version)
+        for q in ('a', 'ar', 'arena', 'b', 'blue', 'court', 'k', 'kakkanad', 'ernakulam'):
+            with self.subTest(q=q):
+                self.assertEqual(spliced.search(q), rebuilt.search(q))
+        self.assertEqual(self.suggest('court'), [('turf', "Blue Court")])
+        self.assertEqual(self.suggest('arena'), [('turf', "Green Arena"), ('turf', "Arena Pending")])
+
+@override_settings(CHANGE_FEED_TOKEN='feed-token')
+class ChangeFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.turf = Turf.objects.create(
+            owner=cls.owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+
+    def feed(self, token='feed-token', **params):
+        return self.client.get(reverse('turfs:change_feed'), params, headers={'Authorization': f'Bearer {token}'})
+
+    def test_booking_changes_are_paged_by_cursor(self):
+        form = BookingForm({
+            'date': timezone.localdate() + timedelta(days=1), 'start_time': time(9), 'end_time': time(10),
+        }, turf=self.turf)
+        with transaction.atomic():
+            self.assertTrue(form.is_valid(), form.errors)
+            booking = form.save(self.player)
+        self.client.force_login(self.owner)
+        self.client.post(reverse('turfs:manage_booking', args=[booking.id]), {'action': 'confirm'})
+        self.client.logout()
+        events.record(events.turf_event(self.turf, 'turf.updated', changed=['name']))
+
+        first = self.feed(limit=1, entity='booking').json()
+        [created] = first['events']
+        self.assertEqual((created['kind'], created['entity_id']), ('booking.created', booking.id))
+        self.assertEqual(created['data']['status'], 'pending')
+        self.assertTrue(first['has_more'])
+
+        second = self.feed(after=first['next'], entity='booking').json()
+        self.assertEqual([(event['kind'], event['data']) for event in second['events']],
+                         [('booking.status_changed', {'from': 'pending', 'to': 'confirmed'})])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(self.feed(after=second['next']).json()['events'][0]['kind'], 'turf.updated')
+
+    def test_requires_token_or_staff(self):
+        self.assertEqual(self.feed(token='wrong').status_code, 403)
+        self.client.force_login(User.objects.create_user('staff', 'staff@example.com', 'x', is_staff=True))
+        self.assertEqual(self.client.get(reverse('turfs:change_feed')).status_code, 200)
+
+class ManageBookingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        turf = Turf.objects.create(
+            owner=cls.owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+        start = timezone.now() + timedelta(days=1)
+        cls.booking = Booking.objects.create(
+            turf=turf, user=cls.player, amount=Decimal('500'), status='pending',
+            start_time=start, end_time=start + timedelta(hours=1),
+        )
+
+    def confirm(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('turfs:manage_booking', args=[self.booking.id]), {'action': 'confirm'},
+                HTTP_ACCEPT='application/json',
+            )
+        self.assertEqual(response.json()['status'], 'confirmed')
+
+    def test_confirming_notifies_player_once(self):
+        self.client.force_login(self.owner)
+        self.confirm()
+        self.confirm()
+        self.assertEqual(list(Notification.objects.values_list('user_id', 'kind')),
+                         [(self.player.id, 'booking_confirmed')])
+
+@override_settings(BOOKING_REMINDER_LEASE_SECONDS=600)
+class BookingReminderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        turf = Turf.objects.create(
+            owner=owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+        start = timezone.now() + timedelta(hours=2)
+        cls.bookings = [
+            Booking.objects.create(
+                turf=turf, user=User.objects.create_user(f'player{i}', f'player{i}@example.com', 'x'),
+                amount=Decimal('500'), status='confirmed', start_time=start, end_time=start + timedelta(hours=1),
+            )
+            for i in range(3)
+        ]
+
+    def send(self, connection=None):
+        return list(send_booking_reminders(24, ['confirmed'], batch_size=10, connection=connection))
+
+    def test_claims_of_a_dead_run_are_retried_after_the_lease(self):
+        ids = [booking.id for booking in self.bookings]
+        Booking.objects.filter(id__in=ids[:2]).update(
+            reminder_claim=uuid.uuid4(), reminder_claimed_at=timezone.now() - timedelta(seconds=601),
+        )
+        Booking.objects.filter(id=ids[2]).update(reminder_claim=uuid.uuid4(), reminder_claimed_at=timezone.now())
+
+        self.assertEqual(self.send(), [(2, 2)])
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['player0@example.com', 'player1@example.com'])
+        self.assertEqual(Booking.objects.filter(reminder_sent_at__isnull=False).count(), 2)
+
+    def test_only_sent_messages_are_stamped(self):
+        class FlakyBackend(EmailBackend):
+            def send_messages(self, messages):
+                return 0 if messages[0].to == ['player1@example.com'] else super().send_messages(messages)
+
+        self.assertEqual(self.send(FlakyBackend()), [(3, 2)])
+        unsent = Booking.objects.get(reminder_sent_at__isnull=True)
+        self.assertEqual(unsent.user.email, 'player1@example.com')
+        self.assertIsNotNone(unsent.reminder_claim)
+
+        # Nothing is due again until its lease runs out.
+        self.assertEqual(self.send(), [])
+        Booking.objects.filter(id=unsent.id).update(reminder_claimed_at=timezone.now() - timedelta(seconds=601))
+        self.assertEqual(self.send(), [(1, 1)])
+
+
+@override_settings(JOB_LEASE_SECONDS=300, JOB_RETRY_BACKOFF=10, JOB_MAX_ATTEMPTS=2)
+class JobQueueTests(TestCase):
+    runs = []
+
+    def setUp(self):
+        self.runs.clear()
+
+    def test_runs_highest_priority_first(self):
+        jobs.enqueue(record_run_task, priority=jobs.PRIORITY_LOW, calls='low')
+        jobs.enqueue(record_run_task, priority=jobs.PRIORITY_HIGH, calls='high')
+        jobs.enqueue(record_run_task, calls='later', delay=timedelta(hours=1))
+        self.assertEqual(jobs.work(threading.Event(), burst=True), 2)
+        self.assertEqual(self.runs, ['high', 'low'])
+        self.assertEqual(list(Job.objects.values_list('status', flat=True)), ['queued'])
+
+    def test_failures_back_off_then_die(self):
+        job = jobs.enqueue(record_run_task, calls='flaky', fail=True)
+        [claimed] = jobs.claim()
+        with self.assertLogs('Turfs.jobs', 'WARNING'):
+            self.assertFalse(jobs.run(claimed))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertAlmostEqual((job.run_at - timezone.now()).total_seconds(), 10, delta=2.5)
+        self.assertIn("RuntimeError: boom", job.last_error)
+
+        [claimed] = jobs.claim(now=job.run_at)
+        with self.assertLogs('Turfs.jobs', 'ERROR'):
+            self.assertFalse(jobs.run(claimed))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('dead', 2))
+
+    def test_expired_lease_is_requeued_and_the_old_claim_cannot_finish(self):
+        jobs.enqueue(record_run_task, calls='slow')
+        [stale] = jobs.claim()
+        self.assertEqual(jobs.requeue_expired(), 0)
+        expired = stale.lease_until + timedelta(seconds=1)
+        self.assertEqual(jobs.requeue_expired(now=expired), 1)
+
+        [fresh] = jobs.claim(now=expired)
+        self.assertEqual(fresh.attempts, 1)
+        self.assertTrue(jobs.run(stale))
+        # The stale run could not delete the job another worker now holds.
+        self.assertTrue(Job.objects.filter(id=fresh.id, status='running').exists())
+        self.assertTrue(jobs.run(fresh))
+        self.assertFalse(Job.objects.exists())
+
+    def test_only_tasks_can_be_enqueued(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue(print, calls='nope')
+
+@override_settings(PURGE_CHUNK_SIZE=2)
+class PurgeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.other_owner = User.objects.create_user('other', 'other@example.com', 'x', user_type='turf_owner')
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.turfs = [
+            Turf.objects.create(
+                owner=owner, name=name, price_per_hour=Decimal('500'), approval_status='approved',
+                address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+                opening_time=time(6), closing_time=time(22),
+            )
+            for owner, name in [(cls.owner, "Annexe"), (cls.owner, "Main Ground"), (cls.other_owner, "Elsewhere")]
+        ]
+        cls.day = timezone.localdate() + timedelta(days=1)
+        for turf in cls.turfs:
+            cls.player.favorites.add(turf)
+            for hour in (9, 10, 11):
+                booking = Booking.objects.create(
+                    turf=turf, user=cls.player, amount=Decimal('500'), status='confirmed',
+                    start_time=timezone.make_aware(datetime.combine(cls.day, time(hour))),
+                    end_time=timezone.make_aware(datetime.combine(cls.day, time(hour + 1))),
+                )
+                refresh_booking(booking)
+
+    def test_account_is_hidden_at_once_and_purged_by_a_worker(self):
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            deletion = purge.delete_account(self.owner)
+        self.owner.refresh_from_db()
+        self.assertFalse(self.owner.is_active)
+        self.client.force_login(self.player)
+        response = self.client.get(reverse('turfs:turf_search'))
+        self.assertEqual([turf.name for turf in response.context['turfs']], ["Elsewhere"])
+        self.assertEqual(Booking.objects.count(), 9)
+
+        jobs.work(threading.Event(), burst=True)
+        deletion.refresh_from_db()
+        self.assertEqual(deletion.status, 'done')
+        self.assertFalse(User.objects.filter(pk=self.owner.pk).exists())
+        self.assertQuerySetEqual(Turf._base_manager.all(), [self.turfs[2]])
+        self.assertEqual(Booking.objects.count(), 3)
+        self.assertQuerySetEqual(self.player.favorites.all(), [self.turfs[2]])
+        # Owner, two turfs, six bookings, two favorites and two slot summaries.
+        self.assertEqual(deletion.rows_deleted, 13)
+
+    def test_player_purge_frees_their_slots(self):
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            purge.delete_account(self.player)
+        jobs.work(threading.Event(), burst=True)
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(DailySlotSummary.objects.exists())
+        self.assertTrue(Turf.objects.filter(pk=self.turfs[0].pk).exists())
+
+class PaymentNotificationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        turf = Turf.objects.create(
+            owner=owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+        start = timezone.now() + timedelta(days=1)
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.booking = Booking.objects.create(
+            turf=turf, user=cls.player, amount=Decimal('500'), start_time=start, end_time=start + timedelta(hours=1),
+        )
+
+    def event(self):
+        return payments.parse_event(json.dumps({
+            'id': 'evt_1', 'type': 'payment.succeeded', 'created': timezone.now().timestamp(),
+            'data': {'booking_id': self.booking.id, 'payment_id': 'pay_1', 'amount': '500'},
+        }).encode())
+
+    def test_notification_is_queued_once_and_sent_by_a_worker(self):
+        self.assertEqual(payments.handle_event(self.event()), 'applied')
+        self.assertEqual(payments.handle_event(self.event()), 'duplicate')
+        self.assertEqual(Job.objects.filter(task=jobs.task_name(payments.notify_player_task)).count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+        jobs.work(threading.Event(), burst=True)
+        notification = Notification.objects.get(user=self.player)
+        self.assertEqual(notification.kind, 'payment_received')
+        self.assertIn("₹500", notification.message)
+        self.assertFalse(Job.objects.exists())
+
+
+class PaymentWebhookTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        turf = Turf.objects.create(
+            owner=owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+        start = timezone.now() + timedelta(days=1)
+        player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.booking = Booking.objects.create(
+            turf=turf, user=player, amount=Decimal('500'), start_time=start, end_time=start + timedelta(hours=1),
+        )
+
+    def deliver(self, event_id, event_type, created, signature=None):
+        body = json.dumps({
+            'id': event_id, 'type': event_type, 'created': created.timestamp(),
+            'data': {'booking_id': self.booking.id, 'payment_id': 'pay_1', 'amount': '500'},
+        }).encode()
+        return self.client.post(
+            reverse('turfs:payment_webhook'), body, content_type='application/json',
+            headers={payments.SIGNATURE_HEADER: signature or payments.sign(body)},
+        )
+
+    def test_redelivered_event_is_applied_once(self):
+        now = timezone.now()
+        self.assertEqual(self.deliver('evt_1', 'payment.succeeded', now).json(), {'status': 'applied'})
+        self.assertEqual(self.deliver('evt_1', 'payment.succeeded', now).json(), {'status': 'duplicate'})
+        self.assertEqual(PaymentEvent.objects.count(), 1)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_older_event_arriving_late_is_ignored(self):
+        now = timezone.now()
+        self.deliver('evt_2', 'payment.succeeded', now)
+        self.assertEqual(
+            self.deliver('evt_1', 'payment.failed', now - timedelta(seconds=5)).json(), {'status': 'ignored'},
+        )
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.payment_status, payments.EVENT_PAYMENT_STATUS['payment.succeeded'])
+
+    def test_bad_signature_is_rejected(self):
+        response = self.deliver('evt_1', 'payment.succeeded', timezone.now(), signature='0' * 64)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(PaymentEvent.objects.exists())
+
+@override_settings(LIVE_STREAM_MAX_SECONDS=0.2, LIVE_STREAM_HEARTBEAT=0.1)
+class LiveSlotStreamTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+        cls.turf = Turf.objects.create(
+            owner=owner, name="Corner Ground", price_per_hour=Decimal('500'), approval_status='approved',
+            address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+            opening_time=time(6), closing_time=time(22),
+        )
+        cls.day = timezone.localdate() + timedelta(days=1)
+        DailySlotSummary.objects.create(turf=cls.turf, day=cls.day, booked_mask=1 << 9)
+
+    def url(self):
+        return reverse('turfs:slot_stream', args=[self.turf.id]) + f'?date={self.day.isoformat()}'
+
+    def test_middleware_stays_async_under_asgi(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        for middleware_class in (CheckUserActiveMiddleware, RateLimitMiddleware, StickyPrimaryMiddleware):
+            with self.subTest(middleware=middleware_class.__name__):
+                self.assertTrue(iscoroutinefunction(middleware_class(get_response)))
+        self.assertTrue(iscoroutinefunction(RateLimitMiddleware(get_response).process_view))
+
+    async def test_stream_sends_current_slots(self):
+        client = AsyncClient()
+        await client.aforce_login(self.player)
+        response = await client.get(self.url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertIn(f'"booked": {1 << 9}', body)
+
+
+class FacetSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.parking, cls.lights = Amenity.objects.create(name="Parking"), Amenity.objects.create(name="Floodlights")
+        for name, city, price, rating, amenities in [
+            ("A", "Kochi", 400, 4.5, [cls.parking, cls.lights]),
+            ("B", "kochi", 800, 3.5, [cls.parking]),
+            ("C", "Kochi", 1200, 2.5, []),
+            ("D", "Delhi", 800, 4.0, [cls.lights]),
+        ]:
+            turf = Turf.objects.create(
+                owner=owner, name=name, price_per_hour=Decimal(price), rating=Decimal(str(rating)),
+                approval_status='approved', address_line_1="1 Main Road", city=city, district="Central",
+                state="State", pincode='682001', opening_time=time(6), closing_time=time(22),
+            )
+            turf.amenities.set(amenities)
+        cls.amenities = [cls.lights, cls.parking]
+
+    def facets(self, query, queries):
+        filters = search.parse_filters(QueryDict(query), self.amenities)
+        with self.assertNumQueries(queries):
+            return search.facet_counts(Turf.objects.all(), filters, self.amenities)
+
+    def test_counts_without_filters(self):
+        facets = self.facets('', queries=3)
+        self.assertEqual(facets['total'], 4)
+        self.assertEqual([option['count'] for option in facets['amenities']], [2, 2])
+        self.assertEqual([option['count'] for option in facets['price']], [1, 2, 1, 0])
+        self.assertEqual([option['count'] for option in facets['rating']], [2, 3, 4])
+        self.assertEqual([(option['value'], option['count']) for option in facets['city']], [('Kochi', 3), ('Delhi', 1)])
+
+    def test_each_facet_counts_over_the_other_filters(self):
+        facets = self.facets(f'price=500-1000&city=Kochi&amenity={self.parking.id}', queries=4)
+        self.assertEqual(facets['total'], 1)
+        # Amenities count among the current results.
+        self.assertEqual([option['count'] for option in facets['amenities']], [0, 1])
+        # Prices ignore the price filter, cities the city filter.
+        self.assertEqual([option['count'] for option in facets['price']], [1, 1, 0, 0])
+        self.assertEqual([(option['value'], option['count']) for option in facets['city']], [('Kochi', 1)])
+
+    def test_amenity_masks_follow_amenities(self):
+        turf = Turf.objects.get(name="C")
+        turf.amenities.add(self.lights)
+        self.assertEqual(Turf.objects.get(name="C").amenity_mask, 1 << self.lights.bit)
+        turf_ids = list(Turf.objects.values_list('id', flat=True))
+        Turf.objects.update(amenity_mask=0)
+        with self.assertNumQueries(2):
+            search.refresh_amenity_masks(turf_ids)
+        self.assertEqual(Turf.objects.get(name="A").amenity_mask, 1 << self.parking.bit | 1 << self.lights.bit)
@@ -9,14 +9,22 @@ urlpatterns = [
     path('<int:turf_id>/', views.turf_detail_view, name='turf_detail'),
     path('add/', views.turf_add_view, name='turf_add'),
     path('<int:turf_id>/edit/', views.turf_edit_view, name='turf_edit'),
+    path('<int:turf_id>/slots/stream/', views.turf_slot_stream_view, name='slot_stream'),
+    path('<int:turf_id>/pricing/', views.turf_pricing_view, name='turf_pricing'),
     path('<int:turf_id>/delete/', views.turf_delete_view, name='turf_delete'),
     path('bookings/<int:booking_id>/', views.booking_detail_view, name='booking_detail'),
     path('bookings/<int:booking_id>/manage/', views.manage_booking_view, name='manage_booking'),
     path('bookings/<int:booking_id>/receipt/', views.booking_receipt_pdf_view, name='booking_receipt'),
         # --- Player-Facing Views ---
     path('search/', views.turf_search_view, name='turf_search'),
+    path('search/suggest/', views.turf_autocomplete_view, name='turf_autocomplete'),
     path('<int:turf_id>/', views.turf_detail_view, name='turf_detail'),
     
         #owner-specific pages
     path('all-bookings/', views.all_bookings, name='all_bookings'),
+    path('timeline/', views.owner_timeline_view, name='owner_timeline'),
+
+        # Payment gateway callbacks
+    path('payments/webhook/', views.payment_webhook_view, name='payment_webhook'),
+    path('events/', views.change_feed_view, name='change_feed'),
 ]
\ No newline at end of file
@@ -1,54 +1,33 @@
 # Turfs/views.py
 
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import Turf, Booking
-from .forms import TurfForm, BookingForm
+from .models import Turf, Booking, ArchivedBooking, Amenity, ChangeEvent
+from .archive import get_booking_or_404, booking_history
+from .forms import TurfForm, BookingForm, PricingRuleFormSet
+from .pricing import slot_prices, weekly_prices
+from .availability import last_bookable_day, refresh_booking, with_free_slot, next_available
 from datetime import datetime, date, time, timedelta
 from django.utils import timezone
 from django.views.decorators.http import require_POST
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.views.decorators.csrf import csrf_exempt
 from django.template.loader import render_to_string
-from weasyprint import HTML
 from django.db.models import Q
-import qrcode
+from django.db import transaction
 import io
 import base64
 from Users.decorators import turf_owner_required
-
-# --- NEW BOOKING MANAGEMENT VIEW ---
-try:
-    from weasyprint import HTML
-except OSError:
-    HTML = None
-
-@require_POST # This decorator ensures this view only accepts POST requests
-@login_required
-def manage_booking_view(request, booking_id):
-    """
-    Handles actions on a booking like confirm, reject, or cancel.
-    """
-    booking = get_object_or_404(Booking, id=booking_id)
-    action = request.POST.get('action')
-
-    # Security check and action handling
-    if action == 'confirm' and request.user == booking.turf.owner:
-        booking.status = 'confirmed'
-        messages.success(request, f"Booking #{booking.id} has been confirmed.")
-    elif action == 'reject' and request.user == booking.turf.owner:
-        booking.status = 'cancelled' # Or you could add a 'rejected' status
-        messages.warning(request, f"Booking #{booking.id} has been rejected.")
-    elif action == 'cancel' and request.user == booking.user:
-        booking.status = 'cancelled'
-        messages.info(request, "Your booking has been cancelled.")
-    else:
-        messages.error(request, "You are not authorized to perform this action.")
-        return redirect(request.user.get_dashboard_url())
-
-    booking.save()
-    return redirect('turfs:booking_detail', booking_id=booking.id)
-
+from Users.notifications import notify
+from Turfie.replicas import use_replica
+from . import autocomplete, events, live, payments, purge, search, timeline
+from .images import (
+    schedule_renditions, rendition_name_for,
+    TURF_IMAGE_RENDITIONS, GALLERY_IMAGE_RENDITIONS,
+)
 
 # --- Turf Management Views (No changes here) ---
 @login_required
@@ -64,8 +43,15 @@ def turf_add_view(request):
         if form.is_valid():
             turf = form.save(commit=False)
             turf.owner = request.user
-            turf.save()
-            form.save_m2m() 
+            with transaction.atomic():
+                turf.save()
+                form.save_m2m()
+                events.record(events.turf_event(
+                    turf, 'turf.created', owner_id=turf.owner_id, name=turf.name, approval_status=turf.approval_status,
+                ))
+            schedule_renditions(turf, 'main_image', TURF_IMAGE_RENDITIONS)
+            for image in form.save_gallery(turf):
+                schedule_renditions(image, 'image', GALLERY_IMAGE_RENDITIONS)
             messages.success(request, f"Successfully added '{turf.name}'.")
             return redirect('turfs:turf_list')
     else:
@@ -82,7 +68,14 @@ def turf_edit_view(request, turf_id):
     if request.method == 'POST':
         form = TurfForm(request.POST, request.FILES, instance=turf)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                turf = form.save()
+                if form.changed_data:
+                    events.record(events.turf_event(turf, 'turf.updated', changed=form.changed_data))
+            if 'main_image' in form.changed_data:
+                schedule_renditions(turf, 'main_image', TURF_IMAGE_RENDITIONS)
+            for image in form.save_gallery(turf):
+                schedule_renditions(image, 'image', GALLERY_IMAGE_RENDITIONS)
             messages.success(request, f"Successfully updated '{turf.name}'.")
             return redirect('turfs:turf_list')
     else:
@@ -90,6 +83,28 @@ def turf_edit_view(request, turf_id):
     context = {'form': form, 'turf': turf}
     return render(request, 'turfs/edit_turf.html', context)
 
+@login_required
+def turf_pricing_view(request, turf_id):
+    turf = get_object_or_404(Turf, id=turf_id)
+    if turf.owner != request.user:
+        messages.error(request, "You are not authorized to edit this turf.")
+        return redirect('turfs:turf_list')
+    if request.method == 'POST':
+        formset = PricingRuleFormSet(request.POST, instance=turf)
+        if formset.is_valid():
+            # One transaction, so the price table is recompiled against the final set of rules.
+            with transaction.atomic():
+                formset.save()
+            messages.success(request, f"Pricing for '{turf.name}' updated.")
+            return redirect('turfs:turf_pricing', turf_id=turf.id)
+    else:
+        formset = PricingRuleFormSet(instance=turf)
+    # Preview only the hours the turf is open.
+    open_hours = range(turf.opening_time.hour, turf.closing_time.hour + (turf.closing_time.minute > 0))
+    weekly = [row for row in weekly_prices(turf) if row[0] in open_hours]
+    context = {'formset': formset, 'turf': turf, 'weekly': weekly}
+    return render(request, 'turfs/turf_pricing.html', context)
+
 @login_required
 def turf_delete_view(request, turf_id):
     turf = get_object_or_404(Turf, id=turf_id)
@@ -98,7 +113,9 @@ def turf_delete_view(request, turf_id):
         return redirect('turfs:turf_list')
     if request.method == 'POST':
         turf_name = turf.name
-        turf.delete()
+        with transaction.atomic():
+            events.record(events.turf_event(turf, 'turf.deleted'))
+            purge.delete_turf(turf)
         messages.success(request, f"Successfully deleted '{turf_name}'.")
         return redirect('turfs:turf_list')
     context = {'turf': turf}
@@ -108,13 +125,13 @@ def turf_delete_view(request, turf_id):
 # --- Turf Booking Views (Updated Logic) ---
 @login_required
 def turf_detail_view(request, turf_id):
-    turf = get_object_or_404(Turf, id=turf_id)
+    turf = get_object_or_404(Turf.objects.prefetch_related('images', 'amenities'), id=turf_id)
     
     # --- Time Slot & Date Logic ---
     today = timezone.now().date()
     selected_date_str = request.GET.get('date', today.strftime('%Y-%m-%d'))
     selected_date = datetime.strptime(selected_date_str, '%Y-%m-%d').date()
-    max_date = today + timedelta(days=7)
+    max_date = last_bookable_day(today)
 
     bookings_on_date = Booking.objects.filter(
         turf=turf, 
@@ -138,26 +155,18 @@ def turf_detail_view(request, turf_id):
         })
         current_time += timedelta(hours=1)
 
+    for slot, price in zip(time_slots, slot_prices(turf, selected_date, [slot['start_time'] for slot in time_slots])):
+        slot['price'] = price
+
     # --- Booking Form Handling ---
     if request.method == 'POST':
         booking_form = BookingForm(request.POST, turf=turf)
-        if booking_form.is_valid():
-            # ... (your existing POST logic remains the same)
-            date_val = booking_form.cleaned_data['date']
-            start_time_val = booking_form.cleaned_data['start_time']
-            end_time_val = booking_form.cleaned_data['end_time']
-            
-            start_datetime = timezone.make_aware(datetime.combine(date_val, start_time_val))
-            end_datetime = timezone.make_aware(datetime.combine(date_val, end_time_val))
-            
-            duration = (end_datetime - start_datetime).total_seconds() / 3600
-            amount = duration * float(turf.price_per_hour)
-
-            Booking.objects.create(
-                turf=turf, user=request.user, start_time=start_datetime,
-                end_time=end_datetime, amount=amount, status='pending'
-            )
-            
+        # Validate and insert in one transaction. With the production SQLite
+        # profile it is BEGIN IMMEDIATE, so concurrent requests for the same
+        # slot queue on the write lock and cannot both pass the overlap check.
+        with transaction.atomic():
+            booking = booking_form.save(request.user) if booking_form.is_valid() else None
+        if booking is not None:
             messages.success(request, f"Your booking for {turf.name} is pending confirmation.")
             return redirect('users:my_bookings')
     else:
@@ -174,39 +183,86 @@ def turf_detail_view(request, turf_id):
     return render(request, 'turfs/turf_detail.html', context)
 
 
+@login_required
+async def turf_slot_stream_view(request, turf_id):
+    """
+    Server-Sent Events stream of a turf's booked slots on `?date=`, which the
+    turf page uses to grey out slots as soon as someone books them (see
+    Turfs/live.py). An open stream is a coroutine waiting on the event loop,
+    not a worker thread, so it needs an ASGI server; under WSGI it answers
+    204, which tells the browser not to reconnect.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    try:
+        day = date.fromisoformat(request.GET.get('date', ''))
+    except ValueError:
+        return HttpResponseBadRequest("date must be YYYY-MM-DD.")
+    await aget_object_or_404(Turf.objects.only('id'), id=turf_id)
+
+    response = StreamingHttpResponse(live.slot_events(turf_id, day), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
 @require_POST # This decorator ensures this view only accepts POST requests
 @login_required
 def manage_booking_view(request, booking_id):
     """
     Handles actions on a booking like confirm, reject, or cancel.
+
+    Requests that accept JSON only (the owner timeline's quick actions) get
+    the new status back instead of a redirect.
     """
     booking = get_object_or_404(Booking, id=booking_id)
+    previous_status = booking.status
     action = request.POST.get('action')
+    wants_json = request.accepts('application/json') and not request.accepts('text/html')
+
+    booking_link = reverse('turfs:booking_detail', args=[booking.id])
+    when = timezone.localtime(booking.start_time).strftime('%d %b, %I:%M %p')
 
     # Security check and action handling
     if action == 'confirm' and request.user == booking.turf.owner:
         booking.status = 'confirmed'
-        messages.success(request, f"Booking #{booking.id} has been confirmed.")
+        message = (messages.SUCCESS, f"Booking #{booking.id} has been confirmed.")
+        notification = (booking.user_id, 'booking_confirmed',
+                        f"Your booking at {booking.turf.name} on {when} is confirmed.", booking_link)
     elif action == 'reject' and request.user == booking.turf.owner:
         booking.status = 'cancelled' # Or you could add a 'rejected' status
-        messages.warning(request, f"Booking #{booking.id} has been rejected.")
+        message = (messages.WARNING, f"Booking #{booking.id} has been rejected.")
+        notification = (booking.user_id, 'booking_rejected',
+                        f"Your booking at {booking.turf.name} on {when} was rejected.", booking_link)
     elif action == 'cancel' and request.user == booking.user:
         booking.status = 'cancelled'
-        messages.info(request, "Your booking has been cancelled.")
+        message = (messages.INFO, "Your booking has been cancelled.")
+        notification = (booking.turf.owner_id, 'booking_cancelled',
+                        f"{booking.user.username} cancelled their booking at {booking.turf.name} on {when}.", booking_link)
     else:
+        if wants_json:
+            return JsonResponse({'error': "You are not authorized to perform this action."}, status=403)
         messages.error(request, "You are not authorized to perform this action.")
         return redirect(request.user.get_dashboard_url())
 
-    booking.save()
+    with transaction.atomic():
+        booking.save()
+        refresh_booking(booking)
+        if booking.status != previous_status:
+            notify(notification)
+            events.record(events.booking_event(
+                booking, 'booking.status_changed', **{'from': previous_status, 'to': booking.status}
+            ))
+    if wants_json:
+        return JsonResponse({'id': booking.id, 'status': booking.status, 'status_display': booking.get_status_display()})
+    messages.add_message(request, *message)
     return redirect('turfs:booking_detail', booking_id=booking.id)
 
-from .models import Booking 
-
 # ... (add this function with your other views)
 @login_required
 def booking_detail_view(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id)
+    booking = get_booking_or_404(booking_id)
     
     # Security check: ensure the user is either the player or the turf owner
     if request.user != booking.user and request.user != booking.turf.owner:
@@ -219,12 +275,21 @@ def booking_detail_view(request, booking_id):
 
 @login_required
 def booking_receipt_pdf_view(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id)
+    booking = get_booking_or_404(booking_id)
 
     if request.user != booking.user and request.user != booking.turf.owner:
         messages.error(request, "You are not authorized to view this receipt.")
         return redirect(request.user.get_dashboard_url())
 
+    # WeasyPrint (Pango/Cairo bindings) and qrcode (Pillow) are only needed
+    # here, so they are imported on the first receipt rather than at worker boot.
+    try:
+        from weasyprint import HTML
+    except OSError:
+        # WeasyPrint is installed but its system libraries are not
+        return HttpResponse("PDF receipts are not available right now.", status=503)
+    import qrcode
+
     # --- QR Code Generation (no change here) ---
     qr_data = (
         f"Booking ID: {booking.id}\n"
@@ -238,10 +303,11 @@ def booking_receipt_pdf_view(request, booking_id):
     qr_image_base64 = base64.b64encode(buffer.getvalue()).decode()
 
     # --- ✅ NEW: Image to Base64 Conversion ---
+    # Embed the small receipt rendition rather than the original upload when it exists.
     turf_image_base64 = None
     if booking.turf.main_image:
         try:
-            with booking.turf.main_image.open('rb') as image_file:
+            with booking.turf.main_image.storage.open(rendition_name_for(booking.turf.main_image, 'receipt'), 'rb') as image_file:
                 turf_image_base64 = base64.b64encode(image_file.read()).decode()
         except FileNotFoundError:
             # Handle case where image file is missing
@@ -274,6 +340,24 @@ def turf_search_view(request):
             Q(district__icontains=query)
         )
 
+    # Availability: only turfs with a free slot on the chosen day and time window
+    today = timezone.localdate()
+    try:
+        free_on = date.fromisoformat(request.GET.get('free_on', ''))
+    except ValueError:
+        free_on = None
+    if free_on is not None and not today <= free_on <= last_bookable_day(today):
+        free_on = None
+    free_from = search.parse_time(request.GET.get('free_from')) or time(0)
+    free_until = search.parse_time(request.GET.get('free_until'))
+    if free_on is not None:
+        turfs = with_free_slot(turfs, free_on, free_from, free_until)
+
+    amenities = list(Amenity.objects.exclude(bit=None).order_by('name'))
+    filters = search.parse_filters(request.GET, amenities)
+    facets = search.facet_counts(turfs, filters, amenities)
+    turfs = search.apply_filters(turfs, filters)
+
     if sort_by == 'price_asc':
         turfs = turfs.order_by('price_per_hour')
     elif sort_by == 'price_desc':
@@ -281,15 +365,48 @@ def turf_search_view(request):
     elif sort_by == 'rating':
         turfs = turfs.order_by('-rating')
 
+    turfs = list(turfs)
+    next_slots = next_available(turfs)
+    for turf in turfs:
+        turf.next_available = next_slots[turf.id]
+    if sort_by == 'available':
+        far_future = timezone.now() + timedelta(days=365)
+        turfs.sort(key=lambda turf: turf.next_available or far_future)
+
+    favorite_ids = set(request.user.favorites.values_list('id', flat=True)) if request.user.is_authenticated else set()
+
     context = {
         'turfs': turfs,
         'query': query or "",
         'sort_by': sort_by or "",
+        'filters': filters,
+        'facets': facets,
+        'favorite_ids': favorite_ids,
+        'free_on': free_on,
+        'free_from': free_from if free_on else None,
+        'free_until': free_until if free_on else None,
+        'today': today,
+        'max_date': last_bookable_day(today),
     }
     return render(request, 'turfs/turf_search.html', context)
 
+
+@login_required
+def turf_autocomplete_view(request):
+    """JSON suggestions for the search box: matching turfs, cities and districts, most popular first."""
+    try:
+        limit = min(int(request.GET.get('limit', autocomplete.MAX_SUGGESTIONS)), autocomplete.MAX_SUGGESTIONS)
+    except ValueError:
+        limit = autocomplete.MAX_SUGGESTIONS
+    results = [
+        {'label': suggestion.label, 'kind': suggestion.kind, 'url': suggestion.url}
+        for suggestion in autocomplete.suggest(request.GET.get('q', ''), limit)
+    ]
+    return JsonResponse({'results': results})
+
 @login_required
 @turf_owner_required 
+@use_replica
 def all_bookings(request):
     """
     Displays a filterable and sortable list of all bookings 
@@ -302,16 +419,24 @@ def all_bookings(request):
     status_filter = request.GET.get('status', '')
     sort_order = request.GET.get('sort', 'desc')
 
+    archived = ArchivedBooking.objects.filter(turf__owner=request.user).select_related('user', 'turf')
+
     # Apply status filter if a valid status is provided
     if status_filter in ['pending', 'confirmed', 'completed', 'cancelled']:
         bookings = bookings.filter(status=status_filter)
+        archived = archived.filter(status=status_filter)
 
     # Apply sorting
     if sort_order == 'asc':
         bookings = bookings.order_by('start_time')
+        archived = archived.order_by('start_time')
     else:
         # Default to descending order (newest first)
         bookings = bookings.order_by('-start_time')
+        archived = archived.order_by('-start_time')
+
+    # Old finished bookings live in the archive table; show them in the same list.
+    bookings = booking_history(bookings, archived, descending=sort_order != 'asc')
 
     context = {
         'bookings': bookings,
@@ -319,3 +444,88 @@ def all_bookings(request):
     return render(request, 'turfs/all_bookings.html', context)
 
 
+@login_required
+@turf_owner_required
+def owner_timeline_view(request):
+    """
+    All of the owner's turfs on one timeline (turfs as rows) for a day or a
+    week, with confirm/reject buttons that work without reloading the page.
+    """
+    zoom = request.GET.get('zoom', 'day')
+    if zoom not in timeline.ZOOMS:
+        zoom = 'day'
+    try:
+        day = date.fromisoformat(request.GET.get('date', ''))
+    except ValueError:
+        day = timezone.localdate()
+
+    turfs = list(Turf.objects.filter(owner=request.user).order_by('name'))
+    start, end = timeline.window(turfs, day, zoom)
+    # Every booking in the window, across all turfs, in one range query.
+    bookings = (
+        Booking.objects.filter(turf__owner=request.user, start_time__lt=end, end_time__gt=start)
+        .exclude(status='cancelled')
+        .select_related('user')
+    )
+
+    step = timedelta(days=timeline.ZOOMS[zoom]['days'])
+    context = {
+        'rows': timeline.build_rows(turfs, bookings, start, end),
+        'ticks': timeline.ticks(start, end, zoom),
+        'zoom': zoom,
+        'day': day,
+        'window_start': start,
+        'window_end': end - timedelta(seconds=1),
+        'previous_day': day - step,
+        'next_day': day + step,
+        'today': timezone.localdate(),
+    }
+    return render(request, 'turfs/timeline.html', context)
+
+
+@csrf_exempt
+@require_POST
+def payment_webhook_view(request):
+    """
+    Receives payment events from the gateway. Only verifies, records and
+    applies the event; notifications are sent after the response.
+    """
+    if not payments.verify_signature(request.body, request.headers.get(payments.SIGNATURE_HEADER)):
+        return HttpResponseForbidden("Invalid signature")
+    try:
+        event = payments.parse_event(request.body)
+    except payments.InvalidEvent as exc:
+        return HttpResponseBadRequest(str(exc))
+    return JsonResponse({'status': payments.handle_event(event)})
+
+
+def change_feed_view(request):
+    """
+    Booking and turf change events after a cursor, for downstream systems.
+
+    `?after=<event id>&limit=<n>[&entity=booking|turf]`; pass the returned
+    `next` as `after` to continue. Open to staff, or to a client sending
+    `Authorization: Bearer <CHANGE_FEED_TOKEN>`.
+    """
+    if not (request.user.is_authenticated and request.user.is_staff) \
+            and not events.valid_token(request.headers.get('Authorization')):
+        return JsonResponse({'error': "Not authorized."}, status=403)
+    try:
+        after = max(int(request.GET.get('after', 0)), 0)
+        limit = min(max(int(request.GET.get('limit', events.DEFAULT_PAGE_SIZE)), 1), events.MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': "after and limit must be integers."}, status=400)
+    entity = request.GET.get('entity')
+    if entity and entity not in dict(ChangeEvent.ENTITY_CHOICES):
+        return JsonResponse({'error': f"Unknown entity: {entity}"}, status=400)
+
+    page, has_more = events.read_feed(after, limit, entity)
+    return JsonResponse({
+        'events': [
+            {'id': event.id, 'kind': event.kind, 'entity': event.entity, 'entity_id': event.entity_id,
+             'data': event.data, 'created_at': event.created_at}
+            for event in page
+        ],
+        'next': page[-1].id if page else after,
+        'has_more': has_more,
+    })
@@ -1,7 +1,7 @@
 # Users/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin # Renamed to avoid confusion
-from .models import User # Import your custom User model
+from .models import User, Notification # Import your custom User model
 
 @admin.register(User)
 class CustomUserAdmin(BaseUserAdmin): # Use BaseUserAdmin here
@@ -26,4 +26,10 @@ class CustomUserAdmin(BaseUserAdmin): # Use BaseUserAdmin here
     search_fields = ('username', 'email', 'business_name')
 
     # Optional: If you want to filter users by user_type in the admin list
-    list_filter = ('user_type', 'is_staff', 'is_superuser', 'is_active')
\ No newline at end of file
+    list_filter = ('user_type', 'is_staff', 'is_superuser', 'is_active')
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'message', 'is_read', 'created_at')
+    list_filter = ('kind', 'is_read')
+    search_fields = ('user__username', 'message')
@@ -0,0 +1,32 @@
+# Users/checks.py
+
+"""
+Deployment checks for the cached auth state in Users.user_state.
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_user_state_cache(app_configs, **kwargs):
+    """
+    Snapshot revocation (deactivation, password changes) is signalled through
+    the default cache, so a per-process cache only reaches the worker that
+    made the change. Reported by `manage.py check --deploy`.
+    """
+    if 'Users.middleware.CachedAuthenticationMiddleware' not in settings.MIDDLEWARE:
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        "CachedAuthenticationMiddleware is used with a per-process default cache.",
+        hint="Set REDIS_URL (or point CACHES['default'] at another shared backend) so that "
+             "deactivating a user or changing a password takes effect in every worker process.",
+        id='Users.W001',
+    )]
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Users.notifications import prune_notifications
+
+
+class Command(BaseCommand):
+    help = "Deletes old notifications: read ones after a short retention, unread ones after a longer one."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--read-days', type=int, default=settings.NOTIFICATION_RETENTION_READ_DAYS)
+        parser.add_argument('--unread-days', type=int, default=settings.NOTIFICATION_RETENTION_UNREAD_DAYS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        removed = prune_notifications(options['read_days'], options['unread_days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} notification(s)."))
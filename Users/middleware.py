@@ -1,27 +1,71 @@
 # Users/middleware.py
 
-from django.contrib.auth import logout
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.contrib.auth import get_user, logout
+from django.contrib.auth.middleware import AuthenticationMiddleware
 from django.shortcuts import redirect
 from django.contrib import messages
 
+from .user_state import SnapshotUser, load_snapshot
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Drop-in replacement for Django's AuthenticationMiddleware.
+
+    `request.user` is served from the session's cached user snapshot (see
+    Users.user_state), so checks like `is_authenticated`, `is_active` or
+    `is_turf_owner` do not hit the database. The full `User` row is only
+    loaded when a view or template actually needs it.
+    """
+    def process_request(self, request):
+        super().process_request(request)
+        snapshot, user = load_snapshot(request)
+        if user is not None and snapshot is None:
+            # The session was invalidated while refreshing the snapshot.
+            request.user = user
+        elif snapshot is not None:
+            request.user = SnapshotUser(lambda: user or get_user(request), snapshot)
+
+
 class CheckUserActiveMiddleware:
+    """
+    Logs out users whose account has been deactivated.
+
+    Works in both sync and async chains, so async views (the live slot
+    stream) stay on the event loop under ASGI. `request.user` was already
+    resolved by CachedAuthenticationMiddleware, so checking it does no I/O;
+    only the rare logout goes through a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # This code runs on every request
-        
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         # Check if the user is authenticated and if their account is now inactive
-        if request.user.is_authenticated and not request.user.is_active:
-            # Log the user out
-            logout(request)
-            
-            # Add a message for the user
-            messages.warning(request, "Your account has been deactivated. Please contact support.")
-            
-            # Redirect to the login page
-            return redirect('users:login') # Or your landing page
+        if self.is_deactivated(request):
+            return self.log_out(request)
 
         # If the user is active or not logged in, continue as normal
         response = self.get_response(request)
         return response
+
+    async def __acall__(self, request):
+        if self.is_deactivated(request):
+            return await sync_to_async(self.log_out)(request)
+        return await self.get_response(request)
+
+    def is_deactivated(self, request):
+        return request.user.is_authenticated and not request.user.is_active
+
+    def log_out(self, request):
+        logout(request)
+        messages.warning(request, "Your account has been deactivated. Please contact support.")
+        # Redirect to the login page
+        return redirect('users:login')
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Users', '0007_user_profile_picture_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('booking_confirmed', 'Booking Confirmed'), ('booking_rejected', 'Booking Rejected'), ('booking_cancelled', 'Booking Cancelled'), ('turf_approved', 'Turf Approved'), ('turf_rejected', 'Turf Rejected')], max_length=30)),
+                ('message', models.CharField(max_length=255)),
+                ('link', models.CharField(blank=True, max_length=200)),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'is_read'], name='Users_notif_user_id_17dedb_idx'), models.Index(fields=['user', '-created_at'], name='Users_notif_user_id_43183f_idx'), models.Index(fields=['created_at'], name='Users_notif_created_7ba076_idx')],
+            },
+        ),
+    ]
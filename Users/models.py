@@ -1,14 +1,10 @@
 # users/models.py
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.urls import reverse
 from Turfs.models import Turf
 
-# A helper function to define the upload path for profile pictures
-def user_profile_picture_path(instance, filename):
-    # file will be uploaded to MEDIA_ROOT/profile_pics/user_<id>/<filename>
-    return f'profile_pics/user_{instance.id}/{filename}'
-
 class User(AbstractUser):
     USER_TYPE_CHOICES = (
         ('player', 'Player'),
@@ -16,10 +12,20 @@ class User(AbstractUser):
     )
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES, default='player')
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    profile_picture_renditions = models.JSONField(default=dict, blank=True, editable=False)
     business_name = models.CharField(max_length=100, blank=True, null=True)
     phone = models.CharField(max_length=15, blank=True, null=True)
     favorites = models.ManyToManyField(Turf, related_name='favorited_by', blank=True)
     bio = models.TextField(max_length=500, blank=True) # New bio field
+    # Set when the user deletes their account; the rows are purged in the background
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Exact, case-insensitive lookups from the admin search (management/search.py)
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+        ]
     
     def __str__(self):
         return self.username
@@ -38,4 +44,34 @@ class User(AbstractUser):
         elif self.is_turf_owner:
             return reverse('users:dashboard_turf_owner')
         else:
-            return reverse('users:dashboard_player')
\ No newline at end of file
+            return reverse('users:dashboard_player')
+
+class Notification(models.Model):
+    """A short message shown to a user about something that happened to their bookings or turfs."""
+    KIND_CHOICES = (
+        ('booking_confirmed', 'Booking Confirmed'),
+        ('booking_rejected', 'Booking Rejected'),
+        ('booking_cancelled', 'Booking Cancelled'),
+        ('turf_approved', 'Turf Approved'),
+        ('turf_rejected', 'Turf Rejected'),
+        ('payment_received', 'Payment Received'),
+        ('payment_failed', 'Payment Failed'),
+        ('payment_refunded', 'Payment Refunded'),
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    message = models.CharField(max_length=255)
+    link = models.CharField(max_length=200, blank=True)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read']),
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.user_id}"
@@ -0,0 +1,102 @@
+# Users/notifications.py
+
+"""
+Writing and counting user notifications.
+
+Unread counts are kept in the cache and adjusted incrementally as
+notifications are created or read, so pages showing the badge never run
+`COUNT(*)`. A missing counter is recomputed once from the database. The
+cache is only touched after the surrounding transaction commits, so a
+rolled-back action never inflates a counter.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from .models import Notification
+
+
+def _counter_key(user_id):
+    return f'notifications:{user_id}:unread'
+
+
+def notify(*notifications):
+    """
+    Creates notifications in a single INSERT.
+
+    Each argument is a `(user_id, kind, message, link)` tuple.
+    """
+    objs = Notification.objects.bulk_create([
+        Notification(user_id=user_id, kind=kind, message=message, link=link)
+        for user_id, kind, message, link in notifications
+    ])
+
+    def bump_counters():
+        for obj in objs:
+            try:
+                cache.incr(_counter_key(obj.user_id))
+            except ValueError:
+                # No cached counter yet; the next read counts from the database.
+                pass
+
+    transaction.on_commit(bump_counters)
+    return objs
+
+
+def unread_count(user_id):
+    """Number of unread notifications, served from the cache whenever possible."""
+    key = _counter_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        # Counted on the primary even under `use_replica`: the counter is cached
+        # for a day, so a lagging replica must never seed it.
+        count = Notification.objects.using(DEFAULT_DB_ALIAS).filter(user_id=user_id, is_read=False).count()
+        cache.add(key, count, settings.NOTIFICATION_COUNT_TIMEOUT)
+    return count
+
+
+def mark_all_read(user_id):
+    """Marks every unread notification of the user as read with one UPDATE."""
+    updated = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+    transaction.on_commit(lambda: cache.set(_counter_key(user_id), 0, settings.NOTIFICATION_COUNT_TIMEOUT))
+    return updated
+
+
+def _delete_in_batches(queryset, batch_size, after_delete=None):
+    removed = 0
+    while True:
+        rows = list(queryset.values_list('id', 'user_id')[:batch_size])
+        if not rows:
+            return removed
+        removed += Notification.objects.filter(id__in=[row[0] for row in rows]).delete()[0]
+        if after_delete is not None:
+            after_delete(rows)
+
+
+def prune_notifications(read_days, unread_days, batch_size=1000):
+    """
+    Deletes read notifications older than `read_days` and any older than `unread_days`.
+
+    Works in batches so no single DELETE holds the write lock for long.
+    Returns the number of rows removed.
+    """
+    now = timezone.now()
+    removed = _delete_in_batches(
+        Notification.objects.filter(is_read=True, created_at__lt=now - timedelta(days=read_days)),
+        batch_size,
+    )
+
+    def forget_counters(rows):
+        # Unread rows are going away, so those users' counters must be recomputed.
+        cache.delete_many({_counter_key(user_id) for _, user_id in rows})
+
+    removed += _delete_in_batches(
+        Notification.objects.filter(created_at__lt=now - timedelta(days=unread_days)),
+        batch_size,
+        after_delete=forget_counters,
+    )
+    return removed
@@ -0,0 +1,40 @@
+# Users/signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from Turfs import media
+
+from .models import User
+from .user_state import bump_user_version
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_state_on_save(sender, instance, update_fields=None, **kwargs):
+    """Any change to the user row (status, type, password) invalidates cached snapshots."""
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        # Logging in touches last_login only; nothing in the snapshot changed.
+        return
+    bump_user_version(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_state_on_delete(sender, instance, **kwargs):
+    bump_user_version(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def remember_replaced_profile_picture(sender, instance, update_fields=None, **kwargs):
+    media.remember_replaced(instance, 'profile_picture', update_fields)
+
+
+@receiver(pre_delete, sender=User)
+def remember_deleted_profile_picture(sender, instance, **kwargs):
+    media.remember_deleted(instance, 'profile_picture')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def release_profile_picture(sender, instance, **kwargs):
+    """A replaced or deleted profile picture and its renditions lose a reference in the media storage (Turfs.media)."""
+    media.release_remembered(instance)
@@ -1,3 +1,80 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from Turfie.replicas import reading_from_replica
+from Turfs.recommendations import recommended_turfs_for
+from .models import User
+from .notifications import notify, unread_count
+from .user_state import SNAPSHOT_SESSION_KEY, SnapshotUser
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379'}}
+
+
+class SnapshotUserTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+
+    def snapshot_user(self):
+        def load():
+            raise AssertionError("the User row was loaded")
+        return SnapshotUser(load, {
+            'id': self.player.pk, 'user_type': 'player', 'is_staff': False,
+            'is_superuser': False, 'is_active': True,
+        })
+
+    def test_recommendations_do_not_load_the_user(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(recommended_turfs_for(self.snapshot_user()), [])
+
+    def test_deactivation_takes_effect_on_the_next_request(self):
+        self.client.force_login(self.player)
+        self.assertEqual(self.client.get(reverse('users:dashboard_player')).status_code, 200)
+        self.assertTrue(self.client.session[SNAPSHOT_SESSION_KEY]['is_active'])
+
+        self.player.is_active = False
+        self.player.save()
+        response = self.client.get(reverse('users:dashboard_player'))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+
+class UserStateCacheCheckTests(TestCase):
+
+    def deploy_warnings(self):
+        return [message.id for message in run_checks(include_deployment_checks=True) if message.id.startswith('Users.')]
+
+    @override_settings(CACHES=LOCMEM)
+    def test_per_process_cache_is_reported(self):
+        self.assertEqual(self.deploy_warnings(), ['Users.W001'])
+
+    @override_settings(CACHES=REDIS)
+    def test_shared_cache_passes(self):
+        self.assertEqual(self.deploy_warnings(), [])
+
+
+class UnreadCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_counter_is_seeded_from_the_primary(self):
+        notify((self.owner.pk, 'booking_cancelled', "A booking was cancelled.", '/'))
+        # The replica alias is not configured here, so any read routed to it fails.
+        with mock.patch('Turfie.replicas.replica_alias', return_value='replica'), reading_from_replica():
+            self.assertEqual(unread_count(self.owner.pk), 1)
@@ -22,6 +22,10 @@ urlpatterns = [
     path('favorites/', views.favorites_view, name='favorites'),
     path('toggle-favorite/<int:turf_id>/', views.toggle_favorite_view, name='toggle_favorite'),
 
+    # Notifications
+    path('notifications/', views.notifications_view, name='notifications'),
+    path('notifications/mark-read/', views.mark_notifications_read_view, name='mark_notifications_read'),
+
     # Profile Management
     path('profile/edit/', views.edit_profile_view, name='edit_profile'),
     path('password-change/', views.UserPasswordChangeView.as_view(), name='password_change'),
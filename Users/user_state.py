@@ -0,0 +1,138 @@
+# Users/user_state.py
+
+"""
+Cached per-user auth state.
+
+A logged-in session carries a small snapshot of the user (id, type, staff and
+active flags) so middleware, decorators and `login_required` can answer
+"who is this and what may they do" without loading the `User` row. Each
+snapshot records the user's version stamp, which lives in the shared cache
+and is bumped whenever the user row changes (see `Users.signals`). A stale
+stamp forces a reload from the database, so deactivation, deletion and
+password changes take effect on the user's very next request.
+
+Revocation is only instant across worker processes when CACHES points at a
+shared backend (Redis, Memcached, ...), not the per-process default.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY, get_user
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+
+SNAPSHOT_SESSION_KEY = '_user_snapshot'
+
+
+def _version_key(user_id):
+    return f'user_state:{user_id}:version'
+
+
+def get_user_version(user_id):
+    """Returns the user's current version stamp, creating one if the cache has none."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, settings.USER_STATE_CACHE_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(*user_ids):
+    """Invalidates every cached snapshot of the given users."""
+    cache.delete_many([_version_key(user_id) for user_id in user_ids])
+
+
+def load_snapshot(request):
+    """
+    Returns `(snapshot, user)` for the request's session.
+
+    `snapshot` is a dict, or None for anonymous sessions. `user` is the full
+    `User` when it had to be loaded to refresh the snapshot, otherwise None.
+    """
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is None:
+        return None, None
+
+    snapshot = request.session.get(SNAPSHOT_SESSION_KEY)
+    version = get_user_version(user_id)
+    if (
+        snapshot
+        and snapshot['version'] == version
+        and snapshot['session_hash'] == request.session.get(HASH_SESSION_KEY)
+    ):
+        return snapshot, None
+
+    # Stale or missing: let Django load and verify the user (this also flushes
+    # the session if the password changed) and record a fresh snapshot.
+    user = get_user(request)
+    if not user.is_authenticated:
+        return None, user
+    snapshot = {
+        'id': user.pk,
+        'user_type': user.user_type,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'is_active': user.is_active,
+        'session_hash': request.session.get(HASH_SESSION_KEY),
+        'version': version,
+    }
+    request.session[SNAPSHOT_SESSION_KEY] = snapshot
+    return snapshot, user
+
+
+class SnapshotUser(SimpleLazyObject):
+    """
+    `request.user` that answers the cheap questions from the session snapshot.
+
+    Anything not covered here (username, profile fields, comparisons, use in
+    queries) loads the real `User` on first access, exactly like Django's own
+    lazy `request.user`.
+    """
+
+    def __init__(self, func, snapshot):
+        super().__init__(func)
+        self.__dict__['_snapshot'] = snapshot
+
+    @property
+    def pk(self):
+        return self._snapshot['id']
+
+    id = pk
+
+    @property
+    def user_type(self):
+        return self._snapshot['user_type']
+
+    @property
+    def is_staff(self):
+        return self._snapshot['is_staff']
+
+    @property
+    def is_superuser(self):
+        return self._snapshot['is_superuser']
+
+    @property
+    def is_active(self):
+        return self._snapshot['is_active']
+
+    is_authenticated = True
+    is_anonymous = False
+
+    @property
+    def is_player(self):
+        return self.user_type == 'player'
+
+    @property
+    def is_turf_owner(self):
+        return self.user_type == 'turf_owner'
+
+    def get_dashboard_url(self):
+        if self.is_staff:
+            return reverse('management:admin_dashboard')
+        elif self.is_turf_owner:
+            return reverse('users:dashboard_turf_owner')
+        else:
+            return reverse('users:dashboard_player')
@@ -5,16 +5,23 @@ from django.contrib.auth import login as auth_login, authenticate, logout, updat
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm
 from django.contrib.auth.views import PasswordChangeView
+from django.db import transaction
 from django.db.models import Sum, Count, Avg
 from django.http import JsonResponse
 from django.utils import timezone
 from django.views import View
 from django.views.decorators.http import require_POST
 
-from Turfs.models import Turf, Booking
-from .models import User
+from Turfs.models import Turf, Booking, ArchivedBooking
+from Turfs.archive import booking_history
+from Turfs.recommendations import recommended_turfs_for
+from Turfs.purge import delete_account
+from Turfs.images import schedule_renditions, PROFILE_PICTURE_RENDITIONS
+from .models import User, Notification
+from .notifications import unread_count, mark_all_read
 from .forms import UserProfileForm
 from .decorators import player_required, turf_owner_required
+from Turfie.replicas import use_replica
 from datetime import date
 
 # =============================================================================
@@ -55,6 +62,7 @@ class register(View):
                 user.business_name = request.POST.get('business-name')
                 user.phone = request.POST.get('phone') 
             user.save()
+            schedule_renditions(user, 'profile_picture', PROFILE_PICTURE_RENDITIONS)
 
             auth_login(request, user)
             messages.success(request, 'Account created successfully! Welcome to Turfie.')
@@ -99,6 +107,7 @@ def logout_view(request):
 
 @login_required
 @turf_owner_required 
+@use_replica
 def dashboard_turf_owner(request):
     """Displays the dashboard for turf owners with key statistics."""
     owner_turfs = Turf.objects.filter(owner=request.user)
@@ -106,6 +115,13 @@ def dashboard_turf_owner(request):
         total_bookings=Count('id'),
         total_revenue=Sum('amount', default=0),
     )
+    # Include bookings that have been moved to the archive table
+    archived_stats = ArchivedBooking.objects.filter(turf__in=owner_turfs).aggregate(
+        total_bookings=Count('id'),
+        total_revenue=Sum('amount', default=0),
+    )
+    stats['total_bookings'] += archived_stats['total_bookings']
+    stats['total_revenue'] += archived_stats['total_revenue']
     avg_rating = owner_turfs.aggregate(rating=Avg('rating', default=0))
     stats['avg_rating'] = avg_rating['rating'] if avg_rating['rating'] else 0
     recent_bookings = Booking.objects.filter(turf__in=owner_turfs).order_by('-start_time')[:5]
@@ -115,6 +131,7 @@ def dashboard_turf_owner(request):
         'stats': stats,
         'recent_bookings': recent_bookings,
         'todays_bookings': todays_bookings,
+        'notification_count': unread_count(request.user.pk),
     }
     return render(request, 'users/dashboard_turf_owner.html', context)
 
@@ -129,15 +146,12 @@ def dashboard_player(request):
         start_time__gte=now
     ).select_related('turf').order_by('start_time')[:10]
     
-    recommended_turfs = Turf.objects.filter(
-        approval_status='approved', 
-        owner__is_active=True
-    ).order_by('-rating')[:10]
+    recommended_turfs = recommended_turfs_for(request.user)
     
     context = {
         'upcoming_bookings': upcoming_bookings,
         'recommended_turfs': recommended_turfs,
-        'notification_count': 3  # Placeholder
+        'notification_count': unread_count(request.user.pk),
     }
     return render(request, 'users/dashboard_player.html', context)
 
@@ -151,9 +165,10 @@ def my_bookings_view(request):
     """Displays a list of the user's past and upcoming bookings."""
     now = timezone.now()
     all_bookings = Booking.objects.filter(user=request.user).select_related('turf').order_by('-start_time')
+    archived_bookings = ArchivedBooking.objects.filter(user=request.user).select_related('turf').order_by('-start_time')
     context = {
         'upcoming_bookings': all_bookings.filter(start_time__gte=now),
-        'past_bookings': all_bookings.filter(start_time__lt=now),
+        'past_bookings': booking_history(all_bookings.filter(start_time__lt=now), archived_bookings),
     }
     return render(request, 'users/my_bookings.html', context)
 
@@ -165,6 +180,23 @@ def favorites_view(request):
     context = {'favorite_turfs': favorite_turfs}
     return render(request, 'users/favorites.html', context)
 
+@login_required
+def notifications_view(request):
+    """Lists the user's most recent notifications."""
+    notifications = Notification.objects.filter(user_id=request.user.pk)[:50]
+    context = {
+        'notifications': notifications,
+        'notification_count': unread_count(request.user.pk),
+    }
+    return render(request, 'users/notifications.html', context)
+
+@login_required
+@require_POST
+def mark_notifications_read_view(request):
+    """Marks all of the user's notifications as read."""
+    mark_all_read(request.user.pk)
+    return redirect('users:notifications')
+
 # =============================================================================
 # PROFILE MANAGEMENT
 # =============================================================================
@@ -184,7 +216,9 @@ def edit_profile_view(request):
         if 'update_profile' in request.POST:
             active_tab = 'profile'
             if profile_form.is_valid():
-                profile_form.save()
+                user = profile_form.save()
+                if 'profile_picture' in profile_form.changed_data:
+                    schedule_renditions(user, 'profile_picture', PROFILE_PICTURE_RENDITIONS)
                 messages.success(request, 'Your profile has been updated successfully.')
                 return redirect('users:edit_profile')
         
@@ -224,10 +258,14 @@ class UserPasswordChangeView(PasswordChangeView):
 @login_required
 @require_POST
 def delete_account_view(request):
-    """Deletes the user's account permanently."""
+    """
+    Deletes the user's account permanently. The account is deactivated at
+    once and its data removed in the background.
+    """
     user = request.user
     logout(request)
-    user.delete()
+    with transaction.atomic():
+        delete_account(user)
     messages.success(request, 'Your account has been successfully deleted.')
     return redirect('users:landing')
 
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'management'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from .search import install_search_index
+        # Once per migrate, after every app's migrations have run.
+        post_migrate.connect(install_search_index, sender=self)
@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the primary SQLite database into the replica file configured by "
+        "DJANGO_REPLICA_DB, standing in for real replication in local setups."
+    )
+
+    def handle(self, *args, **options):
+        alias = settings.REPLICA_DATABASE_ALIAS
+        if alias not in settings.DATABASES:
+            raise CommandError("No replica configured. Set DJANGO_REPLICA_DB to a SQLite file path.")
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        replica = settings.DATABASES[alias]
+        for config in (primary, replica):
+            if config['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError("sync_replica only supports SQLite; use your database's native replication.")
+
+        # The online backup API gives a consistent copy even while the primary is being written to.
+        source = sqlite3.connect(str(primary['NAME']))
+        target = sqlite3.connect(str(replica['NAME']))
+        try:
+            with target:
+                source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary['NAME']} to {replica['NAME']}."))
@@ -0,0 +1,95 @@
+# management/moderation.py
+
+"""
+Approving and rejecting turfs, and blocking and unblocking users, in bulk.
+
+Each action is one SELECT of the rows it will change and one set-based
+UPDATE, in one transaction. Rows already in the target state are left
+alone and counted as unchanged. `update()` skips `save()` and its
+signals, so the follow-up work is done here, batched:
+
+* one INSERT for all owner notifications (`notify`)
+* one INSERT for all change-feed events (`events.record`)
+* one refresh of the search-box index for all touched turfs
+* one `delete_many` of the cached auth snapshots of changed users
+
+The single-object views go through the same functions.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from Turfs import events
+from Turfs.autocomplete import schedule_refresh
+from Turfs.models import Turf
+from Users.models import User
+from Users.notifications import notify
+from Users.user_state import bump_user_version
+
+Summary = namedtuple('Summary', 'action requested updated unchanged missing')
+
+TURF_ACTIONS = {'approve': 'approved', 'reject': 'rejected'}
+USER_ACTIONS = {'block': False, 'unblock': True}
+
+
+def _notification(turf, status):
+    if status == 'approved':
+        return (turf.owner_id, 'turf_approved', f"'{turf.name}' has been approved and is now live.",
+                reverse('turfs:turf_detail', args=[turf.id]))
+    return (turf.owner_id, 'turf_rejected', f"'{turf.name}' was not approved.", reverse('turfs:turf_list'))
+
+
+def set_turf_approval(turf_ids, action):
+    """Approves or rejects the given turfs ('approve' / 'reject'). Returns a `Summary`."""
+    status = TURF_ACTIONS[action]
+    turf_ids = set(turf_ids)
+    with transaction.atomic():
+        turfs = list(Turf.objects.filter(id__in=turf_ids).only('id', 'name', 'owner_id', 'approval_status'))
+        changing = [turf for turf in turfs if turf.approval_status != status]
+        if changing:
+            Turf.objects.filter(id__in=[turf.id for turf in changing]).update(
+                approval_status=status, updated_at=timezone.now(),
+            )
+            notify(*[_notification(turf, status) for turf in changing])
+            events.record(*[
+                events.turf_event(turf, 'turf.approval_changed', **{'from': turf.approval_status, 'to': status})
+                for turf in changing
+            ])
+            schedule_refresh(*[turf.id for turf in changing])
+    return Summary(action, len(turf_ids), len(changing), len(turfs) - len(changing), len(turf_ids) - len(turfs))
+
+
+def set_users_active(user_ids, action):
+    """
+    Blocks or unblocks the given users ('block' / 'unblock'). Staff and
+    deleted accounts are never touched and count as missing.
+    """
+    active = USER_ACTIONS[action]
+    user_ids = set(user_ids)
+    with transaction.atomic():
+        users = User.objects.filter(id__in=user_ids, is_staff=False, deleted_at__isnull=True)
+        rows = dict(users.values_list('id', 'is_active'))
+        changing = [user_id for user_id, is_active in rows.items() if is_active != active]
+        if changing:
+            User.objects.filter(id__in=changing).update(is_active=active)
+            transaction.on_commit(lambda: bump_user_version(*changing))
+            # A blocked owner's turfs drop out of search suggestions.
+            owned = list(Turf.objects.filter(owner_id__in=changing).values_list('id', flat=True))
+            if owned:
+                schedule_refresh(*owned)
+    return Summary(action, len(user_ids), len(changing), len(rows) - len(changing), len(user_ids) - len(rows))
+
+
+def describe(summary, noun):
+    """'Approved 12 turfs (3 already were, 1 not found).'"""
+    verb = {'approve': 'Approved', 'reject': 'Rejected', 'block': 'Blocked', 'unblock': 'Unblocked'}[summary.action]
+    text = f"{verb} {summary.updated} {noun}{'' if summary.updated == 1 else 's'}"
+    notes = []
+    if summary.unchanged:
+        notes.append(f"{summary.unchanged} already were")
+    if summary.missing:
+        notes.append(f"{summary.missing} not found")
+    return text + (f" ({', '.join(notes)})." if notes else ".")
@@ -0,0 +1,180 @@
+# management/search.py
+
+"""
+The admin search box on the bookings monitor.
+
+A query is resolved by the cheapest lookup that can answer it, in order:
+
+1. A booking reference (`#BK-123`, `BK123`, `123`): a primary-key lookup.
+2. An email: an exact match on the `lower(email)` index.
+3. A username: an exact match on the unique index, then on `lower(username)`.
+4. Anything else: a substring search over turf names, usernames and
+   business names, which returns the bookings of the matching turfs and
+   users.
+
+Steps 1-3 never scan a table. Step 4 uses SQLite FTS5 tables with the
+trigram tokenizer, so a substring match is an index lookup rather than a
+LIKE over every row. Queries shorter than a trigram, and databases without
+the tables, fall back to `icontains`.
+
+The FTS5 tables index `Turfs_turf` and `Users_user` without copying them
+(external content). Triggers keep them in step, so bulk `update()`s are
+covered too. SQLite drops a table's triggers when a migration rebuilds
+that table, so `install_search_index` recreates them and rebuilds the
+index after every `migrate`.
+"""
+
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+
+from Turfs.models import ArchivedBooking, Booking, Turf
+from Users.models import User
+
+BOOKING_REFERENCE_RE = re.compile(r'^#?\s*(?:BK-?\s*)?(\d{1,18})$', re.I)
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+$')
+USERNAME_RE = re.compile(r'^[\w.@+-]+$')
+TRIGRAM = 3
+
+# (FTS table, source table, indexed columns)
+FTS_INDEXES = [
+    ('turf_search', Turf._meta.db_table, ('name',)),
+    ('user_search', User._meta.db_table, ('username', 'business_name')),
+]
+
+SearchResult = namedtuple('SearchResult', 'kind booking_id users turfs')
+
+_fts_tables = {}
+
+
+def _fts_sql(fts_table, source_table, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    delete = f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{cols}, content='{source_table}', content_rowid='id', tokenize='trigram')",
+        f"DROP TRIGGER IF EXISTS {fts_table}_ai",
+        f"DROP TRIGGER IF EXISTS {fts_table}_ad",
+        f"DROP TRIGGER IF EXISTS {fts_table}_au",
+        f'CREATE TRIGGER {fts_table}_ai AFTER INSERT ON "{source_table}" BEGIN {insert} END',
+        f'CREATE TRIGGER {fts_table}_ad AFTER DELETE ON "{source_table}" BEGIN {delete} END',
+        f'CREATE TRIGGER {fts_table}_au AFTER UPDATE OF {cols} ON "{source_table}" BEGIN {delete} {insert} END',
+        f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+    ]
+
+
+def install_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Creates or repairs the FTS5 tables and their triggers, and rebuilds them. Runs after `migrate`."""
+    connection = connections[using]
+    _fts_tables.pop(using, None)
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        with connection.cursor() as cursor:
+            for fts_table, source_table, columns in FTS_INDEXES:
+                for statement in _fts_sql(fts_table, source_table, columns):
+                    cursor.execute(statement)
+    except OperationalError:
+        # SQLite older than 3.34 has no trigram tokenizer; search falls back to icontains.
+        pass
+
+
+def _has_fts(using):
+    if using not in _fts_tables:
+        connection = connections[using]
+        _fts_tables[using] = connection.vendor == 'sqlite' and all(
+            fts_table in connection.introspection.table_names() for fts_table, _, _ in FTS_INDEXES
+        )
+    return _fts_tables[using]
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def parse_booking_reference(query):
+    match = BOOKING_REFERENCE_RE.match(query.strip())
+    return int(match.group(1)) if match else None
+
+
+def booking_exists(booking_id):
+    """Whether the id is a booking, live or archived (two primary-key lookups at most)."""
+    return any(model.objects.filter(id=booking_id).exists() for model in (Booking, ArchivedBooking))
+
+
+def _exact_users(query):
+    users = User.objects.filter(is_staff=False)
+    if EMAIL_RE.match(query):
+        return list(users.annotate(email_lower=Lower('email')).filter(email_lower=query.lower())
+                    .values('id', 'username'))
+    if USERNAME_RE.match(query):
+        exact = list(users.filter(username=query).values('id', 'username'))
+        if exact:
+            return exact
+        return list(users.annotate(username_lower=Lower('username')).filter(username_lower=query.lower())
+                    .values('id', 'username'))
+    return []
+
+
+def _matching(queryset, fts_table, fields, query, limit):
+    if len(query) >= TRIGRAM and _has_fts(queryset.db):
+        queryset = queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', [_fts_phrase(query)]
+        ))
+    else:
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__icontains': query})
+        queryset = queryset.filter(condition)
+    return list(queryset.values('id', fields[0])[:limit])
+
+
+def search(query):
+    """
+    Resolves an admin search query to a `SearchResult`.
+
+    `kind` is 'booking' (`booking_id` is set if it exists), 'user' (an exact email
+    or username match), 'text' (substring matches in `users` and `turfs`)
+    or None for an empty query. `users` and `turfs` are lists of
+    `{'id', 'username'}` and `{'id', 'name'}` dicts, at most
+    ADMIN_SEARCH_MAX_MATCHES of each.
+    """
+    query = ' '.join(query.split())
+    if not query:
+        return SearchResult(None, None, [], [])
+
+    booking_id = parse_booking_reference(query)
+    if booking_id is not None:
+        if booking_exists(booking_id):
+            return SearchResult('booking', booking_id, [], [])
+        if not query.isdigit():
+            # An explicit reference to a booking that does not exist.
+            return SearchResult('booking', None, [], [])
+
+    users = _exact_users(query)
+    if users:
+        return SearchResult('user', None, users, [])
+
+    limit = settings.ADMIN_SEARCH_MAX_MATCHES
+    users = _matching(User.objects.filter(is_staff=False), 'user_search', ('username', 'business_name'), query, limit)
+    turfs = _matching(Turf.objects.all(), 'turf_search', ('name',), query, limit)
+    return SearchResult('text', None, users, turfs)
+
+
+def bookings_for(result, bookings):
+    """Narrows a Booking queryset to the bookings a `SearchResult` points at."""
+    if result.kind is None:
+        return bookings
+    if result.kind == 'booking':
+        return bookings.filter(id=result.booking_id) if result.booking_id else bookings.none()
+    return bookings.filter(
+        Q(user_id__in=[user['id'] for user in result.users]) | Q(turf_id__in=[turf['id'] for turf in result.turfs])
+    )
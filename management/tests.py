@@ -1,3 +1,172 @@
-from django.test import TestCase
+from datetime import timedelta, time
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from Turfs.models import Booking, ChangeEvent, Turf
+from Users.models import Notification, User
+
+from . import search
+
+
+class ToggleUserStatusTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'x', is_staff=True)
+        cls.player = User.objects.create_user('player', 'player@example.com', 'x')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def toggle(self, user):
+        response = self.client.post(reverse('management:toggle_user_status', args=[user.id]))
+        self.assertRedirects(response, reverse('management:manage_users'), fetch_redirect_response=False)
+        return [(message.level_tag, message.message) for message in get_messages(response.wsgi_request)]
+
+    def test_blocks_player(self):
+        self.assertEqual(self.toggle(self.player), [('success', "User 'player' has been blocked.")])
+        self.player.refresh_from_db()
+        self.assertFalse(self.player.is_active)
+
+    def test_staff_account_is_not_reported_as_blocked(self):
+        staff = User.objects.create_user('moderator', 'moderator@example.com', 'x', is_staff=True)
+        [(level, message)] = self.toggle(staff)
+        self.assertEqual(level, 'error')
+        self.assertIn("cannot be blocked", message)
+        staff.refresh_from_db()
+        self.assertTrue(staff.is_active)
+
+
+class BulkModerationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'x', is_staff=True)
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.players = [User.objects.create_user(f'player{i}', f'player{i}@example.com', 'x') for i in range(2)]
+        cls.turfs = [
+            Turf.objects.create(
+                owner=cls.owner, name=name, price_per_hour=Decimal('500'), approval_status=status,
+                address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+                opening_time=time(6), closing_time=time(22),
+            )
+            for name, status in [("Annexe", 'pending'), ("Main Ground", 'pending'), ("Old Ground", 'approved')]
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_approves_selected_turfs_once(self):
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('management:bulk_turf_action'),
+                {'action': 'approve', 'ids': [turf.id for turf in self.turfs] + [999999]},
+                HTTP_ACCEPT='application/json',
+            )
+        self.assertEqual(response.json(), {
+            'action': 'approve', 'requested': 4, 'updated': 2, 'unchanged': 1, 'missing': 1,
+        })
+        self.assertEqual(set(Turf.objects.values_list('approval_status', flat=True)), {'approved'})
+        self.assertEqual(Notification.objects.filter(user=self.owner, kind='turf_approved').count(), 2)
+        self.assertEqual(
+            sorted(ChangeEvent.objects.filter(kind='turf.approval_changed').values_list('entity_id', flat=True)),
+            [self.turfs[0].id, self.turfs[1].id],
+        )
+
+    def test_blocks_selected_users_and_ends_their_sessions(self):
+        player_client = Client()
+        player_client.force_login(self.players[0])
+        self.assertEqual(player_client.get(reverse('users:dashboard_player')).status_code, 200)
+
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('management:bulk_user_action'), {
+                'action': 'block', 'ids': [user.id for user in self.players] + [self.admin.id],
+            })
+        self.assertEqual(
+            [message.message for message in get_messages(response.wsgi_request)],
+            ["Blocked 2 users (1 not found)."],
+        )
+        self.assertFalse(User.objects.filter(id__in=[user.id for user in self.players], is_active=True).exists())
+        self.assertTrue(User.objects.get(id=self.admin.id).is_active)
+
+        response = player_client.get(reverse('users:dashboard_player'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_rejects_an_unknown_action(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse('management:bulk_user_action'), {'action': 'delete', 'ids': [self.players[0].id]},
+            HTTP_ACCEPT='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(User.objects.get(id=self.players[0].id).is_active)
+
+
+class AdminSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'x', is_staff=True)
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'x', user_type='turf_owner')
+        cls.players = [User.objects.create_user(f'player{i}', f'player{i}@example.com', 'x') for i in range(2)]
+        cls.turfs = [
+            Turf.objects.create(
+                owner=cls.owner, name=name, price_per_hour=Decimal('500'), approval_status='approved',
+                address_line_1="1 Main Road", city="Kochi", district="Ernakulam", state="Kerala", pincode='682001',
+                opening_time=time(6), closing_time=time(22),
+            )
+            for name in ["Main Ground", "Riverside Arena"]
+        ]
+        start = timezone.now() + timedelta(days=1)
+        cls.bookings = [
+            Booking.objects.create(
+                turf=turf, user=player, amount=Decimal('500'), status='confirmed',
+                start_time=start, end_time=start + timedelta(hours=1),
+            )
+            for turf, player in [(cls.turfs[0], cls.players[0]), (cls.turfs[1], cls.players[1])]
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def listed(self, query):
+        response = self.client.get(reverse('management:manage_bookings'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [booking.id for booking in response.context['bookings']]
+
+    def test_booking_reference_redirects_to_the_booking(self):
+        booking = self.bookings[1]
+        response = self.client.get(reverse('management:manage_bookings'), {'q': f'#BK-{booking.id}'})
+        self.assertRedirects(
+            response, reverse('management:booking_detail_admin', args=[booking.id]), fetch_redirect_response=False,
+        )
+
+    def test_unknown_booking_reference_lists_nothing(self):
+        self.assertEqual(self.listed('#BK-999999'), [])
+
+    def test_email_and_username_match_exactly(self):
+        self.assertEqual(search.search('PLAYER1@Example.com').users, [{'id': self.players[1].id, 'username': 'player1'}])
+        self.assertEqual(self.listed('Player0'), [self.bookings[0].id])
+        # Staff accounts are never search results.
+        self.assertEqual(search.search('admin@example.com').kind, 'text')
+
+    def test_substring_lists_bookings_of_matching_turfs(self):
+        self.assertEqual(self.listed('verside'), [self.bookings[1].id])
+        result = search.search('ground')
+        self.assertEqual((result.kind, result.turfs), ('text', [{'id': self.turfs[0].id, 'name': "Main Ground"}]))
+
+    def test_short_query_falls_back_to_icontains(self):
+        self.assertEqual(search.search('ai').turfs, [{'id': self.turfs[0].id, 'name': "Main Ground"}])
+
+    def test_renamed_turf_is_found_by_its_new_name(self):
+        Turf.objects.filter(id=self.turfs[0].id).update(name="Lakeside Pitch")
+        self.assertEqual(search.search('Ground').turfs, [])
+        self.assertEqual(self.listed('lakeside'), [self.bookings[0].id])
@@ -1,6 +1,10 @@
 # management/views.py
 
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.views.decorators.http import require_POST
@@ -8,12 +12,16 @@ from django.db.models import Sum, Count,Q
 from django.db.models.functions import TruncMonth
 from Users.models import User
 from Turfs.models import Turf, Booking
+from Turfs.archive import get_booking_or_404
+from . import moderation, search
 import calendar
 from datetime import datetime, date, timedelta
 import json
 from django.utils import timezone
+from Turfie.replicas import use_replica
 
 @staff_member_required
+@use_replica
 def admin_dashboard_view(request):
     # --- Top Stat Cards (no change) ---
     total_users = User.objects.count()
@@ -90,6 +98,7 @@ def admin_dashboard_view(request):
     return render(request, 'management/admin_dashboard.html', context)
 
 @staff_member_required
+@use_replica
 def turf_requests_view(request):
     """Displays a list of all turfs pending approval."""
     pending_turfs = Turf.objects.filter(approval_status='pending').order_by('created_at')
@@ -104,25 +113,77 @@ def turf_requests_view(request):
 @staff_member_required
 def manage_turf_request_view(request, turf_id):
     """Handles the approval or rejection of a turf."""
-    turf = get_object_or_404(Turf, id=turf_id)
+    turf = get_object_or_404(Turf.objects.only('id', 'name'), id=turf_id)
     action = request.POST.get('action')
+    if action not in moderation.TURF_ACTIONS:
+        return redirect('management:turf_requests')
 
+    moderation.set_turf_approval([turf.id], action)
     if action == 'approve':
-        turf.approval_status = 'approved'
         messages.success(request, f"'{turf.name}' has been approved and is now live.")
-    elif action == 'reject':
-        turf.approval_status = 'rejected'
+    else:
         messages.warning(request, f"'{turf.name}' has been rejected.")
-    
-    turf.save()
     return redirect('management:turf_requests')
 
 
+def _selected_ids(request):
+    return [int(value) for value in request.POST.getlist('ids') if value.isdigit()]
+
+
+def _bulk_response(request, summary, noun, default_url):
+    """The result as JSON for API clients; otherwise a one-line message and a redirect back to the list."""
+    if request.accepts('application/json') and not request.accepts('text/html'):
+        return JsonResponse(summary._asdict())
+    messages.success(request, moderation.describe(summary, noun))
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()},
+                                           require_https=request.is_secure()):
+        next_url = reverse(default_url)
+    return redirect(next_url)
+
+
+def _bulk_moderation(request, actions, apply, noun, default_url):
+    action = request.POST.get('action')
+    ids = _selected_ids(request)
+    error = None
+    if action not in actions:
+        error = "Unknown action."
+    elif not ids:
+        error = f"Select at least one {noun}."
+    elif len(ids) > settings.BULK_MODERATION_MAX_ITEMS:
+        error = f"Select at most {settings.BULK_MODERATION_MAX_ITEMS} {noun}s at a time."
+    if error:
+        if request.accepts('application/json') and not request.accepts('text/html'):
+            return JsonResponse({'error': error}, status=400)
+        messages.error(request, error)
+        return redirect(default_url)
+    return _bulk_response(request, apply(ids, action), noun, default_url)
+
+
+@require_POST
 @staff_member_required
+def bulk_turf_action_view(request):
+    """Approves or rejects every selected turf with one UPDATE."""
+    return _bulk_moderation(
+        request, moderation.TURF_ACTIONS, moderation.set_turf_approval, 'turf', 'management:turf_requests',
+    )
+
+
+@require_POST
+@staff_member_required
+def bulk_user_action_view(request):
+    """Blocks or unblocks every selected user with one UPDATE."""
+    return _bulk_moderation(
+        request, moderation.USER_ACTIONS, moderation.set_users_active, 'user', 'management:manage_users',
+    )
+
+
+@staff_member_required
+@use_replica
 def manage_users_view(request):
     """Lists all users for the admin to manage."""
     # Exclude the current admin from the list to prevent self-blocking
-    users = User.objects.filter(is_staff=False).order_by('username')
+    users = User.objects.filter(is_staff=False, deleted_at__isnull=True).order_by('username')
     context = {
         'users': users,
     }
@@ -133,19 +194,27 @@ def manage_users_view(request):
 @staff_member_required
 def toggle_user_status_view(request, user_id):
     """Blocks or unblocks a user by toggling their 'is_active' status."""
-    user_to_toggle = get_object_or_404(User, id=user_id)
-    
-    # Toggle the is_active status
-    user_to_toggle.is_active = not user_to_toggle.is_active
-    user_to_toggle.save()
-    
-    status = "unblocked" if user_to_toggle.is_active else "blocked"
-    messages.success(request, f"User '{user_to_toggle.username}' has been {status}.")
-    
+    user_to_toggle = get_object_or_404(User.objects.only('id', 'username', 'is_active'), id=user_id)
+    action = 'block' if user_to_toggle.is_active else 'unblock'
+    summary = moderation.set_users_active([user_to_toggle.id], action)
+
+    status = "unblocked" if action == 'unblock' else "blocked"
+    if summary.missing:
+        # set_users_active never touches staff or deleted accounts.
+        messages.error(
+            request,
+            f"User '{user_to_toggle.username}' cannot be {status}: staff and deleted accounts are not moderated here.",
+        )
+    elif summary.unchanged:
+        messages.info(request, f"User '{user_to_toggle.username}' was already {status}; nothing changed.")
+    else:
+        messages.success(request, f"User '{user_to_toggle.username}' has been {status}.")
+
     return redirect('management:manage_users')
 
 
 @staff_member_required
+@use_replica
 def manage_turfs_view(request):
     """Lists all turfs with search and filter functionality for the admin."""
     turfs = Turf.objects.select_related('owner').order_by('-created_at')
@@ -171,27 +240,31 @@ def manage_turfs_view(request):
     }
     return render(request, 'management/manage_turfs.html', context)
 
+@staff_member_required
+@use_replica
 def manage_bookings_view(request):
-    """Lists all bookings with search and filter functionality for the admin."""
+    """
+    Lists all bookings, narrowed by the search box (see management/search.py)
+    and a status filter. A booking reference jumps straight to that booking.
+    """
     bookings = Booking.objects.select_related('turf', 'user').order_by('-start_time')
     
     # --- Search and Filter Logic ---
-    search_query = request.GET.get('q')
+    search_query = request.GET.get('q', '').strip()
     status_filter = request.GET.get('status')
 
-    if search_query:
-        bookings = bookings.filter(
-            Q(turf__name__icontains=search_query) |
-            Q(user__username__icontains=search_query) |
-            Q(id__icontains=search_query.replace('#BK-', ''))
-        )
+    result = search.search(search_query)
+    if result.booking_id is not None:
+        return redirect('management:booking_detail_admin', booking_id=result.booking_id)
+    bookings = search.bookings_for(result, bookings)
     
     if status_filter:
         bookings = bookings.filter(status=status_filter)
 
     context = {
         'bookings': bookings,
-        'search_query': search_query or "",
+        'search_query': search_query,
+        'search_result': result,
         'status_filter': status_filter or "",
     }
     return render(request, 'management/manage_bookings.html', context)
@@ -199,7 +272,7 @@ def manage_bookings_view(request):
 @staff_member_required
 def booking_detail_admin_view(request, booking_id):
     """Displays the details of a single booking for the admin."""
-    booking = get_object_or_404(Booking, id=booking_id)
+    booking = get_booking_or_404(booking_id)
     context = {
         'booking': booking,
     }
@@ -0,0 +1,35 @@
+// Simple animations on scroll
+document.addEventListener('DOMContentLoaded', function() {
+    const animateOnScroll = () => {
+        const elements = document.querySelectorAll('.feature-item, .step, .turf-card, .testimonial');
+
+        elements.forEach(element => {
+            const elementPosition = element.getBoundingClientRect().top;
+            const windowHeight = window.innerHeight;
+
+            if (elementPosition < windowHeight - 100) {
+                element.style.opacity = '1';
+                element.style.transform = 'translateY(0)';
+            }
+        });
+    };
+
+    // Run once on load
+    animateOnScroll();
+
+    // Run on scroll
+    window.addEventListener('scroll', animateOnScroll);
+
+    // Button hover effects
+    const buttons = document.querySelectorAll('button, .cta-button');
+    buttons.forEach(button => {
+        button.addEventListener('mouseenter', () => {
+            button.querySelector('i')?.style.transform = 'translateX(3px)';
+        });
+
+        button.addEventListener('mouseleave', () => {
+            button.querySelector('i')?.style.transform = 'translateX(0)';
+        });
+    });
+});
+
@@ -0,0 +1,27 @@
+// Row checkboxes belong to the bulk form through their `form` attribute, so the
+// per-row action forms stay valid (forms cannot be nested).
+document.querySelectorAll('form[data-bulk]').forEach(function (form) {
+    const boxes = document.querySelectorAll('input[name="ids"][form="' + form.id + '"]');
+    const toggle = document.querySelector('input[data-select-all="' + form.id + '"]');
+    const count = form.querySelector('.bulk-count');
+    const buttons = form.querySelectorAll('button[name="action"]');
+
+    function update() {
+        const selected = Array.prototype.filter.call(boxes, function (box) { return box.checked; }).length;
+        count.textContent = selected + ' selected';
+        buttons.forEach(function (button) { button.disabled = selected === 0; });
+        if (toggle) {
+            toggle.checked = selected > 0 && selected === boxes.length;
+            toggle.indeterminate = selected > 0 && selected < boxes.length;
+        }
+    }
+
+    boxes.forEach(function (box) { box.addEventListener('change', update); });
+    if (toggle) {
+        toggle.addEventListener('change', function () {
+            boxes.forEach(function (box) { box.checked = toggle.checked; });
+            update();
+        });
+    }
+    update();
+});
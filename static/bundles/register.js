@@ -0,0 +1,82 @@
+// Toggle between Player and Turf Owner
+function switchAccountType(type) {
+    const playerOption = document.querySelector('.toggle-option:nth-child(1)');
+    const ownerOption = document.querySelector('.toggle-option:nth-child(2)');
+    const slider = document.querySelector('.toggle-slider');
+    const ownerFields = document.getElementById('turf-owner-fields');
+    const accountTypeInput = document.getElementById('account-type-input');
+
+    if (type === 'player') {
+        playerOption.classList.add('active');
+        ownerOption.classList.remove('active');
+        slider.style.transform = 'translateX(0)';
+        ownerFields.classList.remove('show');
+        accountTypeInput.value = 'player';
+        document.getElementById('business-name').removeAttribute('required');
+        document.getElementById('phone').removeAttribute('required');
+    } else {
+        playerOption.classList.remove('active');
+        ownerOption.classList.add('active');
+        slider.style.transform = 'translateX(100%)';
+        ownerFields.classList.add('show');
+        accountTypeInput.value = 'turf_owner';
+        document.getElementById('business-name').setAttribute('required', 'required');
+        document.getElementById('phone').setAttribute('required', 'required');
+    }
+}
+
+// Password strength indicator
+function checkPasswordStrength(password) {
+    const strengthMeter = document.getElementById('strength-meter');
+    let strength = 0;
+
+    if (password.length >= 8) strength += 1;
+    if (password.length >= 12) strength += 1;
+    if (password.match(/[a-z]/)) strength += 1;
+    if (password.match(/[A-Z]/)) strength += 1;
+    if (password.match(/[0-9]/)) strength += 1;
+    if (password.match(/[^a-zA-Z0-9]/)) strength += 1;
+
+    const width = (strength / 6) * 100;
+    strengthMeter.style.width = width + '%';
+
+    if (width < 40) {
+        strengthMeter.style.background = '#FF5252';
+    } else if (width < 70) {
+        strengthMeter.style.background = '#FFAB00';
+    } else {
+        strengthMeter.style.background = '#00C853';
+    }
+}
+
+// Profile picture upload
+document.addEventListener('DOMContentLoaded', () => {
+    const profileInput = document.getElementById('profile-picture-input');
+    const profileWrapper = document.getElementById('profile-picture-wrapper');
+    const profileImage = document.getElementById('profile-picture');
+    const uploadBtn = document.getElementById('upload-btn');
+    const placeholder = document.querySelector('.profile-placeholder');
+
+    // Initialize account type
+    const accountTypeInput = document.getElementById('account-type-input');
+    const initialType = accountTypeInput.value;
+    switchAccountType(initialType);
+
+    // Handle profile picture upload
+    profileWrapper.addEventListener('click', () => profileInput.click());
+    uploadBtn.addEventListener('click', () => profileInput.click());
+
+    profileInput.addEventListener('change', (e) => {
+        const file = e.target.files[0];
+        if (file) {
+            const reader = new FileReader();
+            reader.onload = (event) => {
+                profileImage.src = event.target.result;
+                profileImage.style.display = 'block';
+                placeholder.style.display = 'none';
+            };
+            reader.readAsDataURL(file);
+        }
+    });
+});
+
@@ -0,0 +1,23 @@
+document.addEventListener('DOMContentLoaded', () => {
+    // Mobile menu toggle
+    const menuToggle = document.getElementById('menu-toggle');
+    const sidebar = document.getElementById('sidebar');
+    if (menuToggle && sidebar) {
+        menuToggle.addEventListener('click', () => {
+            sidebar.classList.toggle('-translate-x-full');
+        });
+    }
+
+    // Filter functionality
+    const filterForm = document.getElementById('filter-form');
+    const statusFilter = document.getElementById('status-filter');
+    const dateSort = document.getElementById('date-sort');
+
+    function submitForm() {
+        filterForm.submit();
+    }
+
+    statusFilter.addEventListener('change', submitForm);
+    dateSort.addEventListener('change', submitForm);
+});
+
@@ -0,0 +1,32 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const cancelModal = document.getElementById('cancel-modal');
+    const cancelBtn = document.getElementById('cancel-booking-btn');
+    const closeBtn = document.getElementById('modal-close-btn');
+    const confirmBtn = document.getElementById('modal-confirm-btn');
+    const cancelForm = document.getElementById('cancel-booking-form');
+
+    if (cancelModal && cancelBtn && closeBtn && confirmBtn && cancelForm) {
+        cancelBtn.addEventListener('click', () => {
+            cancelModal.classList.remove('hidden');
+            cancelModal.classList.add('flex');
+        });
+
+        const closeModal = () => {
+            cancelModal.classList.add('hidden');
+            cancelModal.classList.remove('flex');
+        };
+
+        closeBtn.addEventListener('click', closeModal);
+
+        confirmBtn.addEventListener('click', () => {
+            cancelForm.submit();
+        });
+
+        window.addEventListener('click', (event) => {
+            if (event.target === cancelModal) {
+                closeModal();
+            }
+        });
+    }
+});
+
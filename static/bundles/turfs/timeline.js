@@ -0,0 +1,41 @@
+document.addEventListener('DOMContentLoaded', () => {
+    // Mobile menu toggle
+    const menuToggle = document.getElementById('menu-toggle');
+    const sidebar = document.getElementById('sidebar');
+    if (menuToggle && sidebar) {
+        menuToggle.addEventListener('click', () => {
+            sidebar.classList.toggle('-translate-x-full');
+        });
+    }
+
+    // Quick approve/reject without reloading the page
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+    document.querySelectorAll('.quick-actions button').forEach(button => {
+        button.addEventListener('click', async () => {
+            const block = button.closest('.timeline-block');
+            const body = new URLSearchParams({ action: button.dataset.action });
+            block.querySelectorAll('button').forEach(b => b.disabled = true);
+            try {
+                const response = await fetch(button.dataset.url, {
+                    method: 'POST',
+                    headers: { 'X-CSRFToken': csrfToken, 'Accept': 'application/json' },
+                    body: body,
+                });
+                const data = await response.json();
+                if (!response.ok) throw new Error(data.error || 'Request failed');
+                block.querySelector('.quick-actions').remove();
+                block.classList.remove('bg-yellow-100', 'text-yellow-800', 'border-yellow-300');
+                if (data.status === 'confirmed') {
+                    block.classList.add('bg-green-100', 'text-green-800', 'border-green-300');
+                } else {
+                    block.classList.add('bg-gray-100', 'text-gray-400', 'border-gray-200', 'line-through');
+                }
+                block.title = block.title.replace(/[^·]+$/, ' ' + data.status_display);
+            } catch (error) {
+                block.querySelectorAll('button').forEach(b => b.disabled = false);
+                alert(error.message);
+            }
+        });
+    });
+});
+
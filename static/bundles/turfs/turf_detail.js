@@ -0,0 +1,193 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Image Gallery script
+    const mainImage = document.getElementById('main-gallery-image');
+    const thumbnails = document.querySelectorAll('.gallery-thumbnail');
+
+    thumbnails.forEach(thumb => {
+        thumb.addEventListener('click', function() {
+            // Show the large rendition; drop the <picture> WebP source so it cannot override it.
+            const picture = mainImage.closest('picture');
+            if (picture) picture.querySelectorAll('source').forEach(source => source.remove());
+            mainImage.srcset = this.dataset.heroSrcset || '';
+            mainImage.src = this.dataset.heroSrc || this.src;
+            thumbnails.forEach(t => t.classList.remove('border-green-500'));
+            thumbnails.forEach(t => t.classList.add('border-transparent'));
+            this.classList.add('border-green-500');
+            this.classList.remove('border-transparent');
+        });
+    });
+
+    // Booking script
+    const dateSelector = document.getElementById('date-selector');
+    if (!dateSelector) return;
+
+    const slotsContainer = document.getElementById('time-slots-container');
+    const bookBtn = document.getElementById('book-now-btn');
+    const selectedSlotText = document.getElementById('selected-slot-text');
+    const dateField = document.querySelector('[name=date]');
+    const startTimeField = document.querySelector('[name=start_time]');
+    const endTimeField = document.querySelector('[name=end_time]');
+
+    let startSlot = null;
+    let endSlot = null;
+
+    dateSelector.addEventListener('change', () => {
+        const baseUrl = window.location.href.split('?')[0];
+        window.location.href = `${baseUrl}?date=${dateSelector.value}`;
+    });
+
+    slotsContainer.addEventListener('click', function(e) {
+        const clickedSlot = e.target.closest('.time-slot');
+        if (!clickedSlot || clickedSlot.classList.contains('bg-gray-100')) return;
+
+        if (!startSlot) {
+            startSlot = clickedSlot;
+            endSlot = clickedSlot;
+        } else if (clickedSlot === startSlot && startSlot === endSlot) {
+            resetSelection();
+            return;
+        } else {
+            endSlot = clickedSlot;
+        }
+        validateAndHighlightRange();
+    });
+
+    function validateAndHighlightRange() {
+        const allSlots = Array.from(slotsContainer.querySelectorAll('.time-slot'));
+        let startIndex = allSlots.indexOf(startSlot);
+        let endIndex = allSlots.indexOf(endSlot);
+
+        if (startIndex > endIndex) {
+            [startIndex, endIndex] = [endIndex, startIndex];
+        }
+
+        for (let i = startIndex; i <= endIndex; i++) {
+            if (allSlots[i].classList.contains('bg-gray-100')) {
+                resetSelection();
+                selectedSlotText.textContent = 'Invalid range selected.';
+                setTimeout(() => {
+                    if (!startSlot) selectedSlotText.textContent = '';
+                }, 2000);
+                return;
+            }
+        }
+
+        allSlots.forEach((slot, i) => {
+            if (!slot.classList.contains('bg-gray-100')) {
+                if (i >= startIndex && i <= endIndex) {
+                    slot.classList.add('bg-green-600', 'text-white', 'border-green-700');
+                    slot.classList.remove('bg-green-50', 'text-green-800', 'border-green-200');
+                } else {
+                    slot.classList.remove('bg-green-600', 'text-white', 'border-green-700');
+                    slot.classList.add('bg-green-50', 'text-green-800', 'border-green-200');
+                }
+            }
+        });
+
+        startSlot = allSlots[startIndex];
+        endSlot = allSlots[endIndex];
+        updateFormAndButton(startIndex, endIndex);
+    }
+
+    function updateFormAndButton(startIndex, endIndex) {
+        if (!startSlot) return;
+
+        const startTime = startSlot.dataset.time;
+        const endTimeRaw = endSlot.dataset.time;
+        const [h, m] = endTimeRaw.split(':');
+        const endHours = (parseInt(h) + 1).toString().padStart(2, '0');
+        const endTime = `${endHours}:${m}`;
+
+        dateField.value = dateSelector.value;
+        startTimeField.value = startTime;
+        endTimeField.value = endTime;
+
+        // Sum the per-slot prices in paise so the total matches the server's exact quote.
+        const allSlots = Array.from(slotsContainer.querySelectorAll('.time-slot'));
+        let totalPaise = 0;
+        for (let i = startIndex; i <= endIndex; i++) {
+            totalPaise += Math.round(parseFloat(allSlots[i].dataset.price) * 100);
+        }
+        const totalPrice = (totalPaise % 100 === 0) ? totalPaise / 100 : (totalPaise / 100).toFixed(2);
+
+        bookBtn.disabled = false;
+        bookBtn.textContent = `Book Now (₹${totalPrice})`;
+        updateSelectedText();
+    }
+
+    function updateSelectedText() {
+        if (!startSlot) {
+            selectedSlotText.textContent = '';
+            return;
+        }
+        const startTimeText = startSlot.firstChild.textContent.trim();
+        const endTimeRaw = endSlot.dataset.time;
+        const [h, m] = endTimeRaw.split(':');
+        const endTimeValue = `${(parseInt(h) + 1).toString().padStart(2, '0')}:${m}`;
+        const endTimeDate = new Date(`1970-01-01T${endTimeValue}:00`);
+        const endTimeText = endTimeDate.toLocaleTimeString('en-US', { hour: 'numeric', minute: '2-digit', hour12: true });
+
+        selectedSlotText.textContent = `Selected: ${startTimeText} - ${endTimeText}`;
+    }
+
+    function resetSelection() {
+        slotsContainer.querySelectorAll('.time-slot').forEach(s => {
+            if (!s.classList.contains('bg-gray-100')) {
+                 s.classList.remove('bg-green-600', 'text-white', 'border-green-700');
+                 s.classList.add('bg-green-50', 'text-green-800', 'border-green-200');
+            }
+        });
+        startSlot = null;
+        endSlot = null;
+        bookBtn.disabled = true;
+        bookBtn.textContent = 'Select a Slot';
+        updateSelectedText();
+        startTimeField.value = '';
+        endTimeField.value = '';
+    }
+
+    // Live updates: grey out slots as soon as they are booked elsewhere, and free cancelled ones.
+    const BOOKED_CLASSES = ['bg-gray-100', 'text-gray-400', 'cursor-not-allowed', 'line-through', 'border-gray-200'];
+    const FREE_CLASSES = ['bg-green-50', 'text-green-800', 'cursor-pointer', 'border-green-200', 'hover:bg-green-100', 'hover:border-green-400'];
+    const SELECTED_CLASSES = ['bg-green-600', 'text-white', 'border-green-700'];
+
+    // Bit h of the mask is the slot starting during hour h, so "07:30" is bit 7. The stream
+    // only knows about bookings: slots marked data-booked are booked, and a slot greyed out
+    // without it is unavailable for some other reason and is never freed here.
+    function applyBookedMask(booked) {
+        let selectionLost = false;
+        const allSlots = Array.from(slotsContainer.querySelectorAll('.time-slot'));
+        const selected = startSlot ? allSlots.slice(allSlots.indexOf(startSlot), allSlots.indexOf(endSlot) + 1) : [];
+        allSlots.forEach(slot => {
+            const wasBooked = 'booked' in slot.dataset;
+            if (!wasBooked && slot.classList.contains('bg-gray-100')) return;
+            const hour = parseInt(slot.dataset.time, 10);
+            const isBooked = ((booked >> hour) & 1) === 1;
+            if (isBooked === wasBooked) return;
+            if (isBooked) {
+                if (selected.includes(slot)) selectionLost = true;
+                slot.classList.remove(...FREE_CLASSES, ...SELECTED_CLASSES);
+                slot.classList.add(...BOOKED_CLASSES);
+                slot.dataset.booked = '';
+            } else {
+                slot.classList.remove(...BOOKED_CLASSES);
+                slot.classList.add(...FREE_CLASSES);
+                delete slot.dataset.booked;
+            }
+        });
+        if (selectionLost) {
+            resetSelection();
+            selectedSlotText.textContent = 'Sorry, that slot was just booked.';
+            setTimeout(() => {
+                if (!startSlot) selectedSlotText.textContent = '';
+            }, 3000);
+        }
+    }
+
+    if (slotsContainer.dataset.streamUrl && window.EventSource) {
+        const stream = new EventSource(slotsContainer.dataset.streamUrl);
+        stream.addEventListener('slots', e => applyBookedMask(JSON.parse(e.data).booked));
+        window.addEventListener('pagehide', () => stream.close());
+    }
+});
+
@@ -0,0 +1,106 @@
+document.addEventListener('DOMContentLoaded', () => {
+    // Mobile menu toggle
+    const menuToggle = document.getElementById('menu-toggle');
+    const sidebar = document.getElementById('sidebar');
+    if (menuToggle && sidebar) {
+        menuToggle.addEventListener('click', () => {
+            sidebar.classList.toggle('-translate-x-full');
+        });
+    }
+
+    // Search suggestions
+    const searchInput = document.getElementById('search-input');
+    const suggestionList = document.getElementById('search-suggestions');
+    const kindIcons = { turf: 'fa-futbol', city: 'fa-city', district: 'fa-map-marker-alt' };
+    let suggestTimer = null;
+    let suggestRequest = 0;
+    searchInput.addEventListener('input', () => {
+        clearTimeout(suggestTimer);
+        suggestTimer = setTimeout(() => {
+            const query = searchInput.value.trim();
+            const request = ++suggestRequest;
+            if (!query) {
+                suggestionList.classList.add('hidden');
+                return;
+            }
+            fetch(`${searchInput.dataset.suggestUrl}?q=${encodeURIComponent(query)}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (request !== suggestRequest) return; // a newer keystroke already answered
+                    suggestionList.innerHTML = '';
+                    data.results.forEach(result => {
+                        const item = document.createElement('li');
+                        const link = document.createElement('a');
+                        link.href = result.url;
+                        link.className = 'flex items-center gap-3 px-5 py-3 hover:bg-green-50 text-gray-800';
+                        link.innerHTML = `<i class="fas ${kindIcons[result.kind]} text-green-600 w-4"></i><span></span><span class="ml-auto text-xs text-gray-400 capitalize">${result.kind}</span>`;
+                        link.querySelector('span').textContent = result.label;
+                        item.appendChild(link);
+                        suggestionList.appendChild(item);
+                    });
+                    suggestionList.classList.toggle('hidden', data.results.length === 0);
+                })
+                .catch(error => console.error('Error fetching suggestions:', error));
+        }, 120);
+    });
+    document.addEventListener('click', (event) => {
+        if (!event.target.closest('#search-suggestions') && event.target !== searchInput) {
+            suggestionList.classList.add('hidden');
+        }
+    });
+
+    // CSRF Token setup for fetch requests
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+    const csrftoken = getCookie('csrftoken');
+
+    // Event Delegation for favorite buttons
+    const mainContent = document.querySelector('main');
+    if (mainContent) {
+        mainContent.addEventListener('click', (event) => {
+            const favoriteButton = event.target.closest('.btn-favorite');
+            if (favoriteButton) {
+                event.preventDefault();
+                const turfCard = favoriteButton.closest('.turf-card');
+                const turfId = turfCard.dataset.turfId;
+
+                fetch(`/users/toggle-favorite/${turfId}/`, {
+                    method: 'POST',
+                    headers: { 'X-CSRFToken': csrftoken, 'Content-Type': 'application/json' },
+                })
+                .then(response => {
+                    if (!response.ok) {
+                        console.error("Server responded with an error:", response.status);
+                        return response.json().then(err => Promise.reject(err));
+                    }
+                    return response.json();
+                })
+                .then(data => {
+                    const icon = favoriteButton.querySelector('.fa-heart');
+                    icon.classList.toggle('fas', data.is_favorite);
+                    icon.classList.toggle('far', !data.is_favorite);
+                    // Ensure the red color is applied correctly
+                    if (data.is_favorite) {
+                        icon.classList.add('text-red-500');
+                    } else {
+                        icon.classList.remove('text-red-500');
+                    }
+                })
+                .catch(error => console.error('Error toggling favorite:', error));
+            }
+        });
+    }
+});
+
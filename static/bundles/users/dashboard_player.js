@@ -0,0 +1,104 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const mainContent = document.querySelector('main');
+    const cancelModal = document.getElementById('cancel-modal');
+    const modalContent = document.getElementById('modal-content');
+    const menuToggle = document.getElementById('menu-toggle');
+    const sidebar = document.getElementById('sidebar');
+
+    let bookingIdToCancel = null;
+
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+    const csrftoken = getCookie('csrftoken');
+
+    if (menuToggle && sidebar) {
+        menuToggle.addEventListener('click', () => {
+            sidebar.classList.toggle('-translate-x-full');
+        });
+    }
+
+    if (mainContent) {
+        mainContent.addEventListener('click', (event) => {
+            const favoriteButton = event.target.closest('.btn-favorite');
+            const cancelButton = event.target.closest('.cancel-btn');
+
+            if (favoriteButton) {
+                event.preventDefault();
+                const turfId = favoriteButton.closest('.turf-card').dataset.turfId;
+
+                fetch(`/users/toggle-favorite/${turfId}/`, {
+                    method: 'POST',
+                    headers: { 'X-CSRFToken': csrftoken, 'Content-Type': 'application/json' },
+                })
+                .then(response => response.json())
+                .then(data => {
+                    const icon = favoriteButton.querySelector('.fa-heart');
+                    icon.classList.toggle('fas', data.is_favorite);
+                    icon.classList.toggle('far', !data.is_favorite);
+                    icon.classList.toggle('text-red-500', data.is_favorite);
+                })
+                .catch(error => console.error('Error:', error));
+            }
+
+            if (cancelButton) {
+                bookingIdToCancel = cancelButton.dataset.bookingId;
+                cancelModal.classList.remove('hidden');
+                cancelModal.classList.add('flex');
+                setTimeout(() => {
+                    modalContent.classList.remove('scale-95', 'opacity-0');
+                }, 50);
+            }
+        });
+    }
+
+    if (cancelModal) {
+        const confirmBtn = document.getElementById('modal-confirm-btn');
+        const closeBtn = document.getElementById('modal-close-btn');
+
+        const closeModal = () => {
+            modalContent.classList.add('scale-95', 'opacity-0');
+            setTimeout(() => {
+                cancelModal.classList.add('hidden');
+                cancelModal.classList.remove('flex');
+            }, 200);
+        };
+
+        closeBtn.addEventListener('click', closeModal);
+
+        confirmBtn.addEventListener('click', () => {
+            if (bookingIdToCancel) {
+                const form = document.getElementById(`cancel-form-${bookingIdToCancel}`);
+                if (form) form.submit();
+            }
+        });
+
+        window.addEventListener('click', (event) => {
+            if (event.target === cancelModal) closeModal();
+        });
+    }
+
+    const swiperConfig = {
+        slidesPerView: 'auto',
+        spaceBetween: 25,
+        navigation: {
+            nextEl: '.swiper-button-next',
+            prevEl: '.swiper-button-prev',
+        },
+    };
+
+    new Swiper('#bookings-carousel', swiperConfig);
+    new Swiper('#turfs-carousel', swiperConfig);
+});
+
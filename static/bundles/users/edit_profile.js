@@ -0,0 +1,76 @@
+document.addEventListener('DOMContentLoaded', () => {
+    // Mobile menu toggle
+    const menuToggle = document.getElementById('menu-toggle');
+    const sidebar = document.getElementById('sidebar');
+    if (menuToggle && sidebar) {
+        menuToggle.addEventListener('click', () => {
+            sidebar.classList.toggle('-translate-x-full');
+        });
+    }
+
+    // Avatar preview
+    const avatarInput = document.getElementById('id_profile_picture');
+    const avatarPreview = document.getElementById('avatar-preview');
+    if(avatarInput && avatarPreview) {
+        avatarInput.addEventListener('change', function(event) {
+            if (event.target.files && event.target.files[0]) {
+                const reader = new FileReader();
+                reader.onload = function(e) {
+                    avatarPreview.src = e.target.result;
+                }
+                reader.readAsDataURL(event.target.files[0]);
+            }
+        });
+    }
+
+    // Tab functionality
+    const tabButtons = document.querySelectorAll('.tab-button');
+    const tabPanes = document.querySelectorAll('.tab-pane');
+
+    tabButtons.forEach(button => {
+        button.addEventListener('click', () => {
+            tabButtons.forEach(btn => btn.classList.remove('tab-active'));
+            tabPanes.forEach(pane => pane.classList.add('hidden'));
+
+            button.classList.add('tab-active');
+            const tabId = button.dataset.tab;
+            document.getElementById(tabId).classList.remove('hidden');
+        });
+    });
+
+    // Delete modal functionality
+    const deleteModal = document.getElementById('delete-modal');
+    const deleteBtn = document.getElementById('delete-account-btn');
+    const closeBtn = document.getElementById('modal-close-btn');
+
+    if(deleteModal && deleteBtn && closeBtn) {
+        deleteBtn.addEventListener('click', () => {
+            deleteModal.classList.remove('hidden');
+            deleteModal.classList.add('flex');
+        });
+         closeBtn.addEventListener('click', () => {
+            deleteModal.classList.add('hidden');
+            deleteModal.classList.remove('flex');
+        });
+         window.addEventListener('click', (event) => {
+            if (event.target === deleteModal) {
+                deleteModal.classList.add('hidden');
+                deleteModal.classList.remove('flex');
+            }
+        });
+    }
+
+    // This script applies Tailwind classes to all form fields
+    const formFields = document.querySelectorAll(
+        'form input[type="text"], form input[type="email"], form textarea'
+    );
+    const fieldClasses = [
+        'w-full', 'p-3', 'border', 'border-gray-300', 'rounded-lg',
+        'focus:ring-2', 'focus:ring-green-500', 'focus:border-green-500',
+        'transition-all', 'text-base', 'bg-slate-50'
+    ];
+    formFields.forEach(field => {
+        field.classList.add(...fieldClasses);
+    });
+});
+
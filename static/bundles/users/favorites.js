@@ -0,0 +1,65 @@
+document.addEventListener('DOMContentLoaded', () => {
+    // Mobile menu toggle
+    const menuToggle = document.getElementById('menu-toggle');
+    const sidebar = document.getElementById('sidebar');
+    if (menuToggle && sidebar) {
+        menuToggle.addEventListener('click', () => {
+            sidebar.classList.toggle('-translate-x-full');
+        });
+    }
+
+    // CSRF Token setup for fetch requests
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+    const csrftoken = getCookie('csrftoken');
+
+    // Event Delegation for favorite buttons
+    const mainContent = document.querySelector('main');
+    if (mainContent) {
+        mainContent.addEventListener('click', (event) => {
+            const favoriteButton = event.target.closest('.btn-favorite');
+            if (favoriteButton) {
+                event.preventDefault();
+                const turfCard = favoriteButton.closest('.turf-card');
+                const turfId = turfCard.dataset.turfId;
+
+                fetch(`/users/toggle-favorite/${turfId}/`, {
+                    method: 'POST',
+                    headers: { 'X-CSRFToken': csrftoken, 'Content-Type': 'application/json' },
+                })
+                .then(response => response.json())
+                .then(data => {
+                    // On the favorites page, if the turf is no longer a favorite, remove it
+                    if (!data.is_favorite) {
+                        turfCard.style.transition = 'transform 0.3s ease, opacity 0.3s ease';
+                        turfCard.style.transform = 'scale(0.95)';
+                        turfCard.style.opacity = '0';
+                        setTimeout(() => {
+                            turfCard.remove();
+                            // Check if there are any favorites left
+                            const remainingCards = mainContent.querySelectorAll('.turf-card');
+                            if (remainingCards.length === 0) {
+                                // If not, reload the page to show the empty message
+                                window.location.reload();
+                            }
+                        }, 300);
+                    }
+                })
+                .catch(error => console.error('Error removing favorite:', error));
+            }
+        });
+    }
+});
+
@@ -0,0 +1,53 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const mainContent = document.querySelector('main');
+    const cancelModal = document.getElementById('cancel-modal');
+    const modalContent = document.getElementById('modal-content');
+    const menuToggle = document.getElementById('menu-toggle');
+    const sidebar = document.getElementById('sidebar');
+    let bookingIdToCancel = null;
+
+    if (menuToggle && sidebar) {
+        menuToggle.addEventListener('click', () => {
+            sidebar.classList.toggle('-translate-x-full');
+        });
+    }
+
+    mainContent.addEventListener('click', (event) => {
+        const cancelButton = event.target.closest('.cancel-btn');
+        if (cancelButton) {
+            bookingIdToCancel = cancelButton.dataset.bookingId;
+            cancelModal.classList.remove('hidden');
+            cancelModal.classList.add('flex');
+            setTimeout(() => {
+                modalContent.classList.remove('scale-95', 'opacity-0');
+            }, 50);
+        }
+    });
+
+    if (cancelModal) {
+        const confirmBtn = document.getElementById('modal-confirm-btn');
+        const closeBtn = document.getElementById('modal-close-btn');
+
+        const closeModal = () => {
+            modalContent.classList.add('scale-95', 'opacity-0');
+            setTimeout(() => {
+                cancelModal.classList.add('hidden');
+                cancelModal.classList.remove('flex');
+            }, 200);
+        };
+
+        closeBtn.addEventListener('click', closeModal);
+
+        confirmBtn.addEventListener('click', () => {
+            if (bookingIdToCancel) {
+                const form = document.getElementById(`cancel-form-${bookingIdToCancel}`);
+                if (form) form.submit();
+            }
+        });
+
+        window.addEventListener('click', (event) => {
+            if (event.target === cancelModal) closeModal();
+        });
+    }
+});
+